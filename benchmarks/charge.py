@@ -0,0 +1,160 @@
+"""Test de charge : sessions simultanées simulées avec AppTest (sans navigateur ni réseau).
+
+Chaque session rejoue le même parcours : premier rendu du Dashboard, import d'un classeur
+synthétique, changement de période, page Certification et filtre client, page Forecast
+avec changement d'horizon et ajustement manuel d'un mois, retour au Dashboard. Les
+sessions tournent par groupes de `--parallele` threads dans un même processus, comme
+sur un serveur Streamlit ; la latence de chaque étape et la mémoire de l'état de chaque
+session sont résumées en fin de test.
+
+L'import passe par la couche de données comme les boutons de la page Import (AppTest
+ne sait pas téléverser de fichier). En mode hors mémoire (FINANCE_ENTREPOT), les sessions
+partagent l'entrepôt : l'import est sauté, chargez les données au préalable.
+
+    python benchmarks/charge.py --sessions 20 --parallele 4 --lignes 5000 --cible-p95 3.0
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+
+import generateur  # noqa: E402
+from finance.memoire import Mesureur  # noqa: E402
+
+APP = RACINE / "app.py"
+
+# Script de chaque session : l'application, précédée de l'import demandé par le parcours
+_SCRIPT_SESSION = f"""
+import runpy, sys
+import streamlit as st
+sys.path.insert(0, {str(RACINE)!r})
+import etat
+from finance import lire_classeur
+
+classeur = st.session_state.pop('_charge_classeur', None)
+if classeur is not None:
+    etat.init_session_state()
+    for nom, df in lire_classeur(classeur).items():
+        etat.remplacer(nom, df, "Import (test de charge)")
+runpy.run_path({str(APP)!r}, run_name='__main__')
+"""
+
+PAGE_DASHBOARD = "🏠 Dashboard"
+PAGE_CERTIFICATION = "🔷 Facturation Certification"
+PAGE_FORECAST = "📈 Forecast"
+
+
+def memoire_session(session_state) -> int:
+    """Octets de l'état de session, mesurés comme la page Diagnostics (voir `finance.memoire`)"""
+    etat = {cle: valeur for cle, valeur in session_state.items() if not str(cle).startswith('_memoire')}
+    return int(Mesureur().inventaire(etat, {})['Octets'].sum())
+
+
+def parcours(numero, classeur, importer):
+    """Rejoue le parcours d'une session ; retourne ses mesures (étape, durée) et sa mémoire"""
+    from streamlit.testing.v1 import AppTest
+
+    hasard = random.Random(numero)
+    mesures = []
+
+    def etape(nom, action):
+        debut = time.perf_counter()
+        at = action()
+        mesures.append((nom, time.perf_counter() - debut))
+        if at.exception:
+            raise RuntimeError(f"session {numero}, {nom} : {at.exception[0].value}")
+        return at
+
+    at = AppTest.from_string(_SCRIPT_SESSION, default_timeout=300)
+    etape("premier_rendu", at.run)
+    if importer:
+        at.session_state['_charge_classeur'] = classeur
+        etape("import", at.run)
+    options = at.selectbox(key="periode_choix").options
+    etape("periode", at.selectbox(key="periode_choix").set_value(hasard.choice(options[:-1])).run)
+    etape("page_certification", at.sidebar.radio[0].set_value(PAGE_CERTIFICATION).run)
+    clients = at.selectbox(key="certif_client").options
+    etape("filtre_client", at.selectbox(key="certif_client").set_value(hasard.choice(clients)).run)
+    etape("page_forecast", at.sidebar.radio[0].set_value(PAGE_FORECAST).run)
+    etape("horizon_forecast", at.slider(key="forecast_nb_mois").set_value(hasard.randint(3, 12)).run)
+    # Ajustement manuel d'un mois, comme une saisie dans la grille du forecast
+    forecast = at.session_state.forecast_data.copy()
+    forecast.loc[hasard.randrange(len(forecast)), 'CA_Certification'] += 1000.0
+    at.session_state.forecast_data = forecast
+    etape("ajustement_forecast", at.run)
+    etape("retour_dashboard", at.sidebar.radio[0].set_value(PAGE_DASHBOARD).run)
+    return mesures, memoire_session(at.session_state)
+
+
+def resumer(mesures):
+    """Percentiles de latence (s) par étape, et sur l'ensemble des étapes"""
+    df = pd.DataFrame(mesures, columns=['etape', 'duree_s'])
+    df = pd.concat([df, df.assign(etape='TOUTES')])
+    resume = df.groupby('etape', sort=False)['duree_s'].describe(percentiles=[0.5, 0.95, 0.99])
+    return resume[['count', '50%', '95%', '99%', 'max']].rename(
+        columns={'count': 'nombre', '50%': 'p50_s', '95%': 'p95_s', '99%': 'p99_s', 'max': 'max_s'}).round(3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="Nombre de sessions simulées")
+    parser.add_argument("--parallele", type=int, default=4, help="Sessions exécutées simultanément")
+    parser.add_argument("--lignes", type=int, default=5000, help="Lignes de certification du classeur importé")
+    parser.add_argument("--cible-p95", type=float, default=None,
+                        help="Latence p95 maximale sur l'ensemble des étapes (s) ; code de sortie 1 si dépassée")
+    parser.add_argument("--json", type=Path, default=None, help="Fichier où écrire le résumé")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    importer = not os.environ.get("FINANCE_ENTREPOT")
+    with tempfile.TemporaryDirectory() as dossier:
+        classeur = Path(dossier) / "charge.xlsx"
+        generateur.ecrire_classeur(classeur, generateur.generer_ledgers(args.lignes, annees=3))
+
+        rss_avant = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.parallele) as pool:
+            resultats = list(pool.map(lambda n: parcours(n, str(classeur), importer), range(args.sessions)))
+        duree = time.perf_counter() - debut
+        rss_apres = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    resume = resumer([mesure for mesures, _ in resultats for mesure in mesures])
+    memoires = np.array([memoire for _, memoire in resultats]) / 1e6
+    print(resume.to_string())
+    print(f"\n{args.sessions} session(s), {args.parallele} en parallèle, {duree:.1f} s"
+          + ("" if importer else " (import sauté : entrepôt partagé)"))
+    print(f"Mémoire de l'état par session : moyenne {memoires.mean():.1f} Mo, max {memoires.max():.1f} Mo")
+    # ru_maxrss est en kilo-octets sous Linux
+    print(f"Pic de mémoire du processus : {rss_apres / 1e3:.0f} Mo (+{(rss_apres - rss_avant) / 1e3:.0f} Mo)")
+
+    if args.json is not None:
+        args.json.write_text(json.dumps({
+            'sessions': args.sessions, 'parallele': args.parallele, 'lignes': args.lignes, 'duree_s': duree,
+            'latences': resume.reset_index().to_dict(orient='records'),
+            'memoire_session_mo': {'moyenne': memoires.mean(), 'max': memoires.max()},
+            'pic_rss_mo': rss_apres / 1e3,
+        }, ensure_ascii=False, indent=1))
+
+    p95 = resume.loc['TOUTES', 'p95_s']
+    if args.cible_p95 is not None:
+        print(f"p95 toutes étapes : {p95:.3f} s (cible {args.cible_p95:.3f} s)")
+        return 0 if p95 <= args.cible_p95 else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
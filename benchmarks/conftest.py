@@ -0,0 +1,63 @@
+"""Fixtures des benchmarks : ledgers synthétiques produits par generateur.py.
+
+Les tailles mesurées se choisissent avec ``--tailles`` (par défaut 1k, 100k et 1M lignes).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generateur  # noqa: E402
+
+TAILLES_DEFAUT = '1000,100000,1000000'
+
+# Résultats enregistrés à côté des benchmarks, quel que soit le dossier de lancement
+STOCKAGE = Path(__file__).resolve().parent / '.resultats'
+STOCKAGE_PLUGIN = 'file://./.benchmarks'
+
+
+def pytest_addoption(parser):
+    parser.addoption('--tailles', default=TAILLES_DEFAUT,
+                     help="Nombre de lignes des ledgers synthétiques, séparés par des virgules")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Avant la session de pytest-benchmark, qui lit l'emplacement ; un --benchmark-storage explicite prime
+    if config.getoption('benchmark_storage', None) == STOCKAGE_PLUGIN:
+        config.option.benchmark_storage = STOCKAGE.as_uri()
+
+
+def pytest_generate_tests(metafunc):
+    if 'taille' in metafunc.fixturenames:
+        tailles = [int(t) for t in metafunc.config.getoption('tailles').split(',')]
+        metafunc.parametrize('taille', tailles, ids=[f'{t:_}' for t in tailles], scope='session')
+
+
+@pytest.fixture(scope='session')
+def ledgers(taille):
+    return generateur.generer_ledgers(taille, lignes_autres=taille, lignes_charges=taille)
+
+
+@pytest.fixture(scope='session')
+def certif(ledgers):
+    return ledgers['facturation_certif']
+
+
+@pytest.fixture(scope='session')
+def autres(ledgers):
+    return ledgers['facturation_autres']
+
+
+@pytest.fixture(scope='session')
+def charges(ledgers):
+    return ledgers['charges_diverses']
+
+
+@pytest.fixture(scope='session')
+def certif_brute(certif):
+    return generateur.feuille_brute(certif, 'Facturation-Certif')
@@ -0,0 +1,64 @@
+"""Mesure du temps de démarrage de l'application (premier rendu du Dashboard).
+
+Chaque mesure « à froid » est faite dans un sous-processus neuf, ce qui inclut
+l'import des modules ; la mesure « session » rejoue un premier rendu dans un
+processus déjà chaud, comme une nouvelle session sur un serveur en service.
+
+    python benchmarks/demarrage.py --repetitions 5 --cible 0.8
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+_SCRIPT_MESURE = """
+import sys, time, warnings
+warnings.filterwarnings("ignore")
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+froid = time.perf_counter() - t0
+t0 = time.perf_counter()
+AppTest.from_file(sys.argv[1], default_timeout=120).run()
+session = time.perf_counter() - t0
+if at.exception:
+    sys.exit(f"exception: {at.exception[0].value}")
+print(f"{froid} {session}")
+"""
+
+
+def mesurer(repetitions):
+    """Retourne les durées (froid, session) en secondes pour chaque répétition"""
+    mesures = []
+    for _ in range(repetitions):
+        sortie = subprocess.run(
+            [sys.executable, "-c", _SCRIPT_MESURE, str(APP)],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        mesures.append((float(sortie[-2]), float(sortie[-1])))
+    return mesures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--cible", type=float, default=0.8,
+                        help="Temps médian maximal du premier rendu à froid (s)")
+    args = parser.parse_args(argv)
+
+    mesures = mesurer(args.repetitions)
+    froid = statistics.median(m[0] for m in mesures)
+    session = statistics.median(m[1] for m in mesures)
+    print(f"Premier rendu à froid : {froid:.3f} s (médiane sur {args.repetitions})")
+    print(f"Nouvelle session      : {session:.3f} s")
+    print(f"Cible                 : {args.cible:.3f} s")
+    return 0 if froid <= args.cible else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
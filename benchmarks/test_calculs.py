@@ -0,0 +1,115 @@
+"""Benchmarks des chemins de calcul critiques de l'application."""
+
+from finance import (
+    CERTIF, COLONNES_FACTURATION, calculer_marge, agregation_mensuelle,
+    moyennes_mensuelles, importer_feuille
+)
+
+
+def test_calculer_marge(benchmark, certif):
+    resultat = benchmark(calculer_marge, certif)
+    assert len(resultat) == len(certif)
+
+
+def test_agregation_mensuelle_dashboard(benchmark, certif, autres):
+    def dashboard():
+        return agregation_mensuelle(certif), agregation_mensuelle(autres)
+
+    certif_agg, autres_agg = benchmark(dashboard)
+    assert certif_agg['Montant_Facturation'].sum() == certif['Montant_Facturation'].sum()
+
+
+def test_moyennes_forecast(benchmark, certif, autres, charges):
+    def forecast():
+        return (moyennes_mensuelles(certif, COLONNES_FACTURATION),
+                moyennes_mensuelles(autres, COLONNES_FACTURATION),
+                moyennes_mensuelles(charges, ['Montant']))
+
+    moy_certif, _, _ = benchmark(forecast)
+    assert moy_certif['Montant_Facturation'] > 0
+
+
+def test_import_nettoyage_certif(benchmark, certif_brute):
+    resultat = benchmark(importer_feuille, certif_brute, CERTIF)
+    assert len(resultat) == len(certif_brute) - 2
+
+
+def test_export_csv(benchmark, certif):
+    csv = benchmark(lambda: certif.to_csv(index=False).encode('utf-8'))
+    assert csv.startswith(b'Date,')
+
+
+def test_forecast_saisonnier(benchmark, certif, autres, charges):
+    from finance.lissage import series_mensuelles, ajuster
+
+    modele = benchmark(lambda: ajuster(series_mensuelles(certif, autres, charges)))
+    assert modele.prevoir(6).shape == (6, 5)
+
+
+def test_forecast_par_client_boucle(benchmark, certif, autres):
+    from finance.lissage import series_par, ajuster
+
+    series = series_par([certif, autres], 'Client')
+    modeles = benchmark(lambda: [ajuster(series[[client]]) for client in series.columns])
+    assert len(modeles) == series.shape[1]
+
+
+def test_forecast_par_client_lot(benchmark, certif, autres):
+    from finance.lissage import series_par, ajuster_lot
+
+    series = series_par([certif, autres], 'Client')
+    modele = benchmark(lambda: ajuster_lot(series))
+    assert modele.prevoir(6).shape == (6, series.shape[1])
+
+
+def test_backtest(benchmark, certif, autres, charges):
+    from finance.lissage import series_mensuelles
+    from finance.backtest import backtester
+
+    series = series_mensuelles(certif, autres, charges)
+    par_ligne, par_horizon = benchmark(lambda: backtester(series, 6))
+    assert len(par_ligne) == 2 * series.shape[1] and len(par_horizon) == 6
+
+
+def test_capacite_mensuelle(benchmark, certif):
+    from finance.capacite import ParametresCapacite, capacite_mensuelle
+
+    mensuel = benchmark(lambda: capacite_mensuelle(certif, ParametresCapacite()))
+    assert mensuel['Jours_Audit'].sum() > 0
+
+
+def test_tresorerie(benchmark, certif, autres, charges):
+    import pandas as pd
+    from finance.tresorerie import SEMAINE, ConditionsPaiement, flux_facturation, flux_charges, par_semaine, projection
+
+    conditions = ConditionsPaiement()
+
+    def projeter():
+        flux = pd.concat([par_semaine(flux_facturation(certif, conditions)),
+                          par_semaine(flux_facturation(autres, conditions)),
+                          par_semaine(flux_charges(charges, conditions))], ignore_index=True)
+        return projection(flux, certif['Date'].max().to_period(SEMAINE) - 12, 26)
+
+    tableau = benchmark(projeter)
+    assert len(tableau) == 26
+
+
+def test_consolidation(benchmark, certif, autres, charges):
+    import pandas as pd
+    from finance import AUTRES, CHARGES
+    from finance.consolidation import DIMENSIONS_CONSOLIDATION, consolider
+
+    ledgers = {CERTIF: certif, AUTRES: autres, CHARGES: charges}
+    agregats = {nom: df.groupby([df['Date'].dt.to_period('M').dt.to_timestamp(), *DIMENSIONS_CONSOLIDATION])
+                .sum(numeric_only=True).reset_index() for nom, df in ledgers.items()}
+    taux = pd.DataFrame({'Devise': ['CHF', 'GBP'], 'Mois': pd.PeriodIndex(['2023-01', '2023-01'], freq='M'),
+                         'Taux': [1.05, 1.17]})
+    consolide = benchmark(consolider, agregats, taux)
+    assert consolide['CA_Total'].sum() > certif['Montant_Facturation'].sum()
+
+
+def test_detecter_anomalies(benchmark, certif):
+    from finance.anomalies import detecter_anomalies
+
+    controles = benchmark(detecter_anomalies, certif, CERTIF, certif.iloc[:len(certif) // 10])
+    assert controles['Doublon'].sum() >= len(certif) // 10
@@ -0,0 +1,36 @@
+"""Benchmarks du journal : suppressions par delta, modifications en lot et reconstitution d'un état passé."""
+
+from finance import CERTIF
+from finance.journal import Journal, Operation, appliquer, difference
+
+
+def _suppression(certif, debut):
+    return Operation(CERTIF, "Suppression", certif.iloc[debut:debut + 100], certif.iloc[:0])
+
+
+def test_suppression_delta(benchmark, certif):
+    resultat = benchmark(appliquer, certif, _suppression(certif, 0))
+    assert len(resultat) == len(certif) - min(100, len(certif))
+
+
+def test_modification_lot(benchmark, certif):
+    # Grille éditée : une ligne sur dix modifiée, une sur cinquante supprimée
+    apres = certif.drop(certif.index[::50])
+    apres.loc[apres.index[::10], 'Montant_Facturation'] += 1.0
+
+    def modifier():
+        return appliquer(certif, difference(CERTIF, "Modification", certif, apres))
+
+    resultat = benchmark(modifier)
+    assert resultat.index.equals(apres.index)
+
+
+def test_reconstitution(benchmark, certif):
+    journal = Journal()
+    ledger = certif
+    for i in range(10):
+        operation = _suppression(ledger, i * 10)
+        ledger = appliquer(ledger, operation)
+        journal.enregistrer(operation)
+    initial = benchmark(journal.reconstituer, CERTIF, ledger, 0)
+    assert initial.index.equals(certif.index)
@@ -0,0 +1,76 @@
+"""Benchmarks des partitions mensuelles : lecture d'un exercice, agrégats figés et cubes."""
+
+import pandas as pd
+import pytest
+
+from finance import COLONNES_FACTURATION, calculer_kpis, calculer_marge, filtrer, marge_par
+from finance.charges import CHARGES_DIVERSES, assembler_cube, evolution_mensuelle
+from finance.partitions import IndexMensuel, AgregatsMensuels, bornes_mois
+
+EXERCICE = (pd.Period('2024-01', 'M'), pd.Period('2024-12', 'M'))
+
+
+def test_exercice_masque_complet(benchmark, certif):
+    debut, fin = bornes_mois(*EXERCICE)
+    resultat = benchmark(lambda: certif[(certif['Date'] >= debut) & (certif['Date'] <= fin)])
+    assert len(resultat) > 0
+
+
+def test_exercice_index_mensuel(benchmark, certif):
+    index = IndexMensuel(certif['Date'])
+    resultat = benchmark(lambda: certif.take(index.positions(*EXERCICE)))
+    assert len(resultat) == certif['Date'].dt.year.eq(2024).sum()
+
+
+def test_kpis_agregats_figes(benchmark, certif):
+    index = IndexMensuel(certif['Date'])
+    agregats = AgregatsMensuels(COLONNES_FACTURATION)
+
+    def lecteur(debut, fin):
+        return certif.take(index.positions(debut, fin))
+
+    agregats.agreger(index.mois, lecteur)
+    kpis = benchmark(lambda: calculer_kpis(agregats.agreger(index.mois, lecteur), certif.iloc[:0],
+                                           pd.DataFrame({'Montant': []})))
+    assert kpis.ca_certif == certif['Montant_Facturation'].sum()
+
+
+def _cube(certif):
+    index = IndexMensuel(certif['Date'])
+    cube = AgregatsMensuels(COLONNES_FACTURATION, ('Client', 'Référentiel', 'Statut'))
+    return calculer_marge(cube.agreger(index.mois, lambda debut, fin: certif.take(index.positions(debut, fin))))
+
+
+def test_marge_client_lignes(benchmark, certif):
+    def vue():
+        return marge_par(filtrer(calculer_marge(certif), {'Référentiel': 'IFS FOOD', 'Statut': 'Facturé'}), 'Client')
+
+    resultat = benchmark(vue)
+    assert len(resultat) > 0
+
+
+def test_marge_client_cube(benchmark, certif):
+    cube = _cube(certif)
+    resultat = benchmark(lambda: marge_par(filtrer(cube, {'Référentiel': 'IFS FOOD', 'Statut': 'Facturé'}), 'Client'))
+    attendu = marge_par(filtrer(calculer_marge(certif), {'Référentiel': 'IFS FOOD', 'Statut': 'Facturé'}), 'Client')
+    pd.testing.assert_frame_equal(resultat.drop(columns='Taux_Marge'), attendu.drop(columns='Taux_Marge'),
+                                  check_exact=False)
+
+
+def _agreger(df, colonnes, dimensions):
+    index = IndexMensuel(df['Date'])
+    agregats = AgregatsMensuels(colonnes, dimensions)
+    return agregats.agreger(index.mois, lambda debut, fin: df.take(index.positions(debut, fin)))
+
+
+def test_charges_categorie_mois_lignes(benchmark, charges):
+    resultat = benchmark(lambda: charges.groupby([pd.Grouper(key='Date', freq='ME'), 'Catégorie'])['Montant'].sum())
+    assert resultat.sum() == pytest.approx(charges['Montant'].sum())
+
+
+def test_charges_categorie_mois_cube(benchmark, certif, autres, charges):
+    cube = assembler_cube(_agreger(certif, COLONNES_FACTURATION, ('Statut',)),
+                          _agreger(autres, COLONNES_FACTURATION, ('Statut',)),
+                          _agreger(charges, ['Montant'], ('Catégorie', 'Statut')))
+    resultat = benchmark(lambda: evolution_mensuelle(cube[cube['Poste'] == CHARGES_DIVERSES], 'Catégorie'))
+    assert resultat['Total'].sum() == pytest.approx(charges['Montant'].sum())
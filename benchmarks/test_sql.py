@@ -0,0 +1,43 @@
+"""Benchmarks de l'analyse ad hoc : groupby pandas chaînés contre DuckDB."""
+
+import pytest
+
+pytest.importorskip('duckdb')
+
+from finance import sql  # noqa: E402
+
+
+@pytest.fixture
+def connexion(ledgers):
+    con = sql.connexion(ledgers)
+    yield con
+    con.close()
+
+
+def _marge_trimestre_pandas(certif):
+    df = certif.assign(
+        Marge=certif['Montant_Facturation'] - certif['Frais_Mission'] - certif['Cout_Auditeur'],
+        Trimestre=certif['Date'].dt.to_period('Q').astype(str),
+    )
+    return (df.groupby(['Référentiel', 'Trimestre', 'Client'])[['Montant_Facturation', 'Marge']]
+            .sum().reset_index())
+
+
+def test_marge_referentiel_trimestre_client_pandas(benchmark, certif):
+    resultat = benchmark(_marge_trimestre_pandas, certif)
+    assert resultat['Montant_Facturation'].sum() == certif['Montant_Facturation'].sum()
+
+
+def test_marge_referentiel_trimestre_client_duckdb(benchmark, connexion, certif):
+    requete = """
+        SELECT "Référentiel", concat(year("Date"), 'Q', quarter("Date")) AS Trimestre, Client,
+               sum(Montant_Facturation) AS Montant_Facturation,
+               sum(Montant_Facturation - Frais_Mission - Cout_Auditeur) AS Marge
+        FROM certif GROUP BY ALL"""
+    resultat = benchmark(sql.executer, connexion, requete)
+    assert resultat['Montant_Facturation'].sum() == pytest.approx(certif['Montant_Facturation'].sum())
+
+
+def test_tableau_croise_duckdb(benchmark, connexion):
+    resultat = benchmark(sql.tableau_croise, connexion, 'facturation', ['Prestation'], 'Marge', 'Trimestre')
+    assert len(resultat) > 0
@@ -0,0 +1,25 @@
+"""Benchmarks du mode hors mémoire : lecture complète contre lecture d'un trimestre élagué."""
+
+import pytest
+
+from finance import CERTIF
+from finance.stockage import EntrepotParquet
+
+
+@pytest.fixture(scope='session')
+def entrepot(tmp_path_factory, ledgers):
+    entrepot = EntrepotParquet(tmp_path_factory.mktemp('entrepot'))
+    entrepot.remplacer(CERTIF, ledgers[CERTIF])
+    return entrepot
+
+
+def test_lecture_complete(benchmark, entrepot, certif):
+    resultat = benchmark(entrepot.lire, CERTIF)
+    assert len(resultat) == len(certif)
+
+
+def test_lecture_trimestre_colonnes(benchmark, entrepot, certif):
+    resultat = benchmark(entrepot.lire, CERTIF, ['Date', 'Montant_Facturation'],
+                         debut='2024-01-01', fin='2024-03-31')
+    attendu = certif['Date'].between('2024-01-01', '2024-03-31').sum()
+    assert len(resultat) == attendu
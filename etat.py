@@ -0,0 +1,850 @@
+"""Gestion de l'état de session : ledgers vides typés, données de démonstration et accès aux données.
+
+Les pages lisent et modifient les ledgers via `lire`, `lire_periode`, `agregats`,
+`ajouter`, `modifier`, `remplacer` et `supprimer` ; chaque modification incrémente la version
+du ledger, indique les mois touchés et est inscrite au journal de la session
+(annuler / rétablir). Les lignes sont indexées par un identifiant stable.
+Par défaut les ledgers sont des DataFrames de la session ; si la variable
+d'environnement FINANCE_ENTREPOT désigne un dossier, ils sont stockés dans un
+entrepôt Parquet partitionné par mois (mode hors mémoire), partagé par les
+sessions, et seules les colonnes et périodes demandées sont chargées.
+"""
+
+import os
+import uuid
+from contextlib import contextmanager
+from dataclasses import replace
+
+import streamlit as st
+import pandas as pd
+
+from finance import (
+    SCHEMAS, CERTIF, AUTRES, CHARGES, LIBELLES, COLONNES_FACTURATION, DEVISE_DEFAUT, ledger_vide, completer_entite
+)
+from finance.charges import assembler_cube, lire_budget, ecrire_budget, budget_vide
+from finance.consolidation import DIMENSIONS_CONSOLIDATION, consolider, lire_taux, ecrire_taux, taux_vide
+from finance.journal import Journal, Operation, appliquer, difference
+from finance.memoire import Mesureur, pic_memoire
+from finance.lissage import series_mensuelles
+from finance.partitions import IndexMensuel, AgregatsMensuels, mois_de, bornes_mois, plages
+from finance.rapprochement import Rapprochement, STATUTS_REALISES
+from finance.tresorerie import FluxTresorerie, colonnes_tresorerie
+from finance.stockage import COLONNE_ID, EntrepotParquet
+from finance.taches import ECHEC, Executeur
+from finance.versions import DepotVersions
+
+# Variable d'environnement activant le mode hors mémoire
+ENV_ENTREPOT = 'FINANCE_ENTREPOT'
+
+# Colonnes sommées dans les agrégats mensuels de chaque ledger
+COLONNES_AGREGEES = {
+    CERTIF: COLONNES_FACTURATION + ['Durée'],
+    AUTRES: COLONNES_FACTURATION,
+    CHARGES: ['Montant'],
+}
+
+# Dimensions des cubes matérialisés des vues d'ensemble (en plus du mois)
+DIMENSIONS_CUBE = {
+    CERTIF: ('Client', 'Référentiel', 'Statut'),
+    AUTRES: ('Client', 'Type', 'Statut'),
+    CHARGES: ('Catégorie', 'Statut'),
+}
+
+
+def donnees_demo():
+    """Construit le jeu de données de démonstration"""
+    return {
+        'facturation_certif': pd.DataFrame({
+            'Date': pd.date_range(start='2025-01-01', periods=8, freq='ME'),
+            'Client': ['LIDL', 'Client A', 'LIDL', 'Client B', 'LIDL', 'Client C', 'Client A', 'LIDL'],
+            'Référentiel': ['IFS FOOD', 'BRC FOOD', 'IFS FOOD', 'IFS LOGISTICS', 'IFS FOOD', 'BRC FOOD', 'IFS FOOD', 'IFS FOOD'],
+            'Durée': [1.5, 2, 1, 1.5, 1.5, 2, 1, 1.5],
+            'Montant_Facturation': [2000, 2200, 1350, 1800, 2000, 2400, 1350, 2000],
+            'Frais_Mission': [250, 180, 200, 150, 220, 300, 180, 240],
+            'Cout_Auditeur': [800, 900, 600, 750, 800, 1000, 600, 800],
+            'Statut': ['Facturé'] * 5 + ['Prévu'] * 3
+        }),
+        'facturation_autres': pd.DataFrame({
+            'Date': pd.date_range(start='2025-01-01', periods=6, freq='ME'),
+            'Type': ['Formation', 'Conseil', 'Prêt auditeur', 'Formation', 'Conseil', 'Prêt auditeur'],
+            'Client': ['ITM', 'Client D', 'KIWA', 'Client E', 'LIDL', 'SGS'],
+            'Description': ['IFS Food', 'Mise en conformité', 'Audit 1 jour', 'BRC', 'Optimisation process', 'Audit 1.5 jours'],
+            'Montant_Facturation': [1200, 1500, 750, 1000, 1800, 1125],
+            'Frais_Mission': [100, 150, 80, 120, 200, 100],
+            'Cout_Auditeur': [400, 600, 500, 350, 700, 750],
+            'Statut': ['Facturé'] * 4 + ['Prévu'] * 2
+        }),
+        'charges_diverses': pd.DataFrame({
+            'Date': pd.date_range(start='2025-01-01', periods=8, freq='ME'),
+            'Catégorie': ['Frais généraux', 'Marketing', 'Informatique', 'Assurance', 'Frais généraux', 'Formation', 'Informatique', 'Marketing'],
+            'Description': ['Loyer bureau', 'Publicité Google', 'Abonnement logiciel', 'RC Pro', 'Fournitures', 'Formation continue', 'Cloud', 'LinkedIn Ads'],
+            'Montant': [800, 300, 150, 450, 200, 500, 180, 250],
+            'Statut': ['Payé'] * 6 + ['Prévu'] * 2
+        }),
+    }
+
+
+@st.cache_resource
+def _entrepot(racine):
+    entrepot = EntrepotParquet(racine)
+    for nom in SCHEMAS:
+        entrepot.migrer_ids(nom)
+    return entrepot
+
+
+def entrepot():
+    """Entrepôt Parquet du mode hors mémoire, ou None si les ledgers sont en session"""
+    racine = os.environ.get(ENV_ENTREPOT)
+    return _entrepot(racine) if racine else None
+
+
+@st.cache_resource
+def _depot_versions(racine):
+    return DepotVersions(os.path.join(racine, 'forecasts'))
+
+
+def _chemin_taux():
+    racine = os.environ.get(ENV_ENTREPOT)
+    return os.path.join(racine, 'taux_change.csv') if racine else None
+
+
+def taux_change():
+    """Table des taux de change vers l'euro : dans l'entrepôt (partagée), sinon propre à la session"""
+    if _chemin_taux():
+        return lire_taux(_chemin_taux())
+    return st.session_state.get('_taux_change', taux_vide())
+
+
+def enregistrer_taux(taux):
+    if _chemin_taux():
+        ecrire_taux(taux, _chemin_taux())
+    else:
+        st.session_state._taux_change = taux
+
+
+def _chemin_budget():
+    racine = os.environ.get(ENV_ENTREPOT)
+    return os.path.join(racine, 'budget_charges.csv') if racine else None
+
+
+def budget_charges():
+    """Budget mensuel des charges par ligne : dans l'entrepôt (partagé), sinon propre à la session"""
+    if _chemin_budget():
+        return lire_budget(_chemin_budget())
+    return st.session_state.get('_budget_charges', budget_vide())
+
+
+def enregistrer_budget(budget):
+    if _chemin_budget():
+        ecrire_budget(budget, _chemin_budget())
+    else:
+        st.session_state._budget_charges = budget
+
+
+def versions_forecast():
+    """Versions enregistrées du forecast : dans l'entrepôt (partagées), sinon propres à la session"""
+    racine = os.environ.get(ENV_ENTREPOT)
+    if racine:
+        return _depot_versions(racine)
+    if '_versions_forecast' not in st.session_state:
+        st.session_state._versions_forecast = DepotVersions()
+    return st.session_state._versions_forecast
+
+
+# --- Versions et partitions mensuelles ---
+
+def version(nom):
+    """Numéro de version du ledger, incrémenté à chaque modification.
+
+    Dans l'entrepôt, c'est la génération de l'entrepôt vue par la session lors de sa
+    dernière synchronisation (voir `synchroniser`).
+    """
+    if entrepot() is not None:
+        return st.session_state.setdefault('_generations_vues', {}).get(nom, 0)
+    return st.session_state.setdefault('_versions', {}).get(nom, 0)
+
+
+def synchroniser(nom=None):
+    """Entrepôt partagé : prend en compte les écritures des autres sessions depuis la dernière synchronisation.
+
+    Seuls les agrégats des mois écrits entre-temps sont libérés (tous si ces mois ne
+    sont plus connus) ; appelée à chaque exécution du script et après chaque écriture.
+    """
+    if entrepot() is None:
+        return
+    vues = st.session_state.setdefault('_generations_vues', {})
+    for ledger in SCHEMAS if nom is None else [nom]:
+        generation = entrepot().generation(ledger)
+        if vues.get(ledger, 0) != generation:
+            _invalider(ledger, entrepot().mois_ecrits(ledger, vues.get(ledger, 0)))
+            vues[ledger] = generation
+
+
+def _index_mensuel(nom):
+    """Index des lignes par mois du ledger en session, reconstruit après chaque modification"""
+    cache = st.session_state.setdefault('_index_mensuel', {})
+    if nom not in cache or cache[nom][0] != version(nom):
+        cache[nom] = (version(nom), IndexMensuel(st.session_state[nom]['Date']))
+    return cache[nom][1]
+
+
+def mois_disponibles(nom):
+    """Mois présents dans le ledger, triés"""
+    if entrepot() is not None:
+        return pd.PeriodIndex([pd.Period(year=a, month=m, freq='M') for a, m in entrepot().partitions(nom)],
+                              freq='M')
+    return _index_mensuel(nom).mois
+
+
+def _agregats_mensuels(nom, dimensions=('Statut',)):
+    agregats = st.session_state.setdefault('_agregats', {})
+    if (nom, dimensions) not in agregats:
+        agregats[nom, dimensions] = AgregatsMensuels(COLONNES_AGREGEES[nom], dimensions)
+    return agregats[nom, dimensions]
+
+
+# --- Lecture ---
+
+def lire(nom, colonnes=None, debut=None, fin=None, egalites=None):
+    """Lit un ledger, restreint aux colonnes, à la période [debut, fin] et aux valeurs demandées.
+
+    `egalites` associe à une colonne une valeur ou une liste de valeurs (None : pas de filtre).
+    Seuls les mois de la période sont parcourus. Sans restriction, le DataFrame de la
+    session est retourné tel quel, sans copie.
+    """
+    if entrepot() is not None:
+        return entrepot().lire(nom, colonnes, debut, fin, egalites)
+
+    df = st.session_state[nom]
+    if debut is not None or fin is not None:
+        debut = None if debut is None else pd.Timestamp(debut)
+        fin = None if fin is None else pd.Timestamp(fin).normalize() + pd.Timedelta(days=1)
+        positions = _index_mensuel(nom).positions(
+            None if debut is None else debut.to_period('M'),
+            None if fin is None else (fin - pd.Timedelta(days=1)).to_period('M'))
+        df = df.take(positions)
+        # Seuls les mois aux bornes peuvent contenir des lignes hors période
+        masque = pd.Series(True, index=df.index)
+        if debut is not None:
+            masque &= df['Date'] >= debut
+        if fin is not None:
+            masque &= df['Date'] < fin
+        df = df[masque]
+    masque = None
+    for colonne, valeur in (egalites or {}).items():
+        if valeur is None:
+            continue
+        condition = df[colonne].isin(valeur) if isinstance(valeur, (list, tuple, set)) else df[colonne] == valeur
+        masque = condition if masque is None else masque & condition
+    if masque is not None:
+        df = df[masque]
+    return df if colonnes is None else df[list(colonnes)]
+
+
+def lire_periode(nom, colonnes=None, egalites=None, devise_base=False):
+    """Lit un ledger sur la période choisie dans la barre latérale.
+
+    `devise_base` : seules les lignes en devise de base, celles que les vues hors
+    Consolidation additionnent (voir `agregats`).
+    """
+    if devise_base:
+        egalites = {**(egalites or {}), 'Devise': DEVISE_DEFAUT}
+    return lire(nom, colonnes, *bornes_mois(*periode()), egalites=egalites)
+
+
+def agregats(nom, dimensions=('Statut',)):
+    """Sommes mensuelles par dimensions sur la période choisie (colonnes Date, dimensions, montants, Lignes).
+
+    Les mois clos sont calculés une seule fois puis figés ; seuls les mois ouverts et
+    les mois touchés par une modification sont recalculés. Sauf si la devise fait partie
+    des dimensions, seules les lignes en devise de base sont sommées : les montants de
+    devises différentes ne s'additionnent pas (voir `autres_devises` et la Consolidation).
+    """
+    debut, fin = periode()
+    mois = [m for m in mois_disponibles(nom)
+            if (debut is None or m >= debut) and (fin is None or m <= fin)]
+    return _agreger(nom, mois, dimensions)
+
+
+def _agreger(nom, mois, dimensions=('Statut',)):
+    devise_base = 'Devise' not in dimensions
+    agregats_mensuels = _agregats_mensuels(nom, tuple(dimensions) + (('Devise',) if devise_base else ()))
+    colonnes = ['Date'] + agregats_mensuels.dimensions + agregats_mensuels.colonnes
+    agg = agregats_mensuels.agreger(mois, lambda a, b: lire(nom, colonnes, *bornes_mois(a, b)))
+    if devise_base:
+        agg = agg[agg['Devise'] == DEVISE_DEFAUT].drop(columns='Devise').reset_index(drop=True)
+    return agg
+
+
+def cube(nom):
+    """Cube matérialisé de la période : Client × Référentiel (ou Type) × Mois × Statut, Catégorie × Mois × Statut"""
+    return agregats(nom, DIMENSIONS_CUBE[nom])
+
+
+def cube_charges():
+    """Cube des charges Poste × Catégorie × Mois × Statut de la période (voir `finance.charges`).
+
+    Assemblé à partir des agrégats mensuels, il est calculé une fois par version des
+    ledgers et par période, et partagé par le Dashboard et la page Charges.
+    """
+    return calcul_en_cache('cube_charges', lambda: assembler_cube(agregats(CERTIF), agregats(AUTRES), cube(CHARGES)))
+
+
+def realise(mois):
+    """Réalisé des lignes du forecast pour les mois demandés, quelle que soit la période choisie.
+
+    Seules les lignes facturées ou payées comptent. Chaque mois est calculé une fois ;
+    une modification des ledgers n'invalide que les mois qu'elle touche.
+    """
+    def calculer(manquants):
+        sommes = []
+        for nom in (CERTIF, AUTRES, CHARGES):
+            disponibles = set(mois_disponibles(nom))
+            agg = _agreger(nom, [m for m in manquants if m in disponibles])
+            sommes.append(agg[agg['Statut'].isin(STATUTS_REALISES)])
+        return series_mensuelles(*sommes)
+
+    moteur = st.session_state.setdefault('_rapprochement', Rapprochement())
+    return moteur.realise(mois, calculer)
+
+
+def flux_tresorerie(conditions, debut, fin):
+    """Flux de trésorerie hebdomadaires des lignes datées des mois [debut, fin], quelle que soit la période.
+
+    Seules les lignes en devise de base sont projetées. Les flux sont conservés par mois
+    d'origine pour les conditions de paiement données ; une modification des ledgers
+    n'invalide que les mois qu'elle touche.
+    """
+    moteur = st.session_state.get('_tresorerie')
+    if moteur is None or moteur.conditions != conditions:
+        moteur = st.session_state._tresorerie = FluxTresorerie(conditions)
+    mois = pd.period_range(debut, fin, freq='M')
+    flux = []
+    for nom in SCHEMAS:
+        disponibles = set(mois_disponibles(nom))
+        flux.append(moteur.flux(nom, [m for m in mois if m in disponibles],
+                                lambda a, b, nom=nom: lire(nom, colonnes_tresorerie(nom), *bornes_mois(a, b),
+                                                           egalites={'Devise': DEVISE_DEFAUT})))
+    return pd.concat(flux, ignore_index=True)
+
+
+def autres_devises(debut=None, fin=None):
+    """Devises autres que la devise de base présentes dans les ledgers sur les mois [debut, fin]
+
+    Sans bornes : la période choisie. Leurs montants sont écartés des vues hors Consolidation.
+    """
+    if debut is None and fin is None:
+        debut, fin = periode()
+    devises = set()
+    for nom in SCHEMAS:
+        mois = [m for m in mois_disponibles(nom)
+                if (debut is None or m >= debut) and (fin is None or m <= fin)]
+        devises.update(_agreger(nom, mois, ('Devise',))['Devise'].dropna())
+    return sorted(devises - {DEVISE_DEFAUT})
+
+
+def avertir_devises(debut=None, fin=None, ecartees=True):
+    """Avertit de la présence de devises autres que la devise de base ; retourne ces devises
+
+    `ecartees` : la page ne compte pas leurs montants ; sinon (requêtes libres), c'est à
+    l'utilisateur de filtrer ou de regrouper par devise.
+    """
+    devises = autres_devises(debut, fin)
+    if devises and ecartees:
+        st.warning(f"⚠️ Montants en {DEVISE_DEFAUT} uniquement : les lignes en {', '.join(devises)} sont "
+                   "écartées de cette page. La page 🏢 Consolidation les convertit avec la table des taux.")
+    elif devises:
+        st.warning(f"⚠️ Les données contiennent des lignes en {', '.join(devises)} : leurs montants ne "
+                   f"s'additionnent pas à ceux en {DEVISE_DEFAUT}. Filtrez ou regroupez par `Devise` (les "
+                   f"exemples se limitent à {DEVISE_DEFAUT}) ; la page 🏢 Consolidation les convertit en euros.")
+    return devises
+
+
+def consolidation(statuts=None):
+    """Lignes consolidées en euros par mois et par entité sur la période (voir `finance.consolidation`).
+
+    Les agrégats mensuels par entité et devise sont incrémentaux ; la consolidation est
+    conservée tant que les ledgers, la période, les statuts et les taux sont inchangés.
+    """
+    taux = taux_change()
+
+    def calculer():
+        sommes = {}
+        for nom in SCHEMAS:
+            agg = agregats(nom, DIMENSIONS_CONSOLIDATION)
+            sommes[nom] = agg if statuts is None else agg[agg['Statut'].isin(statuts)]
+        return sommes, consolider(sommes, taux)
+
+    cle_taux = int(pd.util.hash_pandas_object(taux.astype(str), index=False).sum()) if len(taux) else 0
+    return calcul_en_cache('consolidation', calculer, None if statuts is None else tuple(statuts), cle_taux)
+
+
+def calcul_en_cache(nom, calcul, *cle):
+    """Résultat de `calcul()`, conservé en session tant que les ledgers, la période et `cle` sont inchangés"""
+    cle = (tuple(version(ledger) for ledger in SCHEMAS), periode()) + cle
+    cache = st.session_state.setdefault('_calculs', {})
+    if nom not in cache or cache[nom][0] != cle:
+        cache[nom] = (cle, calcul())
+    return cache[nom][1]
+
+
+# --- Modifications ---
+
+def _donnees_modifiees(nom, mois):
+    """Incrémente la version du ledger et libère les agrégats des mois touchés"""
+    if entrepot() is not None:
+        # La génération de l'entrepôt a été incrémentée par l'écriture
+        synchroniser(nom)
+    else:
+        st.session_state.setdefault('_versions', {})[nom] = version(nom) + 1
+        _invalider(nom, mois)
+    return sorted(mois)
+
+
+def _invalider(nom, mois):
+    """Libère les agrégats de la session pour les mois donnés du ledger (tous si None)"""
+    for (ledger, _), agregats_mensuels in st.session_state.get('_agregats', {}).items():
+        if ledger == nom:
+            agregats_mensuels.invalider(mois)
+    if '_rapprochement' in st.session_state:
+        st.session_state._rapprochement.invalider(mois)
+    if '_tresorerie' in st.session_state:
+        st.session_state._tresorerie.invalider(nom, mois)
+    # Le forecast dérive des ledgers : il sera régénéré, ajustements manuels conservés
+    st.session_state.pop('forecast_cle', None)
+
+
+def journal():
+    """Journal des modifications de la session (annuler, rétablir, états passés)"""
+    if '_journal' not in st.session_state:
+        st.session_state._journal = Journal()
+    return st.session_state._journal
+
+
+def _nouveaux_ids(nom, n):
+    """Identifiants stables des `n` prochaines lignes du ledger"""
+    if entrepot() is not None:
+        debut = entrepot().reserver_ids(nom, n)
+    else:
+        compteurs = st.session_state.setdefault('_prochains_ids', {})
+        if nom not in compteurs:
+            ledger = st.session_state[nom]
+            compteurs[nom] = int(ledger.index.max()) + 1 if len(ledger) else 0
+        debut = compteurs[nom]
+        compteurs[nom] = debut + n
+    return pd.RangeIndex(debut, debut + n)
+
+
+def _lire_mois(nom, mois):
+    """Lignes des mois donnés (toutes colonnes), indexées par identifiant"""
+    morceaux = [lire(nom, None, *bornes_mois(a, b)) for a, b in plages(sorted(mois))]
+    return pd.concat(morceaux) if morceaux else ledger_vide(nom)
+
+
+def _executer(operation, journaliser=True):
+    """Applique une opération au ledger ; retourne les mois touchés.
+
+    Dans l'entrepôt, seules les partitions des mois touchés sont réécrites (un ajout
+    ne fait qu'écrire de nouveaux fichiers).
+    """
+    nom = operation.nom
+    mois = mois_de(operation.retirees['Date']) | mois_de(operation.ajoutees['Date'])
+    if entrepot() is not None:
+        if operation.retirees.empty:
+            entrepot().ajouter(nom, operation.ajoutees)
+        else:
+            entrepot().remplacer_partitions(nom, appliquer(_lire_mois(nom, mois), operation),
+                                            [(m.year, m.month) for m in mois])
+    else:
+        st.session_state[nom] = appliquer(st.session_state[nom], operation)
+    if journaliser:
+        journal().enregistrer(operation)
+    return _donnees_modifiees(nom, mois)
+
+
+def ajouter(nom, lignes, libelle=None):
+    """Ajoute des lignes à un ledger ; retourne les mois touchés"""
+    lignes = completer_entite(lignes).set_axis(_nouveaux_ids(nom, len(lignes)))
+    libelle = libelle or f"Ajout de {len(lignes)} ligne(s) – {LIBELLES[nom]}"
+    return _executer(Operation(nom, libelle, ledger_vide(nom), lignes))
+
+
+def remplacer(nom, df, libelle=None):
+    """Remplace le contenu d'un ledger ; retourne les mois touchés (anciens et nouveaux).
+
+    Dans l'entrepôt, partagé par les sessions, seuls les mois couverts par `df` sont
+    remplacés : leurs partitions sont réécrites et le journal ne conserve que leurs
+    anciennes lignes.
+    """
+    df = completer_entite(df).set_axis(_nouveaux_ids(nom, len(df)))
+    libelle = libelle or f"Remplacement – {LIBELLES[nom]} ({len(df)} lignes)"
+    if entrepot() is not None:
+        return _executer(Operation(nom, libelle, _lire_mois(nom, mois_de(df['Date'])), df))
+    operation = Operation(nom, libelle, lire(nom), df)
+    mois = mois_de(operation.retirees['Date']) | mois_de(df['Date'])
+    st.session_state[nom] = df
+    journal().enregistrer(operation)
+    return _donnees_modifiees(nom, mois)
+
+
+def supprimer(nom, index, libelle=None):
+    """Supprime les lignes d'identifiants donnés (index de `lire(nom)`) ; retourne les mois touchés.
+
+    Dans l'entrepôt, seules ces lignes sont lues et seules les partitions des mois concernés
+    sont réécrites.
+    """
+    egalites = {COLONNE_ID: list(index)} if entrepot() is not None else None
+    retirees = lire(nom, egalites=egalites).loc[index]
+    libelle = libelle or f"Suppression de {len(retirees)} ligne(s) – {LIBELLES[nom]}"
+    return _executer(Operation(nom, libelle, retirees, ledger_vide(nom)))
+
+
+def modifier(nom, avant, apres, libelle=None):
+    """Applique en une opération les modifications et suppressions faites sur les lignes `avant`.
+
+    `apres` contient les lignes conservées, à leurs identifiants, avec leurs nouvelles
+    valeurs ; les lignes de `avant` absentes de `apres` sont supprimées. Retourne les mois
+    touchés (liste vide si rien n'a changé).
+    """
+    apres = completer_entite(apres).astype(SCHEMAS[nom])
+    operation = difference(nom, '', avant, apres)
+    if operation.retirees.empty:
+        return []
+    modifiees, supprimees = len(operation.ajoutees), len(operation.retirees) - len(operation.ajoutees)
+    libelle = libelle or f"Modification de {modifiees} et suppression de {supprimees} ligne(s) – {LIBELLES[nom]}"
+    return _executer(replace(operation, libelle=libelle))
+
+
+def annuler():
+    """Défait la dernière opération du journal ; retourne l'opération (None s'il n'y en a pas)"""
+    operation = journal().annuler()
+    if operation is not None:
+        _executer(operation.inverse(), journaliser=False)
+    return operation
+
+
+def retablir():
+    """Refait la dernière opération annulée ; retourne l'opération (None s'il n'y en a pas)"""
+    operation = journal().retablir()
+    if operation is not None:
+        _executer(operation, journaliser=False)
+    return operation
+
+
+def etat_passe(nom, etape):
+    """Mois du ledger touchés par le journal, tels qu'ils étaient après les `etape` premières opérations.
+
+    Les autres mois sont identiques à toutes les étapes : seuls les mois touchés sont lus
+    et reconstitués.
+    """
+    mois = set().union(*(mois_de(operation.retirees['Date']) | mois_de(operation.ajoutees['Date'])
+                         for operation in journal().operations if operation.nom == nom))
+    return journal().reconstituer(nom, _lire_mois(nom, mois), etape)
+
+
+def commandes_journal():
+    """Boutons Annuler / Rétablir de la barre latérale"""
+    operations, annulees = journal().operations, journal().annulees
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        if st.button("↩️ Annuler", key="journal_annuler", disabled=not operations, use_container_width=True,
+                     help=f"Annuler : {operations[-1].libelle}" if operations else None):
+            annuler()
+            st.rerun()
+    with col2:
+        if st.button("↪️ Rétablir", key="journal_retablir", disabled=not annulees, use_container_width=True,
+                     help=f"Rétablir : {annulees[0].libelle}" if annulees else None):
+            retablir()
+            st.rerun()
+
+
+# --- Tâches de fond ---
+
+# Tâches exécutées simultanément par le serveur (les suivantes attendent)
+TACHES_PARALLELES = 2
+
+
+@st.cache_resource
+def executeur():
+    """Exécuteur des tâches de fond, partagé par les sessions du serveur (survit au rafraîchissement)"""
+    return Executeur(TACHES_PARALLELES)
+
+
+def _session():
+    """Identifiant de la session, propriétaire des tâches qu'elle lance"""
+    if '_session' not in st.session_state:
+        st.session_state._session = uuid.uuid4().hex
+    return st.session_state._session
+
+
+def lancer_tache(libelle, fonction, *args, genre='', livraison=None, **kwargs):
+    """Lance `fonction(progression, *args, **kwargs)` en tâche de fond pour la session.
+
+    La fonction ne lit ni ne modifie l'état de session : les données lui sont passées en
+    arguments. `livraison(resultat)` est appelée ensuite par le thread du script de la
+    session (`livrer_taches`) pour remettre le résultat à la couche de données.
+    """
+    return executeur().soumettre(libelle, fonction, *args, genre=genre, proprietaire=_session(),
+                                 livraison=livraison, **kwargs)
+
+
+def taches(genre=None, toutes_sessions=False):
+    """Tâches de la session (ou de toutes les sessions), des plus récentes aux plus anciennes"""
+    return executeur().taches(None if toutes_sessions else _session(), genre)
+
+
+def _livrer(tache):
+    tache.livree = True
+    pics = pics_memoire()
+    pics[f"Tâche {tache.genre}"] = max(pics.get(f"Tâche {tache.genre}", 0), tache.pic_memoire)
+    try:
+        tache.livraison(tache.resultat)
+    except Exception as e:
+        tache.erreur = f"Livraison : {type(e).__name__}: {e}"
+        tache.etat = ECHEC
+
+
+def livrer_taches():
+    """Remet à la session les résultats de ses tâches terminées ; retourne les tâches livrées"""
+    livrees = [tache for tache in taches() if tache.a_livrer]
+    for tache in livrees:
+        _livrer(tache)
+    return livrees
+
+
+def taches_a_recuperer(genre=None):
+    """Tâches terminées lancées par d'autres sessions, dont le résultat n'a pas été livré"""
+    return [tache for tache in taches(genre, toutes_sessions=True)
+            if tache.a_livrer and tache.proprietaire != _session()]
+
+
+def recuperer_tache(identifiant):
+    """Rattache à la session une tâche lancée par une autre (page rafraîchie pendant l'exécution)"""
+    tache = executeur().tache(identifiant)
+    if tache is not None:
+        tache.proprietaire = _session()
+
+
+def calcul_en_arriere_plan(nom, libelle, calcul, *cle):
+    """Variante de `calcul_en_cache` dont le calcul, `calcul(progression)`, est une tâche de fond.
+
+    Retourne (résultat, tâche) : le résultat conservé pour la clé, ou None tant que la
+    tâche lancée pour cette clé n'est pas terminée (la tâche permet d'afficher sa
+    progression ou son erreur).
+    """
+    cle = (tuple(version(ledger) for ledger in SCHEMAS), periode()) + cle
+    cache = st.session_state.setdefault('_calculs', {})
+    if nom in cache and cache[nom][0] == cle:
+        return cache[nom][1], None
+    en_cours = st.session_state.setdefault('_calculs_en_cours', {})
+    cle_tache, identifiant = en_cours.get(nom, (None, None))
+    tache = executeur().tache(identifiant) if identifiant is not None else None
+    if tache is not None and cle_tache != cle:
+        # Clé changée : le calcul en cours est périmé
+        executeur().annuler(tache.id)
+        tache = None
+    if tache is None:
+        def livrer(resultat):
+            # Caches relus à la livraison : ils ont pu être libérés ou remplacés depuis le lancement
+            st.session_state.setdefault('_calculs', {})[nom] = (cle, resultat)
+            calculs_en_cours = st.session_state.setdefault('_calculs_en_cours', {})
+            if calculs_en_cours.get(nom, (None, None))[0] == cle:
+                del calculs_en_cours[nom]
+
+        tache = lancer_tache(libelle, calcul, genre=nom, livraison=livrer)
+        en_cours[nom] = (cle, tache.id)
+    if tache.a_livrer:
+        _livrer(tache)
+    cache = st.session_state.setdefault('_calculs', {})
+    if nom in cache and cache[nom][0] == cle:
+        return cache[nom][1], tache
+    return None, tache
+
+
+def relancer_calcul(nom):
+    """Oublie la tâche du calcul (échouée ou annulée) : le prochain appel la relance"""
+    st.session_state.get('_calculs_en_cours', {}).pop(nom, None)
+
+
+# --- Mémoire de la session ---
+
+# Variable d'environnement fixant le budget mémoire de chaque session (Mo)
+ENV_BUDGET = 'FINANCE_BUDGET_SESSION_MO'
+BUDGET_DEFAUT_MO = 1024
+
+# Catégorie de chaque clé de l'état de session dans le décompte mémoire
+CATEGORIES_MEMOIRE = {
+    **{nom: 'Ledgers' for nom in SCHEMAS},
+    'forecast_data': 'Forecast', 'forecast_base': 'Forecast', '_versions_forecast': 'Forecast',
+    '_journal': 'Journal',
+    '_agregats': 'Caches dérivés', '_calculs': 'Caches dérivés', '_index_mensuel': 'Caches dérivés',
+    '_rapprochement': 'Caches dérivés', '_tresorerie': 'Caches dérivés',
+}
+
+# Caches dérivés, libérés dans cet ordre quand le budget est dépassé (recalculés à la demande)
+CACHES_DERIVES = ['_calculs', '_tresorerie', '_rapprochement', '_index_mensuel', '_agregats']
+
+# Libérations conservées dans l'historique de la page Diagnostics
+LIBERATIONS_CONSERVEES = 100
+
+
+def budget_memoire():
+    """Budget mémoire d'une session, en octets"""
+    return float(os.environ.get(ENV_BUDGET, BUDGET_DEFAUT_MO)) * 1e6
+
+
+def memoire_session(vus=None):
+    """Octets de chaque clé de l'état de session (colonnes Clé, Catégorie, Octets).
+
+    Les ledgers sont mesurés en premier : un objet partagé leur est attribué. `vus`
+    reçoit les objets parcourus (voir `Mesureur.inventaire`).
+    """
+    if '_memoire_mesureur' not in st.session_state:
+        st.session_state._memoire_mesureur = Mesureur()
+    cles = [nom for nom in SCHEMAS if nom in st.session_state]
+    cles += [cle for cle in st.session_state if cle not in cles and not str(cle).startswith('_memoire')]
+    return st.session_state._memoire_mesureur.inventaire({cle: st.session_state[cle] for cle in cles},
+                                                         CATEGORIES_MEMOIRE, vus)
+
+
+def pics_memoire():
+    """Pics de mémoire retenus pour la session : état complet et traitements suivis (octets)"""
+    return st.session_state.setdefault('_memoire_pics', {})
+
+
+@contextmanager
+def suivi_memoire(traitement):
+    """Retient le pic de mémoire résidente atteint pendant le bloc (voir `finance.memoire.pic_memoire`)"""
+    pics = pics_memoire()
+    try:
+        with pic_memoire() as pic:
+            yield
+    finally:
+        # Aussi quand le bloc se termine par st.rerun()
+        pics[traitement] = max(pics.get(traitement, 0), pic.octets)
+
+
+def liberer_caches():
+    """Libère les caches dérivés de la session (recalculés à la demande)"""
+    for cle in CACHES_DERIVES:
+        st.session_state.pop(cle, None)
+
+
+def controler_memoire():
+    """Mesure l'état de la session et fait respecter le budget ; retourne (octets, clés libérées).
+
+    Au-delà du budget, les caches dérivés sont libérés, puis les plus anciennes
+    opérations du journal. Les ledgers et le forecast ne sont jamais libérés.
+    """
+    inventaire = memoire_session()
+    octets = int(inventaire['Octets'].sum())
+    pics = pics_memoire()
+    pics['État de la session'] = max(pics.get('État de la session', 0), octets)
+    budget = budget_memoire()
+    liberes = []
+    tailles = inventaire.set_index('Clé')['Octets']
+    for cle in CACHES_DERIVES:
+        if octets <= budget:
+            break
+        if cle in st.session_state:
+            del st.session_state[cle]
+            octets -= int(tailles.get(cle, 0))
+            liberes.append(cle)
+    mesureur = st.session_state._memoire_mesureur
+    while octets > budget:
+        operation = journal().oublier_plus_ancienne()
+        if operation is None:
+            break
+        # Seul compte ce que l'état ne référence plus (ex. lignes ajoutées encore dans le ledger)
+        vus = set()
+        memoire_session(vus)
+        octets -= mesureur.taille(operation, vus)
+        liberes.append(f"journal : {operation.libelle}")
+    if liberes:
+        historique = st.session_state.setdefault('_memoire_liberations', [])
+        historique.extend((pd.Timestamp.now(), element) for element in liberes)
+        del historique[:-LIBERATIONS_CONSERVEES]
+    return octets, liberes
+
+
+def sources_sql():
+    """Sources des tables SQL : dossiers Parquet de l'entrepôt ou DataFrames de la session"""
+    if entrepot() is None:
+        return {nom: st.session_state[nom] for nom in SCHEMAS}
+    return {nom: entrepot().dossier(nom) if entrepot().existe(nom) else ledger_vide(nom)
+            for nom in SCHEMAS}
+
+
+# --- Période globale ---
+
+def periode():
+    """Mois de début et de fin choisis dans la barre latérale (None : non bornée)"""
+    return st.session_state.get('periode', (None, None))
+
+
+def selecteur_periode():
+    """Sélecteur de période de la barre latérale : tout l'historique, un exercice ou une plage de mois"""
+    mois = sorted(set().union(*(mois_disponibles(nom) for nom in SCHEMAS)))
+    if not mois:
+        st.session_state.periode = (None, None)
+        return
+
+    annees = sorted({m.year for m in mois}, reverse=True)
+    options = ["Tout l'historique"] + [f"Exercice {annee}" for annee in annees] + ["Personnalisée"]
+    choix = st.sidebar.selectbox("📅 Période", options, key="periode_choix")
+    if choix == "Tout l'historique":
+        st.session_state.periode = (None, None)
+    elif choix == "Personnalisée":
+        libelles = [str(m) for m in mois]
+        debut, fin = st.sidebar.select_slider("Mois", libelles, value=(libelles[0], libelles[-1]),
+                                              key="periode_mois")
+        st.session_state.periode = (pd.Period(debut, 'M'), pd.Period(fin, 'M'))
+    else:
+        annee = int(choix.split()[-1])
+        st.session_state.periode = (pd.Period(year=annee, month=1, freq='M'),
+                                    pd.Period(year=annee, month=12, freq='M'))
+
+
+def libelle_periode():
+    """Année(s) couvertes par la période et les données, pour le titre"""
+    debut, fin = periode()
+    if debut is None or fin is None:
+        mois = sorted(set().union(*(mois_disponibles(nom) for nom in SCHEMAS)))
+        if debut is None:
+            debut = mois[0] if mois else None
+        if fin is None:
+            fin = mois[-1] if mois else None
+    if debut is None:
+        return str(pd.Timestamp.today().year)
+    return str(debut.year) if debut.year == fin.year else f"{debut.year}-{fin.year}"
+
+
+def charger_demo():
+    """Remplace les ledgers par les données de démonstration"""
+    for nom, df in donnees_demo().items():
+        remplacer(nom, df)
+
+
+def init_session_state():
+    """Initialise les ledgers vides ; la démo n'est chargée que sur demande (?demo=1)"""
+    for nom in SCHEMAS:
+        if nom not in st.session_state:
+            st.session_state[nom] = ledger_vide(nom)
+    synchroniser()
+
+    if st.query_params.get('demo') == '1' and 'demo_chargee' not in st.session_state:
+        st.session_state.demo_chargee = True
+        if demo_autorisee():
+            charger_demo()
+
+
+def demo_autorisee():
+    """La démo ne doit pas écraser un entrepôt partagé qui contient déjà des données"""
+    return entrepot() is None or ledgers_vides()
+
+
+def ledgers_vides():
+    """Indique si aucune donnée n'a encore été chargée"""
+    if entrepot() is not None:
+        return all(entrepot().nombre_lignes(nom) == 0 for nom in SCHEMAS)
+    return all(len(st.session_state[nom]) == 0 for nom in SCHEMAS)
@@ -0,0 +1,38 @@
+"""Cœur de calcul de l'application, sans dépendance à Streamlit.
+
+Les fonctions travaillent sur les DataFrames des trois ledgers
+(facturation certification, facturation autres, charges diverses) et sont
+utilisées aussi bien par les pages que par la ligne de commande
+(``python -m finance``) et les benchmarks.
+"""
+
+from finance.schemas import (
+    SCHEMAS, CERTIF, AUTRES, CHARGES, LIBELLES, COLONNES_FACTURATION,
+    COLONNES_ENTITE, ENTITE_DEFAUT, DEVISE_DEFAUT, ledger_vide, completer_entite
+)
+from finance.marges import calculer_marge, filtrer, marge_par
+from finance.kpi import KPIs, calculer_kpis, ca_par_statut, repartition_charges
+from finance.agregation import agregation_mensuelle, moyennes_mensuelles
+from finance.prevision import (
+    COLONNES_FORECAST, ParametresForecast, generer_forecast, mois_forecast, libelles_mois,
+    completer_forecast, resume_forecast
+)
+from finance.importation import (
+    FEUILLES, START_ROWS, CANDIDATS, ColonnesManquantes,
+    detect_column, clean_data, detecter_colonnes, colonnes_manquantes,
+    preparer_certif, preparer_autres, preparer_charges, importer_feuille, lire_classeur
+)
+
+__all__ = [
+    'SCHEMAS', 'CERTIF', 'AUTRES', 'CHARGES', 'LIBELLES', 'COLONNES_FACTURATION',
+    'COLONNES_ENTITE', 'ENTITE_DEFAUT', 'DEVISE_DEFAUT',
+    'ledger_vide', 'completer_entite',
+    'calculer_marge', 'filtrer', 'marge_par',
+    'KPIs', 'calculer_kpis', 'ca_par_statut', 'repartition_charges',
+    'agregation_mensuelle', 'moyennes_mensuelles',
+    'COLONNES_FORECAST', 'ParametresForecast', 'generer_forecast', 'mois_forecast', 'libelles_mois',
+    'completer_forecast', 'resume_forecast',
+    'FEUILLES', 'START_ROWS', 'CANDIDATS', 'ColonnesManquantes',
+    'detect_column', 'clean_data', 'detecter_colonnes', 'colonnes_manquantes',
+    'preparer_certif', 'preparer_autres', 'preparer_charges', 'importer_feuille', 'lire_classeur',
+]
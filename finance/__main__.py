@@ -0,0 +1,8 @@
+"""Point d'entrée ``python -m finance`` (voir finance.cli)."""
+
+import sys
+
+from finance.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""Agrégations mensuelles des ledgers."""
+
+import pandas as pd
+
+from finance.schemas import COLONNES_FACTURATION
+
+
+def agregation_mensuelle(df: pd.DataFrame) -> pd.DataFrame:
+    """CA, frais, coûts et marge par mois ('YYYY-MM') d'un ledger de facturation"""
+    monthly = df[['Date'] + COLONNES_FACTURATION].copy()
+    monthly['Mois'] = pd.to_datetime(monthly['Date']).dt.to_period('M')
+    agg = monthly.groupby('Mois').agg({
+        'Montant_Facturation': 'sum',
+        'Frais_Mission': 'sum',
+        'Cout_Auditeur': 'sum'
+    }).reset_index()
+    agg['Marge'] = agg['Montant_Facturation'] - agg['Frais_Mission'] - agg['Cout_Auditeur']
+    agg['Mois'] = agg['Mois'].astype(str)
+    return agg
+
+
+def moyennes_mensuelles(df: pd.DataFrame, colonnes: list[str]) -> pd.Series:
+    """Moyenne des sommes mensuelles de chaque colonne, en un seul groupby
+
+    Les mois sans ligne entre le premier et le dernier mois comptent pour zéro.
+    """
+    return df.groupby(pd.Grouper(key='Date', freq='ME'))[colonnes].sum().mean()
@@ -0,0 +1,109 @@
+"""Contrôle des lignes importées : montants atypiques, marges négatives et doublons.
+
+Tous les contrôles portent sur le lot entier en une passe vectorisée. Un montant est
+atypique si son z-score robuste (écart à la médiane rapporté à l'écart absolu médian)
+dépasse `SEUIL_Z` dans son groupe : client × référentiel (ou type, ou catégorie) si
+le groupe compte au moins `MIN_GROUPE` lignes, sinon référentiel (type, catégorie)
+seul. En certification, le montant comparé est le montant par jour d'audit. Les doublons
+sont repérés par empreinte des colonnes qui identifient une facture, dans le lot et, à
+l'ajout, par rapport aux lignes déjà présentes.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from finance.schemas import SCHEMAS, CERTIF, AUTRES, CHARGES
+
+SEUIL_Z = 3.5
+MIN_GROUPE = 8
+
+# Constante qui rend l'écart absolu médian comparable à un écart-type (loi normale)
+CONSTANTE_MAD = 0.6745
+
+# Montant contrôlé et groupes de comparaison, du plus fin au plus large
+GROUPES = {
+    CERTIF: ('Montant_Facturation', ['Client', 'Référentiel'], ['Référentiel']),
+    AUTRES: ('Montant_Facturation', ['Client', 'Type'], ['Type']),
+    CHARGES: ('Montant', ['Catégorie', 'Description'], ['Catégorie']),
+}
+
+# Colonnes qui identifient une facture (ou une charge) pour la recherche de doublons
+CLES_DOUBLONS = {
+    CERTIF: ['Date', 'Client', 'Référentiel', 'Montant_Facturation'],
+    AUTRES: ['Date', 'Client', 'Type', 'Montant_Facturation'],
+    CHARGES: ['Date', 'Catégorie', 'Description', 'Montant'],
+}
+
+# Contrôles, dans l'ordre du rapport
+CONTROLES = {
+    'Montant_Atypique': "Montant atypique",
+    'Marge_Negative': "Marge négative",
+    'Doublon': "Doublon",
+}
+
+
+def zscores_robustes(valeurs: pd.Series, groupes: list[pd.Series]) -> np.ndarray:
+    """Z-score robuste de chaque valeur dans son groupe (0 si l'écart absolu médian est nul)"""
+    mediane = valeurs.groupby(groupes, sort=False, dropna=False).transform('median')
+    ecart = (valeurs - mediane).abs()
+    mad = ecart.groupby(groupes, sort=False, dropna=False).transform('median').to_numpy()
+    return np.divide(CONSTANTE_MAD * (valeurs - mediane).to_numpy(), mad,
+                     out=np.zeros(len(valeurs)), where=mad > 0)
+
+
+def empreintes(df: pd.DataFrame, nom: str) -> np.ndarray:
+    """Empreinte 64 bits des colonnes d'identification de chaque ligne"""
+    colonnes = CLES_DOUBLONS[nom]
+    cles = df[colonnes].astype({col: SCHEMAS[nom][col] for col in colonnes})
+    return pd.util.hash_pandas_object(cles, index=False).to_numpy()
+
+
+def detecter_anomalies(df: pd.DataFrame, nom: str, existant: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Contrôles de chaque ligne du lot (même index) : un booléen par contrôle et le z-score
+
+    `existant` : lignes déjà présentes dans le ledger, pour signaler les doublons d'un ajout.
+    """
+    montant, fins, larges = GROUPES[nom]
+    valeurs = df[montant].astype(float)
+    if nom == CERTIF:
+        # Tarif journalier : une demi-journée d'audit n'est pas un montant atypique
+        duree = df['Durée'].astype(float)
+        valeurs = valeurs.where(~(duree > 0), valeurs / duree)
+    z = zscores_robustes(valeurs, [df[col] for col in fins])
+    taille = valeurs.groupby([df[col] for col in fins], sort=False, dropna=False).transform('size').to_numpy()
+    z = np.where(taille >= MIN_GROUPE, z, zscores_robustes(valeurs, [df[col] for col in larges]))
+
+    if nom == CHARGES:
+        marge_negative = np.zeros(len(df), dtype=bool)
+    else:
+        marge = df[montant].astype(float) - df['Frais_Mission'].astype(float) - df['Cout_Auditeur'].astype(float)
+        marge_negative = (marge < 0).to_numpy()
+
+    cles = empreintes(df, nom)
+    doublon = pd.Series(cles).duplicated().to_numpy()
+    if existant is not None and len(existant):
+        doublon |= np.isin(cles, empreintes(existant, nom))
+
+    return pd.DataFrame({
+        'Montant_Atypique': np.abs(z) > SEUIL_Z,
+        'Marge_Negative': marge_negative,
+        'Doublon': doublon,
+        'Score_Z': z,
+    }, index=df.index)
+
+
+def resume_anomalies(controles: pd.DataFrame) -> dict[str, int]:
+    """Nombre de lignes signalées par contrôle"""
+    return {colonne: int(controles[colonne].sum()) for colonne in CONTROLES}
+
+
+def lignes_signalees(df: pd.DataFrame, controles: pd.DataFrame) -> pd.DataFrame:
+    """Lignes signalées par au moins un contrôle, avec la liste des contrôles et le z-score"""
+    signales = controles[list(CONTROLES)]
+    masque = signales.any(axis=1).to_numpy()
+    libelles = pd.Series('', index=df.index[masque])
+    for colonne, libelle in CONTROLES.items():
+        libelles += np.where(signales[colonne].to_numpy()[masque], libelle + ', ', '')
+    return df[masque].assign(Anomalies=libelles.str[:-2], Score_Z=controles['Score_Z'][masque].round(1))
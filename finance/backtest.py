@@ -0,0 +1,119 @@
+"""Backtesting des modèles de forecast sur l'historique, à origines glissantes.
+
+Pour chaque origine (mois de fin d'un historique tronqué), le modèle prévoit les
+`horizon` mois suivants, comparés aux sommes réellement constatées. Les deux
+moteurs de la page Forecast sont évalués sur toutes les origines à la fois :
+
+- « Moyenne + croissance » : moyennes mensuelles jusqu'à l'origine (sommes cumulées),
+  chaque série à partir de son premier mois non nul comme `generer_forecast` qui
+  moyenne chaque ledger sur sa propre durée, x (1 + croissance) ** h ;
+- « Saisonnier » : un seul passage du lissage sur l'historique, qui conserve à chaque
+  origine les états du meilleur paramétrage (voir `finance.lissage`).
+
+Les erreurs sont résumées par ligne en MAPE (erreur absolue moyenne en % du réalisé)
+et en biais (écart cumulé en % du réalisé : positif = surestimation).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from finance.lissage import SAISON, _lisser, _projeter
+from finance.prevision import ParametresForecast
+
+MOYENNE = 'Moyenne + croissance'
+SAISONNIER = 'Saisonnier'
+
+# Historique minimal du lissage (deux mois pour initialiser la tendance)
+ORIGINE_MIN = 2
+
+
+def taux_croissance(colonnes: list[str], params: ParametresForecast) -> np.ndarray:
+    """Croissance mensuelle (fraction) appliquée à chaque ligne par le modèle moyenne + croissance"""
+    taux = {'CA_Certification': params.croissance_ca_certif, 'CA_Autres': params.croissance_ca_autres}
+    return np.array([taux.get(colonne, params.croissance_charges) for colonne in colonnes]) / 100
+
+
+def prevoir_moyenne(y: np.ndarray, origines: np.ndarray, croissance: np.ndarray, horizon: int) -> np.ndarray:
+    """Prévisions (origines, séries, horizon) du modèle moyenne + croissance
+
+    La moyenne d'une série court de son premier mois non nul à l'origine : les mois
+    antérieurs au début de son ledger ne la diluent pas.
+    """
+    cumul = np.cumsum(y, axis=1)                                        # (séries, mois)
+    debut = np.argmax(y != 0, axis=1)                                   # (séries,) 0 si série nulle
+    duree = np.maximum(origines[None, :] - debut[:, None], 1)          # (séries, origines)
+    moyennes = (cumul[:, origines - 1] / duree).T                      # (origines, séries)
+    facteurs = (1 + croissance[:, None]) ** np.arange(1, horizon + 1)  # (séries, horizon)
+    return moyennes[:, :, None] * facteurs
+
+
+def prevoir_saisonnier(y: np.ndarray, origines: np.ndarray, horizon: int) -> np.ndarray:
+    """Prévisions (origines, séries, horizon) du lissage ajusté à chaque origine
+
+    Comme `ajuster`, la saisonnalité n'est estimée qu'à partir de deux saisons d'historique.
+    """
+    prevision = np.empty((len(origines), y.shape[0], horizon))
+    for saisonnier, selection in ((False, origines < 2 * SAISON), (True, origines >= 2 * SAISON)):
+        if not selection.any():
+            continue
+        etats = _lisser(y[:, :origines[selection].max()], saisonnier, origines[selection])
+        prevision[selection] = _projeter(etats['niveau'], etats['tendance'], etats['saisons'],
+                                         etats['parametres'][..., 3], origines[selection] % SAISON, horizon)
+    return prevision
+
+
+def _realise(y: np.ndarray, origines: np.ndarray, horizon: int) -> np.ndarray:
+    """Sommes constatées (origines, séries, horizon), NaN au-delà de l'historique"""
+    mois = origines[:, None] + np.arange(horizon)                       # (origines, horizon)
+    complet = np.concatenate([y, np.full((y.shape[0], horizon), np.nan)], axis=1)
+    return complet[:, mois].transpose(1, 0, 2)
+
+
+def erreurs(prevision: np.ndarray, realise: np.ndarray, axe=(0, 2)) -> dict[str, np.ndarray]:
+    """MAPE et biais (%) sur les axes donnés ; les mois sans réalisé positif sont ignorés du MAPE"""
+    valide = ~np.isnan(realise)
+    ecart = np.where(valide, prevision - realise, 0.0)
+    reel = np.where(valide, realise, 0.0)
+    positif = reel > 0
+    ape = np.divide(np.abs(ecart), reel, out=np.zeros_like(reel), where=positif)
+    points = positif.sum(axis=axe)
+    total = reel.sum(axis=axe)
+    return {
+        'MAPE': np.divide(ape.sum(axis=axe), points, out=np.full(points.shape, np.nan), where=points > 0) * 100,
+        'Biais': np.divide(ecart.sum(axis=axe), total, out=np.full(total.shape, np.nan), where=total > 0) * 100,
+        'Points': points,
+    }
+
+
+def backtester(series: pd.DataFrame, horizon: int, params: Optional[ParametresForecast] = None,
+               origine_min: int = SAISON, workers: int = 2) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Backtest des deux modèles sur les sommes mensuelles `series` (une colonne par ligne)
+
+    Origines : de `origine_min` mois d'historique jusqu'à l'avant-dernier mois. Les deux
+    modèles sont évalués en parallèle. Renvoie les erreurs par ligne (Modèle, Ligne, MAPE,
+    Biais, Points) et le MAPE par horizon (index : 1..horizon, une colonne par modèle).
+    """
+    params = params or ParametresForecast(nb_mois=horizon)
+    y = series.to_numpy(dtype=float).T
+    origines = np.arange(max(origine_min, ORIGINE_MIN), y.shape[1])
+    if len(origines) == 0:
+        raise ValueError(f"Historique trop court pour un backtest ({y.shape[1]} mois)")
+
+    realise = _realise(y, origines, horizon)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        moyenne = pool.submit(prevoir_moyenne, y, origines, taux_croissance(list(series.columns), params), horizon)
+        saisonnier = pool.submit(prevoir_saisonnier, y, origines, horizon)
+        previsions = {MOYENNE: moyenne.result(), SAISONNIER: saisonnier.result()}
+
+    par_ligne = pd.concat([
+        pd.DataFrame({'Modèle': modele, 'Ligne': series.columns, **erreurs(prevision, realise)})
+        for modele, prevision in previsions.items()
+    ], ignore_index=True)
+    par_horizon = pd.DataFrame(
+        {modele: erreurs(prevision, realise, axe=(0, 1))['MAPE'] for modele, prevision in previsions.items()},
+        index=pd.RangeIndex(1, horizon + 1, name='Horizon'),
+    )
+    return par_ligne, par_horizon
@@ -0,0 +1,73 @@
+"""Capacité des auditeurs : jours d'audit, taux journaliers et utilisation.
+
+Calculé à partir de la durée (jours) et du coût auditeur des facturations
+certification, sommés par mois (agrégats mensuels ou ledger), puis projeté sur
+le CA certification prévu par le forecast.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ParametresCapacite:
+    auditeurs: float = 3.0        # équivalents temps plein
+    jours_par_mois: float = 18.0  # jours d'audit disponibles par auditeur et par mois
+
+    @property
+    def capacite_mensuelle(self) -> float:
+        return self.auditeurs * self.jours_par_mois
+
+
+def _ratio(numerateur: pd.Series, denominateur: pd.Series) -> pd.Series:
+    return pd.Series(np.divide(numerateur, denominateur, out=np.full(len(numerateur), np.nan),
+                               where=denominateur.to_numpy() > 0), index=numerateur.index)
+
+
+def _indicateurs(sommes: pd.DataFrame) -> pd.DataFrame:
+    """Ratios par jour d'audit à partir des sommes de Durée, CA et coût auditeur"""
+    return pd.DataFrame({
+        'Jours_Audit': sommes['Durée'],
+        'CA': sommes['Montant_Facturation'],
+        'Cout_Auditeur': sommes['Cout_Auditeur'],
+        'Cout_par_Jour': _ratio(sommes['Cout_Auditeur'], sommes['Durée']),
+        'CA_par_Jour': _ratio(sommes['Montant_Facturation'], sommes['Durée']),
+        'Marge_par_Jour': _ratio(sommes['Montant_Facturation'] - sommes['Cout_Auditeur'], sommes['Durée']),
+    })
+
+
+def capacite_mensuelle(certif: pd.DataFrame, params: ParametresCapacite) -> pd.DataFrame:
+    """Indicateurs par mois (index : périodes mensuelles contiguës) et utilisation de la capacité (%)"""
+    colonnes = ['Durée', 'Montant_Facturation', 'Cout_Auditeur']
+    sommes = certif.groupby(certif['Date'].dt.to_period('M'))[colonnes].sum()
+    if len(sommes):
+        sommes = sommes.reindex(pd.period_range(sommes.index.min(), sommes.index.max(), freq='M'), fill_value=0.0)
+    mensuel = _indicateurs(sommes).rename_axis('Mois')
+    mensuel['Capacite_Jours'] = params.capacite_mensuelle
+    mensuel['Utilisation_Pct'] = mensuel['Jours_Audit'] / params.capacite_mensuelle * 100
+    return mensuel
+
+
+def capacite_par(certif: pd.DataFrame, cle: str) -> pd.DataFrame:
+    """Jours d'audit et ratios par jour regroupés par `cle` (Référentiel, Client...)"""
+    sommes = certif.groupby(cle)[['Durée', 'Montant_Facturation', 'Cout_Auditeur']].sum()
+    return _indicateurs(sommes).sort_values('Jours_Audit', ascending=False).reset_index()
+
+
+def besoins_capacite(ca_prevu: pd.Series, mensuel: pd.DataFrame, params: ParametresCapacite,
+                     mois_reference: int = 6) -> pd.DataFrame:
+    """Jours d'audit et auditeurs nécessaires pour réaliser le CA certification prévu
+
+    Le CA par jour d'audit est celui des `mois_reference` derniers mois de l'historique.
+    """
+    recent = mensuel.iloc[-mois_reference:]
+    jours = recent['Jours_Audit'].sum()
+    ca_par_jour = recent['CA'].sum() / jours if jours > 0 else np.nan
+    besoins = pd.DataFrame({'CA_Prevu': ca_prevu.astype(float)})
+    besoins['Jours_Requis'] = besoins['CA_Prevu'] / ca_par_jour
+    besoins['Auditeurs_Requis'] = besoins['Jours_Requis'] / params.jours_par_mois
+    besoins['Utilisation_Pct'] = besoins['Jours_Requis'] / params.capacite_mensuelle * 100
+    besoins['Ecart_Auditeurs'] = besoins['Auditeurs_Requis'] - params.auditeurs
+    return besoins
@@ -0,0 +1,120 @@
+"""Cube des charges et vues qui en dérivent : évolution mensuelle et budget / réalisé.
+
+Le cube rassemble par mois les trois natures de charges : frais de mission et coûts
+auditeurs des deux ledgers de facturation (catégorie : ledger d'origine) et charges
+diverses par catégorie, avec leur statut. Il est assemblé à partir des sommes
+mensuelles des ledgers (voir `etat.cube_charges`), si bien que le Dashboard et la page
+Charges lisent les mêmes montants ; les vues par mois, par poste ou par catégorie ne
+font que regrouper ses quelques lignes.
+"""
+
+from pathlib import Path
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from finance.schemas import CERTIF, AUTRES, LIBELLES
+
+FRAIS_MISSION = 'Frais Mission'
+COUT_AUDITEURS = 'Coût Auditeurs'
+CHARGES_DIVERSES = 'Charges Diverses'
+POSTES = [FRAIS_MISSION, COUT_AUDITEURS, CHARGES_DIVERSES]
+
+# Colonnes des ledgers de facturation reprises dans le cube, par poste
+COLONNES_POSTES = {FRAIS_MISSION: 'Frais_Mission', COUT_AUDITEURS: 'Cout_Auditeur'}
+
+COLONNES_CUBE = ['Date', 'Poste', 'Catégorie', 'Statut', 'Montant']
+COLONNES_BUDGET = ['Ligne', 'Budget_Mensuel']
+
+
+def assembler_cube(certif: pd.DataFrame, autres: pd.DataFrame, charges: pd.DataFrame) -> pd.DataFrame:
+    """Cube Date (premier jour du mois) × Poste × Catégorie × Statut des montants de charges
+
+    `certif` et `autres` : sommes mensuelles par statut des ledgers de facturation ;
+    `charges` : sommes mensuelles des charges diverses par catégorie et statut.
+    """
+    parties = [
+        pd.DataFrame({'Date': agg['Date'], 'Poste': poste, 'Catégorie': LIBELLES[nom],
+                      'Statut': agg['Statut'], 'Montant': agg[colonne]})
+        for nom, agg in ((CERTIF, certif), (AUTRES, autres))
+        for poste, colonne in COLONNES_POSTES.items()
+    ]
+    parties.append(charges.assign(Poste=CHARGES_DIVERSES)[COLONNES_CUBE])
+    cube = pd.concat(parties, ignore_index=True).astype({'Montant': 'float64'})
+    return cube.sort_values(['Date', 'Poste', 'Catégorie'], ignore_index=True)
+
+
+def totaux_postes(cube: pd.DataFrame) -> pd.Series:
+    """Montant de chaque poste (index : POSTES, zéro pour un poste absent)"""
+    return cube.groupby('Poste')['Montant'].sum().reindex(POSTES, fill_value=0.0)
+
+
+def lignes_budgetaires(cube: pd.DataFrame) -> pd.Series:
+    """Ligne budgétaire de chaque ligne du cube : catégorie des charges diverses, poste sinon"""
+    return cube['Catégorie'].where(cube['Poste'] == CHARGES_DIVERSES, cube['Poste'])
+
+
+def evolution_mensuelle(cube: pd.DataFrame, dimension: str = 'Poste') -> pd.DataFrame:
+    """Montants par mois (index : Mois) et par valeur de `dimension` ('Poste', 'Catégorie' ou 'Ligne')
+
+    Les mois sans charge entre le premier et le dernier valent zéro. Colonnes ajoutées :
+    Total, Variation (écart au mois précédent) et Variation_Pct.
+    """
+    detail = cube.assign(Mois=cube['Date'].dt.to_period('M'), Ligne=lignes_budgetaires(cube))
+    table = detail.pivot_table(index='Mois', columns=dimension, values='Montant', aggfunc='sum', fill_value=0.0)
+    if len(table):
+        table = table.reindex(pd.period_range(table.index.min(), table.index.max(), freq='M'), fill_value=0.0)
+    if dimension == 'Poste':
+        table = table.reindex(columns=POSTES, fill_value=0.0)
+    table = table.rename_axis(index='Mois', columns=None)
+    table['Total'] = table.sum(axis=1)
+    precedent = table['Total'].shift()
+    table['Variation'] = table['Total'] - precedent
+    table['Variation_Pct'] = np.divide(table['Variation'], precedent.abs(), out=np.full(len(table), np.nan),
+                                       where=precedent.fillna(0).to_numpy() != 0) * 100
+    return table
+
+
+def budget_realise(cube: pd.DataFrame, budget: pd.DataFrame, mois: Iterable[pd.Period],
+                   statuts: Iterable[str], par: str = 'Ligne') -> pd.DataFrame:
+    """Budget et réalisé des mois donnés, par ligne budgétaire ou par mois (`par` : 'Ligne' ou 'Mois')
+
+    Le budget d'une ligne est mensuel. Le réalisé compte les lignes aux `statuts`, le prévu
+    les autres. Colonnes : `par`, Budget, Réalisé, Prévu, Ecart (réalisé − budget) et
+    Consomme_Pct (réalisé en % du budget).
+    """
+    mois = pd.PeriodIndex(list(mois), freq='M')
+    detail = cube.assign(Mois=cube['Date'].dt.to_period('M'), Ligne=lignes_budgetaires(cube))
+    detail = detail[detail['Mois'].isin(mois)]
+    realise = detail['Statut'].isin(list(statuts))
+    detail = detail.assign(Réalisé=detail['Montant'].where(realise, 0.0),
+                           Prévu=detail['Montant'].where(~realise, 0.0))
+    montants = detail.groupby(['Mois', 'Ligne'])[['Réalisé', 'Prévu']].sum()
+
+    budgets = budget.dropna().groupby('Ligne')['Budget_Mensuel'].sum()
+    grille = pd.MultiIndex.from_product([mois, budgets.index], names=['Mois', 'Ligne'])
+    table = montants.reindex(montants.index.union(grille), fill_value=0.0)
+    table['Budget'] = table.index.get_level_values('Ligne').map(budgets).fillna(0.0).to_numpy()
+
+    table = table.groupby(level=par)[['Budget', 'Réalisé', 'Prévu']].sum()
+    table['Ecart'] = table['Réalisé'] - table['Budget']
+    table['Consomme_Pct'] = np.divide(table['Réalisé'], table['Budget'], out=np.full(len(table), np.nan),
+                                      where=table['Budget'].to_numpy() != 0) * 100
+    return table.reset_index()
+
+
+def budget_vide() -> pd.DataFrame:
+    return pd.DataFrame({'Ligne': pd.Series(dtype='object'), 'Budget_Mensuel': pd.Series(dtype='float64')})
+
+
+def lire_budget(chemin: Union[str, Path]) -> pd.DataFrame:
+    """Budget mensuel enregistré en CSV (vide si le fichier n'existe pas)"""
+    if not Path(chemin).exists():
+        return budget_vide()
+    return pd.read_csv(chemin, dtype={'Ligne': str, 'Budget_Mensuel': float})[COLONNES_BUDGET]
+
+
+def ecrire_budget(budget: pd.DataFrame, chemin: Union[str, Path]):
+    Path(chemin).parent.mkdir(parents=True, exist_ok=True)
+    budget[COLONNES_BUDGET].to_csv(chemin, index=False)
@@ -0,0 +1,170 @@
+"""Traitement par lot : KPIs et forecast de nombreux classeurs, en parallèle.
+
+Chaque classeur passe par l'import automatique (feuilles 'Facturation-Certif',
+'Facturation-Autres' et 'FRAIS DIVERS') et ses contrôles, puis ses KPIs du Dashboard,
+son agrégation mensuelle, son forecast et ses lignes signalées sont écrits dans un
+dossier de rapports. Comme sur le Dashboard, seules les lignes en devise de base sont
+additionnées ; les autres devises présentes sont indiquées dans la synthèse.
+
+    python -m finance classeurs/*.xlsx --sortie rapports --jobs 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from finance.schemas import CERTIF, AUTRES, CHARGES, ledger_vide
+from finance.importation import lire_classeur
+from finance.consolidation import en_devise_base, autres_devises
+from finance.anomalies import CONTROLES, detecter_anomalies, lignes_signalees
+from finance.kpi import calculer_kpis
+from finance.agregation import agregation_mensuelle
+from finance.prevision import ParametresForecast, generer_forecast, completer_forecast, resume_forecast
+
+EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+
+def lister_classeurs(chemins: list[str]) -> list[Path]:
+    """Développe les dossiers en classeurs Excel, en ignorant les fichiers temporaires d'Excel et les doublons"""
+    classeurs, vus = [], set()
+    for chemin in map(Path, chemins):
+        if chemin.is_dir():
+            trouves = sorted(p for p in chemin.iterdir()
+                             if p.suffix.lower() in EXTENSIONS and not p.name.startswith('~$'))
+        else:
+            trouves = [chemin]
+        for classeur in trouves:
+            if classeur.resolve() not in vus:
+                vus.add(classeur.resolve())
+                classeurs.append(classeur)
+    return classeurs
+
+
+def noms_rapports(classeurs: list[Path]) -> list[str]:
+    """Nom de l'entité et du dossier de rapports de chaque classeur, uniques dans le lot
+
+    Le nom du fichier suffit en général ; deux classeurs de même nom dans des dossiers
+    différents sont préfixés par leur dossier, et un numéro départage les cas restants.
+    """
+    stems = [chemin.stem for chemin in classeurs]
+    noms = [chemin.stem if stems.count(chemin.stem) == 1 else f"{chemin.parent.name}_{chemin.stem}"
+            for chemin in classeurs]
+    vus: dict[str, int] = {}
+    uniques = []
+    for nom in noms:
+        vus[nom] = vus.get(nom, 0) + 1
+        uniques.append(nom if noms.count(nom) == 1 else f"{nom}_{vus[nom]}")
+    return uniques
+
+
+def traiter_classeur(chemin: Path, params: ParametresForecast, sortie: Optional[Path],
+                     nom: Optional[str] = None) -> dict:
+    """Importe un classeur, calcule KPIs et forecast, écrit ses rapports ; retourne la ligne de synthèse
+
+    `nom` : entité et dossier de rapports (par défaut le nom du fichier, voir `noms_rapports`).
+    """
+    debut = time.perf_counter()
+    nom = chemin.stem if nom is None else nom
+    ligne = {'classeur': str(chemin), 'entite': nom}
+    try:
+        ledgers = lire_classeur(chemin)
+        certif = ledgers.get(CERTIF, ledger_vide(CERTIF))
+        autres = ledgers.get(AUTRES, ledger_vide(AUTRES))
+        charges = ledgers.get(CHARGES, ledger_vide(CHARGES))
+
+        ligne['devises_ecartees'] = ', '.join(autres_devises([certif, autres, charges]))
+        certif, autres, charges = en_devise_base(certif), en_devise_base(autres), en_devise_base(charges)
+
+        kpis = calculer_kpis(certif, autres, charges)
+        ligne.update({f'lignes_{nom}': len(df) for nom, df in ledgers.items()})
+        controles = {nom: detecter_anomalies(df, nom) for nom, df in ledgers.items()}
+        ligne.update({f'anomalies_{nom}': int(c[list(CONTROLES)].any(axis=1).sum()) for nom, c in controles.items()})
+        ligne.update(kpis.en_dict())
+
+        forecast = None
+        if len(certif) or len(autres):
+            forecast = completer_forecast(generer_forecast(certif, autres, charges, params))
+            ligne.update({f'forecast_{nom}': valeur for nom, valeur in resume_forecast(forecast).items()})
+
+        if sortie is not None:
+            dossier = sortie / nom
+            dossier.mkdir(parents=True, exist_ok=True)
+            with open(dossier / 'kpis.json', 'w', encoding='utf-8') as f:
+                json.dump(kpis.en_dict(), f, ensure_ascii=False, indent=2)
+            mensuel = pd.concat({
+                'certification': agregation_mensuelle(certif),
+                'autres': agregation_mensuelle(autres),
+            }, names=['Ligne']).reset_index(level=0)
+            mensuel.to_csv(dossier / 'mensuel.csv', index=False)
+            if forecast is not None:
+                forecast.to_csv(dossier / 'forecast.csv', index=False)
+            signalees = [lignes_signalees(ledgers[nom], c).assign(Ledger=nom) for nom, c in controles.items()]
+            if signalees:
+                pd.concat(signalees, ignore_index=True).to_csv(dossier / 'anomalies.csv', index=False)
+
+        ligne['statut'] = 'ok'
+    except Exception as e:
+        ligne['statut'] = 'erreur'
+        ligne['erreur'] = f"{type(e).__name__}: {e}"
+    ligne['duree_s'] = round(time.perf_counter() - debut, 3)
+    return ligne
+
+
+def traiter_lot(classeurs: list[Path], params: ParametresForecast, sortie: Optional[Path] = None,
+                jobs: int = 1) -> pd.DataFrame:
+    """Traite les classeurs sur `jobs` processus ; retourne la synthèse dans l'ordre des classeurs"""
+    noms = noms_rapports(classeurs)
+    if jobs <= 1 or len(classeurs) <= 1:
+        lignes = [traiter_classeur(chemin, params, sortie, nom) for chemin, nom in zip(classeurs, noms)]
+    else:
+        lignes = [None] * len(classeurs)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(classeurs))) as pool:
+            futures = {pool.submit(traiter_classeur, chemin, params, sortie, nom): i
+                       for i, (chemin, nom) in enumerate(zip(classeurs, noms))}
+            for future in as_completed(futures):
+                lignes[futures[future]] = future.result()
+    return pd.DataFrame(lignes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('classeurs', nargs='+', help="Classeurs Excel ou dossiers en contenant")
+    parser.add_argument('--sortie', type=Path, default=None,
+                        help="Dossier des rapports (un sous-dossier par classeur et synthese.csv)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument('--mois', type=int, default=6, help="Nombre de mois à prévoir")
+    parser.add_argument('--croissance-certif', type=float, default=3.0, help="Croissance CA Certif (%%/mois)")
+    parser.add_argument('--croissance-autres', type=float, default=2.0, help="Croissance CA Autres (%%/mois)")
+    parser.add_argument('--croissance-charges', type=float, default=1.5, help="Croissance Charges (%%/mois)")
+    args = parser.parse_args(argv)
+
+    classeurs = lister_classeurs(args.classeurs)
+    if not classeurs:
+        parser.error("aucun classeur trouvé")
+    params = ParametresForecast(args.mois, args.croissance_certif, args.croissance_autres, args.croissance_charges)
+
+    debut = time.perf_counter()
+    synthese = traiter_lot(classeurs, params, args.sortie, args.jobs)
+    duree = time.perf_counter() - debut
+
+    if args.sortie is not None:
+        args.sortie.mkdir(parents=True, exist_ok=True)
+        synthese.to_csv(args.sortie / 'synthese.csv', index=False)
+
+    colonnes = [c for c in ['entite', 'statut', 'ca_total', 'charges_total', 'resultat', 'marge_nette',
+                            'forecast_ca_total', 'forecast_resultat', 'duree_s', 'erreur'] if c in synthese.columns]
+    print(synthese[colonnes].round(1).to_string(index=False))
+    erreurs = int((synthese['statut'] == 'erreur').sum())
+    print(f"\n{len(synthese)} classeur(s) traité(s) en {duree:.1f} s, {erreurs} erreur(s)")
+    if 'devises_ecartees' in synthese.columns:
+        for entite, devises in synthese[['entite', 'devises_ecartees']].dropna().itertuples(index=False):
+            if devises:
+                print(f"{entite} : lignes en {devises} écartées des totaux (devise de base seulement)")
+    return 1 if erreurs else 0
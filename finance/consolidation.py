@@ -0,0 +1,142 @@
+"""Consolidation multi-entités et multi-devises des trois ledgers.
+
+Chaque ligne porte une entité juridique et une devise. Les agrégats mensuels par
+entité et devise sont convertis en euros par jointure avec une grille de taux
+(Devise × Mois), puis sommés par mois et par entité en un seul regroupement.
+Le taux d'un mois sans cotation est le dernier taux connu de la devise (ou, avant
+la première cotation, le premier).
+
+Hors consolidation (Dashboard, pages de facturation, forecast, trésorerie, traitement
+par lot), seules les lignes en devise de base sont additionnées : les montants des
+autres devises sont écartés et signalés plutôt que sommés tels quels en euros.
+"""
+
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from finance.schemas import CERTIF, AUTRES, CHARGES, DEVISE_DEFAUT
+
+# Table des taux : 1 unité de la devise vaut `Taux` euros sur le mois
+COLONNES_TAUX = ['Devise', 'Mois', 'Taux']
+
+# Dimensions des agrégats consolidés (en plus du mois)
+DIMENSIONS_CONSOLIDATION = ('Entité', 'Devise', 'Statut')
+
+# Montants convertis de chaque ledger et ligne consolidée correspondante
+LIGNES_LEDGERS = {
+    CERTIF: {'Montant_Facturation': 'CA_Certification', 'Frais_Mission': 'Frais_Mission',
+             'Cout_Auditeur': 'Cout_Auditeur'},
+    AUTRES: {'Montant_Facturation': 'CA_Autres', 'Frais_Mission': 'Frais_Mission',
+             'Cout_Auditeur': 'Cout_Auditeur'},
+    CHARGES: {'Montant': 'Charges_Diverses'},
+}
+LIGNES_CONSOLIDEES = ['CA_Certification', 'CA_Autres', 'Frais_Mission', 'Cout_Auditeur', 'Charges_Diverses',
+                      'CA_Total', 'Charges_Totales', 'Resultat', 'Marge_Pct']
+
+
+def en_devise_base(df: pd.DataFrame) -> pd.DataFrame:
+    """Lignes du ledger en devise de base, les seules additionnées hors consolidation"""
+    return df[df['Devise'] == DEVISE_DEFAUT]
+
+
+def autres_devises(ledgers: list[pd.DataFrame]) -> list[str]:
+    """Devises autres que la devise de base présentes dans les ledgers, triées"""
+    devises = set().union(*(df['Devise'].dropna().unique() for df in ledgers))
+    return sorted(devises - {DEVISE_DEFAUT})
+
+
+def taux_vide() -> pd.DataFrame:
+    return pd.DataFrame({'Devise': pd.Series(dtype='object'), 'Mois': pd.Series(dtype='period[M]'),
+                         'Taux': pd.Series(dtype='float64')})
+
+
+def lire_taux(chemin: Union[str, Path]) -> pd.DataFrame:
+    """Table des taux enregistrée en CSV (vide si le fichier n'existe pas)"""
+    if not Path(chemin).exists():
+        return taux_vide()
+    taux = pd.read_csv(chemin, dtype={'Devise': str, 'Mois': str, 'Taux': float})
+    return taux.assign(Mois=pd.PeriodIndex(taux['Mois'], freq='M'))[COLONNES_TAUX]
+
+
+def ecrire_taux(taux: pd.DataFrame, chemin: Union[str, Path]):
+    Path(chemin).parent.mkdir(parents=True, exist_ok=True)
+    taux.assign(Mois=taux['Mois'].astype(str))[COLONNES_TAUX].to_csv(chemin, index=False)
+
+
+def grille_taux(taux: pd.DataFrame, mois: pd.PeriodIndex) -> pd.DataFrame:
+    """Taux de chaque devise cotée pour chaque mois demandé (colonnes Devise, Mois, Taux)
+
+    L'euro vaut toujours 1 ; les mois sans cotation prennent le dernier taux connu.
+    """
+    taux = taux.dropna(subset=COLONNES_TAUX)
+    taux = taux[taux['Devise'] != DEVISE_DEFAUT]
+    cotes = taux.pivot_table(index='Mois', columns='Devise', values='Taux', aggfunc='last')
+    tous = cotes.index.union(pd.PeriodIndex(mois, freq='M')).sort_values()
+    grille = cotes.reindex(tous).ffill().bfill().loc[mois]
+    grille[DEVISE_DEFAUT] = 1.0
+    grille = grille.rename_axis(index='Mois', columns='Devise').stack().rename('Taux').reset_index()
+    return grille[COLONNES_TAUX]
+
+
+def convertir(agregats: pd.DataFrame, grille: pd.DataFrame, colonnes: list[str]) -> pd.DataFrame:
+    """Montants des agrégats convertis en euros ; NaN pour une devise sans taux"""
+    lignes = agregats.assign(Mois=agregats['Date'].dt.to_period('M'))
+    lignes = lignes.merge(grille, on=['Devise', 'Mois'], how='left')
+    lignes[colonnes] = lignes[colonnes].to_numpy() * lignes[['Taux']].to_numpy()
+    return lignes
+
+
+def taux_manquants(agregats: dict[str, pd.DataFrame], taux: pd.DataFrame) -> pd.DataFrame:
+    """Couples (Devise, Mois) présents dans les agrégats mais sans taux"""
+    couples = pd.concat([agg[['Devise']].assign(Mois=agg['Date'].dt.to_period('M')) for agg in agregats.values()],
+                        ignore_index=True).drop_duplicates()
+    if couples.empty:
+        return couples
+    grille = grille_taux(taux, pd.PeriodIndex(couples['Mois'].unique(), freq='M').sort_values())
+    couples = couples.merge(grille, on=['Devise', 'Mois'], how='left')
+    return couples[couples['Taux'].isna()][['Devise', 'Mois']].sort_values(['Devise', 'Mois'], ignore_index=True)
+
+
+def _totaux(table: pd.DataFrame) -> pd.DataFrame:
+    table['CA_Total'] = table['CA_Certification'] + table['CA_Autres']
+    table['Charges_Totales'] = table['Frais_Mission'] + table['Cout_Auditeur'] + table['Charges_Diverses']
+    table['Resultat'] = table['CA_Total'] - table['Charges_Totales']
+    table['Marge_Pct'] = np.divide(table['Resultat'], table['CA_Total'], out=np.zeros(len(table)),
+                                   where=table['CA_Total'].to_numpy() > 0) * 100
+    return table[LIGNES_CONSOLIDEES]
+
+
+def consolider(agregats: dict[str, pd.DataFrame], taux: pd.DataFrame) -> pd.DataFrame:
+    """Lignes consolidées en euros par mois et par entité (index Mois, Entité)
+
+    `agregats` associe à chaque ledger ses sommes mensuelles par entité et devise
+    (colonnes Date, Entité, Devise et montants). Les montants sans taux sont ignorés.
+    """
+    mois = pd.PeriodIndex(pd.concat([agg['Date'] for agg in agregats.values()]).dt.to_period('M').unique(),
+                          freq='M').sort_values()
+    grille = grille_taux(taux, mois)
+    longs = []
+    for nom, agg in agregats.items():
+        lignes = LIGNES_LEDGERS[nom]
+        converti = convertir(agg, grille, list(lignes))[['Mois', 'Entité'] + list(lignes)].rename(columns=lignes)
+        longs.append(converti.melt(id_vars=['Mois', 'Entité'], var_name='Ligne', value_name='Montant'))
+    table = (pd.concat(longs, ignore_index=True)
+             .groupby(['Mois', 'Entité', 'Ligne'])['Montant'].sum()
+             .unstack('Ligne')
+             .rename_axis(columns=None)
+             .reindex(columns=LIGNES_CONSOLIDEES[:5])
+             .fillna(0.0))
+    return _totaux(table)
+
+
+def groupe(consolide: pd.DataFrame) -> pd.DataFrame:
+    """Total du groupe par mois, toutes entités confondues"""
+    return _totaux(consolide.groupby(level='Mois')[LIGNES_CONSOLIDEES[:5]].sum())
+
+
+def par_entite(consolide: pd.DataFrame) -> pd.DataFrame:
+    """Totaux de la période par entité"""
+    return _totaux(consolide.groupby(level='Entité')[LIGNES_CONSOLIDEES[:5]].sum())
@@ -0,0 +1,198 @@
+"""Import des classeurs Excel : détection des feuilles et colonnes, nettoyage."""
+
+from typing import Callable, Optional
+
+import pandas as pd
+
+from finance.schemas import CERTIF, AUTRES, CHARGES, ENTITE_DEFAUT, DEVISE_DEFAUT
+
+# Feuilles reconnues par l'import automatique
+FEUILLES: dict[str, str] = {
+    CERTIF: 'Facturation-Certif',
+    AUTRES: 'Facturation-Autres',
+    CHARGES: 'FRAIS DIVERS',
+}
+
+# Lignes de titre à ignorer avant les données, par défaut
+START_ROWS: dict[str, int] = {
+    CERTIF: 2,
+    AUTRES: 2,
+    CHARGES: 1,
+}
+
+# Noms possibles de chaque colonne, par ordre de priorité
+CANDIDATS: dict[str, dict[str, list[str]]] = {
+    CERTIF: {
+        'date': ['date', 'DATE', 'Date audit', 'Date d\'audit'],
+        'client': ['client', 'CLIENT', 'nom', 'société', 'entreprise'],
+        'ref': ['référentiel', 'referentiel', 'programme', 'norme', 'standard'],
+        'duree': ['durée', 'duree', 'jours', 'jour', 'temps'],
+        'montant': ['montant', 'CA', 'chiffre', 'facturation', 'prix', 'tarif'],
+        'frais': ['frais', 'mission', 'déplacement', 'deplacement', 'km'],
+        'cout': ['coût', 'cout', 'auditeur', 'honoraire', 'vacation'],
+        'statut': ['statut', 'état', 'etat', 'status'],
+        'entite': ['entité', 'entite', 'filiale'],
+        'devise': ['devise', 'monnaie', 'currency'],
+    },
+    AUTRES: {
+        'date': ['date', 'DATE'],
+        'type': ['type', 'prestation', 'catégorie', 'categorie'],
+        'client': ['client', 'CLIENT', 'nom', 'société'],
+        'desc': ['description', 'libellé', 'libelle', 'objet', 'commentaire'],
+        'montant': ['montant', 'CA', 'chiffre', 'facturation', 'prix'],
+        'frais': ['frais', 'mission', 'déplacement'],
+        'cout': ['coût', 'cout', 'auditeur', 'prestataire', 'honoraire'],
+        'statut': ['statut', 'état', 'status'],
+        'entite': ['entité', 'entite', 'filiale'],
+        'devise': ['devise', 'monnaie', 'currency'],
+    },
+    CHARGES: {
+        'date': ['date', 'DATE'],
+        'cat': ['catégorie', 'categorie', 'type', 'nature'],
+        'desc': ['description', 'libellé', 'libelle', 'objet'],
+        'montant': ['montant', 'coût', 'cout', 'prix', 'charge'],
+        'statut': ['statut', 'état', 'status', 'payé', 'paye'],
+        'entite': ['entité', 'entite', 'filiale'],
+        'devise': ['devise', 'monnaie', 'currency'],
+    },
+}
+
+# Colonnes indispensables à l'import
+OBLIGATOIRES: dict[str, list[str]] = {
+    CERTIF: ['date', 'client', 'montant'],
+    AUTRES: ['date', 'client', 'montant'],
+    CHARGES: ['date', 'montant'],
+}
+
+
+class ColonnesManquantes(ValueError):
+    """Les colonnes indispensables d'une feuille n'ont pas été détectées"""
+
+
+def detect_column(df_columns: list, possible_names: list[str]):
+    """Détecte une colonne en cherchant des noms possibles"""
+    df_columns_lower = [str(col).lower().strip() for col in df_columns]
+    for name in possible_names:
+        name_lower = name.lower().strip()
+        for i, col in enumerate(df_columns_lower):
+            if name_lower in col or col in name_lower:
+                return df_columns[i]
+    return None
+
+
+def clean_data(df: pd.DataFrame, start_row: int = 2) -> pd.DataFrame:
+    """Nettoie les données en supprimant les lignes vides"""
+    if start_row > 0:
+        df = df.iloc[start_row:]
+    df = df.dropna(how='all')
+    return df.reset_index(drop=True)
+
+
+def detecter_colonnes(df_columns: list, nom: str) -> dict:
+    """Colonne source détectée (ou None) pour chaque champ du ledger `nom`"""
+    return {champ: detect_column(df_columns, noms) for champ, noms in CANDIDATS[nom].items()}
+
+
+def colonnes_manquantes(colonnes: dict, nom: str) -> list[str]:
+    return [champ for champ in OBLIGATOIRES[nom] if not colonnes.get(champ)]
+
+
+def preparer_certif(df: pd.DataFrame, colonnes: dict) -> pd.DataFrame:
+    """Construit un ledger certification à partir des colonnes détectées"""
+    new_data = pd.DataFrame()
+    new_data['Date'] = pd.to_datetime(df[colonnes['date']], errors='coerce')
+    new_data['Client'] = df[colonnes['client']].astype(str)
+    new_data['Référentiel'] = df[colonnes['ref']].astype(str) if colonnes.get('ref') else 'N/A'
+    new_data['Durée'] = pd.to_numeric(df[colonnes['duree']], errors='coerce') if colonnes.get('duree') else 1.0
+    new_data['Montant_Facturation'] = pd.to_numeric(df[colonnes['montant']], errors='coerce')
+    new_data['Frais_Mission'] = pd.to_numeric(df[colonnes['frais']], errors='coerce') if colonnes.get('frais') else 0
+    new_data['Cout_Auditeur'] = pd.to_numeric(df[colonnes['cout']], errors='coerce') if colonnes.get('cout') else 0
+    new_data['Statut'] = df[colonnes['statut']].astype(str) if colonnes.get('statut') else 'Facturé'
+    _entite(new_data, df, colonnes)
+    return _nettoyer_facturation(new_data)
+
+
+def preparer_autres(df: pd.DataFrame, colonnes: dict) -> pd.DataFrame:
+    """Construit un ledger autres prestations à partir des colonnes détectées"""
+    new_data = pd.DataFrame()
+    new_data['Date'] = pd.to_datetime(df[colonnes['date']], errors='coerce')
+    new_data['Type'] = df[colonnes['type']].astype(str) if colonnes.get('type') else 'Autre'
+    new_data['Client'] = df[colonnes['client']].astype(str)
+    new_data['Description'] = df[colonnes['desc']].astype(str) if colonnes.get('desc') else ''
+    new_data['Montant_Facturation'] = pd.to_numeric(df[colonnes['montant']], errors='coerce')
+    new_data['Frais_Mission'] = pd.to_numeric(df[colonnes['frais']], errors='coerce') if colonnes.get('frais') else 0
+    new_data['Cout_Auditeur'] = pd.to_numeric(df[colonnes['cout']], errors='coerce') if colonnes.get('cout') else 0
+    new_data['Statut'] = df[colonnes['statut']].astype(str) if colonnes.get('statut') else 'Facturé'
+    _entite(new_data, df, colonnes)
+    return _nettoyer_facturation(new_data)
+
+
+def preparer_charges(df: pd.DataFrame, colonnes: dict) -> pd.DataFrame:
+    """Construit un ledger charges diverses à partir des colonnes détectées"""
+    new_data = pd.DataFrame()
+    new_data['Date'] = pd.to_datetime(df[colonnes['date']], errors='coerce')
+    new_data['Catégorie'] = df[colonnes['cat']].astype(str) if colonnes.get('cat') else 'Autre'
+    new_data['Description'] = df[colonnes['desc']].astype(str) if colonnes.get('desc') else ''
+    new_data['Montant'] = pd.to_numeric(df[colonnes['montant']], errors='coerce')
+    new_data['Statut'] = df[colonnes['statut']].astype(str) if colonnes.get('statut') else 'Payé'
+    _entite(new_data, df, colonnes)
+
+    # Nettoyer
+    new_data = new_data.dropna(subset=['Date', 'Montant'])
+    new_data = new_data[new_data['Montant'] > 0]
+    return new_data.fillna('')
+
+
+PREPARATEURS = {
+    CERTIF: preparer_certif,
+    AUTRES: preparer_autres,
+    CHARGES: preparer_charges,
+}
+
+
+def importer_feuille(df_raw: pd.DataFrame, nom: str, start_row: Optional[int] = None) -> pd.DataFrame:
+    """Chaîne complète d'import d'une feuille brute : nettoyage, détection, conversion"""
+    df = clean_data(df_raw, START_ROWS[nom] if start_row is None else start_row)
+    colonnes = detecter_colonnes(df.columns.tolist(), nom)
+    manquantes = colonnes_manquantes(colonnes, nom)
+    if manquantes:
+        raise ColonnesManquantes(f"{FEUILLES[nom]} : colonnes non détectées ({', '.join(manquantes)})")
+    return PREPARATEURS[nom](df, colonnes).reset_index(drop=True)
+
+
+def lire_classeur(source, start_rows: Optional[dict[str, int]] = None,
+                  progression: Optional[Callable[[float, str], None]] = None) -> dict[str, pd.DataFrame]:
+    """Importe toutes les feuilles reconnues d'un classeur (chemin ou fichier ouvert)
+
+    `progression(fraction, message)` est appelée avant la lecture de chaque feuille.
+    """
+    start_rows = {**START_ROWS, **(start_rows or {})}
+    excel_file = pd.ExcelFile(source)
+    feuilles = {nom: feuille for nom, feuille in FEUILLES.items() if feuille in excel_file.sheet_names}
+    ledgers = {}
+    for i, (nom, feuille) in enumerate(feuilles.items()):
+        if progression is not None:
+            progression(i / len(feuilles), f"Lecture de la feuille {feuille}")
+        df_raw = pd.read_excel(excel_file, sheet_name=feuille)
+        ledgers[nom] = importer_feuille(df_raw, nom, start_rows[nom])
+    return ledgers
+
+
+def _entite(new_data: pd.DataFrame, df: pd.DataFrame, colonnes: dict):
+    """Entité et devise des lignes : colonnes détectées (cellules vides : valeurs par défaut), sinon défauts"""
+    for champ, col, defaut in (('entite', 'Entité', ENTITE_DEFAUT), ('devise', 'Devise', DEVISE_DEFAUT)):
+        if colonnes.get(champ):
+            valeurs = df[colonnes[champ]]
+            new_data[col] = valeurs.where(valeurs.notna(), defaut).astype(str).str.strip()
+        else:
+            new_data[col] = defaut
+    new_data['Devise'] = new_data['Devise'].str.upper()
+
+
+def _nettoyer_facturation(new_data: pd.DataFrame) -> pd.DataFrame:
+    """Supprime les lignes sans date, sans client ou sans montant positif"""
+    new_data = new_data.dropna(subset=['Date'])
+    new_data = new_data[new_data['Client'].str.strip() != '']
+    new_data = new_data[new_data['Montant_Facturation'].notna()]
+    new_data = new_data[new_data['Montant_Facturation'] > 0]
+    return new_data.fillna(0)
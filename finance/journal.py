@@ -0,0 +1,114 @@
+"""Journal des modifications des ledgers, pour annuler, rétablir et reconstituer un état passé.
+
+Chaque opération ne conserve que son delta : les lignes retirées et les lignes
+ajoutées (une modification retire puis ajoute les mêmes identifiants), indexées par
+leur identifiant stable. Annuler une opération applique le delta inverse ; un état
+passé se reconstitue en appliquant à l'état courant les inverses des opérations
+suivantes, sans conserver de copie complète des ledgers.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+# Nombre d'opérations conservées (les plus anciennes sont oubliées)
+PROFONDEUR = 50
+
+
+@dataclass(frozen=True)
+class Operation:
+    nom: str                  # ledger modifié
+    libelle: str
+    retirees: pd.DataFrame    # lignes retirées, indexées par identifiant
+    ajoutees: pd.DataFrame    # lignes ajoutées, indexées par identifiant
+    horodatage: datetime = field(default_factory=datetime.now)
+
+    def inverse(self) -> 'Operation':
+        return Operation(self.nom, self.libelle, self.ajoutees, self.retirees, self.horodatage)
+
+    @property
+    def nb_lignes(self) -> int:
+        return len(self.retirees.index.union(self.ajoutees.index))
+
+
+def appliquer(ledger: pd.DataFrame, operation: Operation) -> pd.DataFrame:
+    """Ledger après l'opération : lignes retirées supprimées, lignes ajoutées insérées à leur identifiant"""
+    retirees = operation.retirees.index.intersection(ledger.index)
+    restant = ledger.drop(retirees) if len(retirees) else ledger
+    if operation.ajoutees.empty:
+        return restant
+    if restant.empty:
+        return operation.ajoutees[ledger.columns].sort_index()
+    resultat = pd.concat([restant, operation.ajoutees[ledger.columns]])
+    # Un ajout de nouvelles lignes (identifiants croissants) n'a pas besoin d'être trié
+    return resultat if resultat.index.is_monotonic_increasing else resultat.sort_index(kind='stable')
+
+
+def difference(nom: str, libelle: str, avant: pd.DataFrame, apres: pd.DataFrame) -> Operation:
+    """Opération qui fait passer les lignes `avant` à `apres` (indexées par identifiant)
+
+    Les lignes absentes de `apres` sont supprimées ; seules les lignes dont une valeur a
+    changé sont retirées puis ajoutées à leur identifiant. Comparaison vectorisée, sans
+    boucle sur les lignes.
+    """
+    communs = avant.index.intersection(apres.index)
+    anciennes = avant.loc[communs]
+    nouvelles = apres.loc[communs, avant.columns]
+    egales = (anciennes == nouvelles) | (anciennes.isna() & nouvelles.isna())
+    modifiees = communs[~egales.all(axis=1).to_numpy()]
+    retirees = modifiees.union(avant.index.difference(apres.index))
+    return Operation(nom, libelle, avant.loc[retirees], nouvelles.loc[modifiees])
+
+
+class Journal:
+    """Piles des opérations faites et annulées"""
+
+    def __init__(self, profondeur: int = PROFONDEUR):
+        self.profondeur = profondeur
+        self._faites: list[Operation] = []
+        self._annulees: list[Operation] = []
+
+    def enregistrer(self, operation: Operation):
+        """Ajoute une opération ; les opérations annulées ne peuvent plus être rétablies"""
+        self._faites.append(operation)
+        del self._faites[:-self.profondeur]
+        self._annulees.clear()
+
+    def annuler(self) -> Optional[Operation]:
+        """Dernière opération faite, à défaire (None s'il n'y en a pas)"""
+        if not self._faites:
+            return None
+        operation = self._faites.pop()
+        self._annulees.append(operation)
+        return operation
+
+    def retablir(self) -> Optional[Operation]:
+        """Dernière opération annulée, à refaire (None s'il n'y en a pas)"""
+        if not self._annulees:
+            return None
+        operation = self._annulees.pop()
+        self._faites.append(operation)
+        return operation
+
+    def oublier_plus_ancienne(self) -> Optional[Operation]:
+        """Retire du journal l'opération faite la plus ancienne (None s'il n'y en a pas)"""
+        return self._faites.pop(0) if self._faites else None
+
+    @property
+    def operations(self) -> list[Operation]:
+        """Opérations faites, de la plus ancienne à la plus récente"""
+        return list(self._faites)
+
+    @property
+    def annulees(self) -> list[Operation]:
+        """Opérations annulées, de la prochaine à rétablir à la plus ancienne annulée"""
+        return self._annulees[::-1]
+
+    def reconstituer(self, nom: str, ledger: pd.DataFrame, etape: int) -> pd.DataFrame:
+        """Ledger tel qu'il était après les `etape` premières opérations faites, à partir de son état courant"""
+        for operation in reversed(self._faites[etape:]):
+            if operation.nom == nom:
+                ledger = appliquer(ledger, operation.inverse())
+        return ledger
@@ -0,0 +1,74 @@
+"""Indicateurs globaux du Dashboard et de la page Charges."""
+
+from dataclasses import dataclass, asdict
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class KPIs:
+    ca_certif: float
+    ca_autres: float
+    frais_mission_certif: float
+    frais_mission_autres: float
+    cout_auditeur_certif: float
+    cout_auditeur_autres: float
+    charges_diverses: float
+
+    @property
+    def ca_total(self) -> float:
+        return self.ca_certif + self.ca_autres
+
+    @property
+    def frais_mission(self) -> float:
+        return self.frais_mission_certif + self.frais_mission_autres
+
+    @property
+    def cout_auditeur(self) -> float:
+        return self.cout_auditeur_certif + self.cout_auditeur_autres
+
+    @property
+    def charges_total(self) -> float:
+        return self.frais_mission + self.cout_auditeur + self.charges_diverses
+
+    @property
+    def resultat(self) -> float:
+        return self.ca_total - self.charges_total
+
+    @property
+    def marge_nette(self) -> float:
+        """Résultat en % du CA total (0 si pas de CA)"""
+        return (self.resultat / self.ca_total * 100) if self.ca_total > 0 else 0
+
+    def en_dict(self) -> dict[str, float]:
+        valeurs = asdict(self)
+        for nom in ('ca_total', 'frais_mission', 'cout_auditeur', 'charges_total', 'resultat', 'marge_nette'):
+            valeurs[nom] = getattr(self, nom)
+        return {nom: float(valeur) for nom, valeur in valeurs.items()}
+
+
+def calculer_kpis(certif: pd.DataFrame, autres: pd.DataFrame, charges: pd.DataFrame) -> KPIs:
+    """Totaux de CA et de charges sur les trois ledgers"""
+    return KPIs(
+        ca_certif=certif['Montant_Facturation'].sum(),
+        ca_autres=autres['Montant_Facturation'].sum(),
+        frais_mission_certif=certif['Frais_Mission'].sum(),
+        frais_mission_autres=autres['Frais_Mission'].sum(),
+        cout_auditeur_certif=certif['Cout_Auditeur'].sum(),
+        cout_auditeur_autres=autres['Cout_Auditeur'].sum(),
+        charges_diverses=charges['Montant'].sum(),
+    )
+
+
+def ca_par_statut(df: pd.DataFrame, statuts: list[str]) -> list[float]:
+    """CA facturé pour chacun des statuts demandés, dans l'ordre"""
+    sommes = df.groupby('Statut')['Montant_Facturation'].sum()
+    return [float(sommes.get(statut, 0)) for statut in statuts]
+
+
+def repartition_charges(kpis: KPIs) -> pd.DataFrame:
+    """Répartition des charges par nature, pour les graphiques en anneau"""
+    return pd.DataFrame({
+        'Type': ['Frais Mission', 'Coût Auditeurs', 'Charges Diverses'],
+        'Montant': [kpis.frais_mission, kpis.cout_auditeur, kpis.charges_diverses]
+    })
@@ -0,0 +1,240 @@
+"""Forecast saisonnier : lissage exponentiel de Holt-Winters sur les sommes mensuelles.
+
+Chaque ligne du forecast (CA certification, CA autres, frais de mission, coûts
+auditeurs, charges diverses) est une série mensuelle. Le modèle additif à
+tendance amortie est ajusté sur toutes les séries à la fois : les paramètres
+(alpha, beta, gamma, phi) sont choisis par série sur une grille, évaluée en un
+seul passage vectorisé numpy (grille x séries) sur l'historique.
+
+Avec moins de deux saisons d'historique, la saisonnalité n'est pas estimable :
+le modèle se réduit à un lissage de Holt (niveau et tendance amortie).
+
+Pour des centaines de séries (un forecast par client ou par référentiel),
+`ajuster_lot` découpe les séries en blocs ajustés en parallèle.
+"""
+
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from finance.prevision import COLONNES_FORECAST
+
+SAISON = 12
+
+# Nombre de séries ajustées ensemble (borne la mémoire : grille x séries x saison)
+TAILLE_BLOC = 256
+
+# Grille des paramètres de lissage (niveau, tendance, saisonnalité, amortissement)
+GRILLE = np.array(list(itertools.product(
+    [0.05, 0.1, 0.2, 0.3, 0.5, 0.7],
+    [0.0, 0.02, 0.05, 0.1, 0.2],
+    [0.05, 0.1, 0.2, 0.3],
+    [0.9, 0.98],
+)))
+
+
+def series_mensuelles(certif: pd.DataFrame, autres: pd.DataFrame, charges: pd.DataFrame) -> pd.DataFrame:
+    """Sommes mensuelles des lignes du forecast, mois sans ligne à zéro (index : périodes mensuelles).
+
+    Accepte les ledgers ou leurs agrégats mensuels (colonne Date et colonnes de montants).
+    """
+    def par_mois(df, colonnes):
+        return df.groupby(df['Date'].dt.to_period('M'))[colonnes].sum()
+
+    f_certif = par_mois(certif, ['Montant_Facturation', 'Frais_Mission', 'Cout_Auditeur'])
+    f_autres = par_mois(autres, ['Montant_Facturation', 'Frais_Mission', 'Cout_Auditeur'])
+    series = pd.DataFrame({
+        'CA_Certification': f_certif['Montant_Facturation'],
+        'CA_Autres': f_autres['Montant_Facturation'],
+        'Frais_Mission': f_certif['Frais_Mission'].add(f_autres['Frais_Mission'], fill_value=0),
+        'Cout_Auditeurs': f_certif['Cout_Auditeur'].add(f_autres['Cout_Auditeur'], fill_value=0),
+        'Charges_Diverses': par_mois(charges, ['Montant'])['Montant'],
+    }, columns=COLONNES_FORECAST)
+    if series.empty:
+        return series.astype('float64')
+    mois = pd.period_range(series.index.min(), series.index.max(), freq='M')
+    return series.reindex(mois).fillna(0.0)
+
+
+@dataclass(frozen=True)
+class ModeleSaisonnier:
+    """États finaux et paramètres du lissage, par série (colonnes)"""
+    colonnes: list[str]
+    dernier_mois: pd.Period
+    niveau: np.ndarray
+    tendance: np.ndarray
+    saisons: np.ndarray      # (séries, SAISON), indexé par position dans la saison
+    position: int            # position dans la saison du mois suivant le dernier mois
+    parametres: np.ndarray   # (séries, 4) : alpha, beta, gamma, phi
+    saisonnier: bool
+    erreur_relative: np.ndarray  # RMSE in-sample / moyenne de la série
+
+    def prevoir(self, nb_mois: int) -> pd.DataFrame:
+        """Prévisions des `nb_mois` mois suivant l'historique, bornées à zéro"""
+        valeurs = _projeter(self.niveau, self.tendance, self.saisons, self.parametres[:, 3],
+                            np.asarray(self.position), nb_mois)
+        mois = pd.period_range(self.dernier_mois + 1, periods=nb_mois, freq='M')
+        return pd.DataFrame(valeurs.T, index=mois, columns=self.colonnes)
+
+    def description(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'Ligne': self.colonnes,
+            'alpha': self.parametres[:, 0],
+            'beta': self.parametres[:, 1],
+            'gamma': self.parametres[:, 2] if self.saisonnier else np.nan,
+            'phi': self.parametres[:, 3],
+            'Erreur relative (%)': (self.erreur_relative * 100).round(1),
+        })
+
+
+def _etats_initiaux(y: np.ndarray, saisonnier: bool):
+    """Niveau, tendance et saisons initiaux par décomposition des deux premières saisons"""
+    n_series, n = y.shape
+    if saisonnier:
+        saison1, saison2 = y[:, :SAISON], y[:, SAISON:2 * SAISON]
+        niveau = saison1.mean(axis=1)
+        tendance = (saison2.mean(axis=1) - niveau) / SAISON
+        saisons = ((saison1 - niveau[:, None]) + (saison2 - saison2.mean(axis=1)[:, None])) / 2
+    else:
+        niveau = y[:, 0].astype(float)
+        tendance = (y[:, 1] - y[:, 0]) if n > 1 else np.zeros(n_series)
+        saisons = np.zeros((n_series, SAISON))
+    return niveau, tendance, saisons
+
+
+def _projeter(niveau, tendance, saisons, phi, position, nb_mois: int) -> np.ndarray:
+    """Prévisions (..., séries, horizon) à partir d'états de dimensions (..., séries), bornées à zéro"""
+    h = np.arange(1, nb_mois + 1)
+    # Somme des phi^i pour i = 1..h (tendance amortie cumulée)
+    cumul = np.cumsum(phi[..., None] ** h, axis=-1)
+    mois_saison = (position[..., None] + h - 1) % SAISON                     # (..., horizon)
+    saisons = np.take_along_axis(saisons, mois_saison[..., None, :], axis=-1)
+    return np.clip(niveau[..., None] + cumul * tendance[..., None] + saisons, 0, None)
+
+
+def _lisser(y: np.ndarray, saisonnier: bool, origines: np.ndarray) -> dict[str, np.ndarray]:
+    """Lissage de toute la grille en un passage sur l'historique `y` (séries, mois)
+
+    Renvoie, pour chaque origine (nombre de mois d'historique), les états et paramètres du
+    meilleur point de la grille sur les mois antérieurs : une dimension (origines, séries, ...).
+    """
+    n_series, n = y.shape
+    grille = GRILLE if saisonnier else np.unique(GRILLE * [1, 1, 0, 1], axis=0)
+    alpha, beta, gamma, phi = (grille[:, i, None] for i in range(4))   # (grille, 1)
+
+    niveau0, tendance0, saisons0 = _etats_initiaux(y, saisonnier)
+    niveau = np.broadcast_to(niveau0, (len(grille), n_series)).copy()   # (grille, séries)
+    tendance = np.broadcast_to(tendance0, (len(grille), n_series)).copy()
+    saisons = np.broadcast_to(saisons0, (len(grille), n_series, SAISON)).copy()
+    sse = np.zeros((len(grille), n_series))
+
+    series_idx = np.arange(n_series)
+    etats = {cle: [] for cle in ('niveau', 'tendance', 'saisons', 'parametres', 'sse')}
+    for t in range(n):
+        s = saisons[:, :, t % SAISON]
+        erreur = y[:, t] - (niveau + phi * tendance + s)
+        sse += erreur ** 2
+        nouveau_niveau = alpha * (y[:, t] - s) + (1 - alpha) * (niveau + phi * tendance)
+        tendance = beta * (nouveau_niveau - niveau) + (1 - beta) * phi * tendance
+        saisons[:, :, t % SAISON] = gamma * (y[:, t] - nouveau_niveau) + (1 - gamma) * s
+        niveau = nouveau_niveau
+        if t + 1 in origines:
+            meilleur = sse.argmin(axis=0)                    # (séries,)
+            etats['niveau'].append(niveau[meilleur, series_idx])
+            etats['tendance'].append(tendance[meilleur, series_idx])
+            etats['saisons'].append(saisons[meilleur, series_idx])
+            etats['parametres'].append(grille[meilleur])
+            etats['sse'].append(sse[meilleur, series_idx])
+    return {cle: np.array(valeurs) for cle, valeurs in etats.items()}
+
+
+def ajuster(series: pd.DataFrame) -> ModeleSaisonnier:
+    """Ajuste le lissage sur chaque colonne de `series` (sommes mensuelles contiguës)"""
+    if series.empty:
+        raise ValueError("Aucun historique mensuel pour ajuster le modèle")
+    y = series.to_numpy(dtype=float).T                 # (séries, mois)
+    n = y.shape[1]
+    saisonnier = n >= 2 * SAISON
+    etats = _lisser(y, saisonnier, np.array([n]))
+    moyenne = np.abs(y).mean(axis=1)
+    rmse = np.sqrt(etats['sse'][0] / n)
+    return ModeleSaisonnier(
+        colonnes=list(series.columns),
+        dernier_mois=series.index[-1],
+        niveau=etats['niveau'][0],
+        tendance=etats['tendance'][0],
+        saisons=etats['saisons'][0],
+        position=n % SAISON,
+        parametres=etats['parametres'][0],
+        saisonnier=saisonnier,
+        erreur_relative=np.divide(rmse, moyenne, out=np.zeros_like(rmse), where=moyenne > 0),
+    )
+
+
+def series_par(cubes: list[pd.DataFrame], dimension: str, valeur: str = 'Montant_Facturation') -> pd.DataFrame:
+    """Sommes mensuelles de `valeur` par modalité de `dimension` (une colonne par client, référentiel...)
+
+    `cubes` sont des agrégats mensuels (colonne Date) portant la dimension ; mois sans ligne à zéro.
+    """
+    lignes = pd.concat([cube[['Date', dimension, valeur]] for cube in cubes], ignore_index=True)
+    series = lignes.pivot_table(index=lignes['Date'].dt.to_period('M'), columns=dimension, values=valeur,
+                                aggfunc='sum', fill_value=0.0)
+    series.columns.name = None
+    if series.empty:
+        return series
+    mois = pd.period_range(series.index.min(), series.index.max(), freq='M')
+    return series.reindex(mois, fill_value=0.0)
+
+
+def _concatener(modeles: list[ModeleSaisonnier]) -> ModeleSaisonnier:
+    premier = modeles[0]
+    return ModeleSaisonnier(
+        colonnes=[c for modele in modeles for c in modele.colonnes],
+        dernier_mois=premier.dernier_mois,
+        niveau=np.concatenate([m.niveau for m in modeles]),
+        tendance=np.concatenate([m.tendance for m in modeles]),
+        saisons=np.concatenate([m.saisons for m in modeles]),
+        position=premier.position,
+        parametres=np.concatenate([m.parametres for m in modeles]),
+        saisonnier=premier.saisonnier,
+        erreur_relative=np.concatenate([m.erreur_relative for m in modeles]),
+    )
+
+
+def ajuster_lot(series: pd.DataFrame, taille_bloc: int = TAILLE_BLOC, workers: Optional[int] = None) -> ModeleSaisonnier:
+    """Ajuste de nombreuses séries par blocs vectorisés, répartis sur un pool de threads
+
+    Les calculs numpy d'un bloc libèrent le GIL : les threads suffisent et évitent
+    de copier les séries vers d'autres processus.
+    """
+    blocs = [series.iloc[:, i:i + taille_bloc] for i in range(0, series.shape[1], taille_bloc)]
+    if len(blocs) <= 1:
+        return ajuster(series)
+    with ThreadPoolExecutor(max_workers=workers or min(len(blocs), os.cpu_count() or 1)) as pool:
+        return _concatener(list(pool.map(ajuster, blocs)))
+
+
+def synthese_par(series: pd.DataFrame, prevision: pd.DataFrame) -> pd.DataFrame:
+    """Par série : CA des derniers mois, CA prévu sur le même nombre de mois et évolution (%)"""
+    nb_mois = len(prevision)
+    recent = series.iloc[-nb_mois:].sum()
+    prevu = prevision.sum()
+    return pd.DataFrame({
+        'Réalisé': recent,
+        'Prévu': prevu,
+        'Evolution_Pct': np.divide(prevu - recent, recent, out=np.full(len(recent), np.nan),
+                                   where=recent.to_numpy() > 0) * 100,
+    }).sort_values('Prévu', ascending=False)
+
+
+def generer_forecast_saisonnier(modele: ModeleSaisonnier, nb_mois: int) -> pd.DataFrame:
+    """Forecast initial au format de `generer_forecast` (Mois et colonnes éditables)"""
+    prevision = modele.prevoir(nb_mois).round(0)
+    forecast = prevision[COLONNES_FORECAST].reset_index(drop=True)
+    forecast.insert(0, 'Mois', prevision.index)
+    return forecast
@@ -0,0 +1,30 @@
+"""Marges des lignes de facturation."""
+
+import pandas as pd
+
+
+def calculer_marge(df: pd.DataFrame, type_fact: str = 'certification') -> pd.DataFrame:
+    """Ajoute Marge_Brute et Taux_Marge (%) à une copie du ledger"""
+    df_copy = df.copy()
+    df_copy['Marge_Brute'] = df_copy['Montant_Facturation'] - df_copy['Frais_Mission'] - df_copy['Cout_Auditeur']
+    df_copy['Taux_Marge'] = (df_copy['Marge_Brute'] / df_copy['Montant_Facturation'] * 100).round(1)
+    return df_copy
+
+
+def filtrer(df: pd.DataFrame, egalites: dict[str, object]) -> pd.DataFrame:
+    """Filtre les lignes dont les colonnes valent les valeurs données (None = pas de filtre)"""
+    masque = pd.Series(True, index=df.index)
+    for colonne, valeur in egalites.items():
+        if valeur is not None:
+            masque &= df[colonne] == valeur
+    return df[masque]
+
+
+def marge_par(df_avec_marge: pd.DataFrame, cle: str) -> pd.DataFrame:
+    """CA, marge brute et taux de marge regroupés par `cle` (Client, Type...)"""
+    agg = df_avec_marge.groupby(cle).agg({
+        'Montant_Facturation': 'sum',
+        'Marge_Brute': 'sum'
+    }).reset_index()
+    agg['Taux_Marge'] = (agg['Marge_Brute'] / agg['Montant_Facturation'] * 100).round(1)
+    return agg
@@ -0,0 +1,120 @@
+"""Mesure de la mémoire occupée par l'état d'une session et pic de mémoire d'un traitement.
+
+La taille d'un objet est mesurée en profondeur : DataFrames, séries et index par
+`memory_usage(deep=True)`, tableaux numpy par leurs octets, conteneurs et objets de
+l'application (agrégats mensuels, journal, moteurs de calcul) en parcourant leur
+contenu. Un objet partagé entre plusieurs clés n'est compté qu'une fois, pour la
+première. La taille des DataFrames est mémorisée tant que l'objet existe (les
+DataFrames de l'état ne sont pas modifiés en place, ils sont remplacés).
+
+Le pic d'un traitement (import) est celui de la mémoire résidente du processus,
+échantillonnée par un thread pendant le traitement : il inclut l'activité simultanée
+des autres sessions.
+"""
+
+import os
+import sys
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+CATEGORIE_AUTRE = 'Autres'
+
+# Intervalle d'échantillonnage de la mémoire résidente (secondes)
+INTERVALLE_PIC = 0.02
+
+
+class Mesureur:
+    """Taille en profondeur des objets, avec mémorisation de celle des DataFrames"""
+
+    def __init__(self):
+        self._tailles: dict[int, tuple[weakref.ref, int]] = {}
+
+    def _dataframe(self, df: pd.DataFrame) -> int:
+        memo = self._tailles.get(id(df))
+        if memo is not None and memo[0]() is df:
+            return memo[1]
+        taille = int(df.memory_usage(deep=True).sum())
+        self._tailles = {cle: (ref, t) for cle, (ref, t) in self._tailles.items() if ref() is not None}
+        self._tailles[id(df)] = (weakref.ref(df), taille)
+        return taille
+
+    def taille(self, objet: Any, vus: Optional[set] = None) -> int:
+        """Octets de l'objet et de tout ce qu'il contient (objets déjà dans `vus` exclus)"""
+        vus = set() if vus is None else vus
+        if id(objet) in vus:
+            return 0
+        vus.add(id(objet))
+        if isinstance(objet, pd.DataFrame):
+            return self._dataframe(objet)
+        if isinstance(objet, (pd.Series, pd.Index)):
+            return int(objet.memory_usage(deep=True))
+        if isinstance(objet, np.ndarray):
+            return objet.nbytes
+        if isinstance(objet, dict):
+            return sys.getsizeof(objet) + sum(self.taille(cle, vus) + self.taille(valeur, vus)
+                                              for cle, valeur in objet.items())
+        if isinstance(objet, (list, tuple, set, frozenset)):
+            return sys.getsizeof(objet) + sum(self.taille(element, vus) for element in objet)
+        if hasattr(objet, '__dict__') and not isinstance(objet, type):
+            return sys.getsizeof(objet) + self.taille(vars(objet), vus)
+        return sys.getsizeof(objet)
+
+    def inventaire(self, etat: Mapping[str, Any], categories: Mapping[str, str],
+                   vus: Optional[set] = None) -> pd.DataFrame:
+        """Octets de chaque clé (colonnes Clé, Catégorie, Octets), des plus grosses aux plus petites
+
+        `vus` reçoit les objets parcourus : un objet mesuré ensuite avec ce même ensemble
+        ne compte que ce qui n'est pas déjà atteint depuis l'état.
+        """
+        vus = set() if vus is None else vus
+        lignes = [(cle, categories.get(cle, CATEGORIE_AUTRE), self.taille(valeur, vus))
+                  for cle, valeur in etat.items()]
+        inventaire = pd.DataFrame(lignes, columns=['Clé', 'Catégorie', 'Octets'])
+        return inventaire.sort_values('Octets', ascending=False, ignore_index=True)
+
+
+def memoire_residente() -> int:
+    """Mémoire résidente actuelle du processus (pic depuis le démarrage hors Linux, 0 si inconnue)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # Unix seulement
+    except ImportError:
+        return 0
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+class Pic:
+    """Résultat de `pic_memoire` : hausse maximale de la mémoire résidente pendant le bloc"""
+    octets: int = 0
+
+
+@contextmanager
+def pic_memoire(intervalle: float = INTERVALLE_PIC):
+    """Échantillonne la mémoire résidente pendant le bloc ; `Pic.octets` est renseigné à la sortie"""
+    pic = Pic()
+    depart = maximum = memoire_residente()
+    fin = threading.Event()
+
+    def echantillonner():
+        nonlocal maximum
+        while not fin.wait(intervalle):
+            maximum = max(maximum, memoire_residente())
+
+    thread = threading.Thread(target=echantillonner, daemon=True, name='pic-memoire')
+    thread.start()
+    try:
+        yield pic
+    finally:
+        fin.set()
+        thread.join()
+        pic.octets = max(maximum, memoire_residente()) - depart
@@ -0,0 +1,122 @@
+"""Partitions mensuelles des ledgers et agrégats figés des mois clos.
+
+`IndexMensuel` regroupe les positions des lignes par mois : une lecture sur une
+période ne parcourt que les mois concernés. `AgregatsMensuels` conserve les
+sommes par mois et par dimensions (statut, ou cube client × référentiel × statut) ;
+un mois clos (antérieur au mois courant) n'est calculé qu'une fois, jusqu'à ce
+qu'une modification du ledger le touche.
+"""
+
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Colonne du nombre de lignes dans les agrégats mensuels
+LIGNES = 'Lignes'
+
+
+def mois_de(dates) -> set:
+    """Mois (périodes mensuelles) présents dans une série de dates"""
+    return set(pd.to_datetime(pd.Series(dates)).dropna().dt.to_period('M').unique())
+
+
+def mois_courant() -> pd.Period:
+    return pd.Timestamp.today().to_period('M')
+
+
+def bornes_mois(debut: Optional[pd.Period], fin: Optional[pd.Period]):
+    """Dates du premier et du dernier jour de la période de mois (None : non bornée)"""
+    return (None if debut is None else debut.start_time,
+            None if fin is None else fin.end_time.normalize())
+
+
+class IndexMensuel:
+    """Positions des lignes d'un ledger, regroupées par mois"""
+
+    def __init__(self, dates: pd.Series):
+        codes, mois = pd.factorize(dates.dt.to_period('M'), sort=True)
+        self.mois = pd.PeriodIndex(mois, freq='M')
+        self._ordre = np.argsort(codes, kind='stable')
+        # Les lignes sans date (code -1) sont en tête de l'ordre et hors de toute partition
+        self._debuts = np.searchsorted(codes[self._ordre], np.arange(len(self.mois) + 1))
+
+    def positions(self, debut: Optional[pd.Period] = None, fin: Optional[pd.Period] = None) -> np.ndarray:
+        """Positions, dans l'ordre du ledger, des lignes des mois compris entre debut et fin"""
+        premier = 0 if debut is None else self.mois.searchsorted(debut, side='left')
+        dernier = len(self.mois) if fin is None else self.mois.searchsorted(fin, side='right')
+        if premier >= dernier:
+            return np.array([], dtype=np.intp)
+        return np.sort(self._ordre[self._debuts[premier]:self._debuts[dernier]])
+
+
+class AgregatsMensuels:
+    """Sommes mensuelles d'un ledger par dimensions, figées pour les mois clos"""
+
+    def __init__(self, colonnes: list[str], dimensions: Iterable[str] = ('Statut',)):
+        self.colonnes = list(colonnes)
+        self.dimensions = list(dimensions)
+        self._figes: dict[pd.Period, pd.DataFrame] = {}
+
+    def invalider(self, mois: Optional[Iterable[pd.Period]] = None):
+        """Oublie les agrégats des mois donnés (tous si None)"""
+        if mois is None:
+            self._figes.clear()
+        else:
+            for m in mois:
+                self._figes.pop(m, None)
+
+    def mois_figes(self) -> list[pd.Period]:
+        return sorted(self._figes)
+
+    def _calculer(self, df: pd.DataFrame) -> pd.DataFrame:
+        groupes = df.assign(Mois=df['Date'].dt.to_period('M')).groupby(['Mois'] + self.dimensions, dropna=False,
+                                                                        observed=True)
+        agg = groupes[self.colonnes].sum()
+        agg[LIGNES] = groupes.size()
+        return agg.reset_index()
+
+    def agreger(self, mois: Iterable[pd.Period],
+                lecteur: Callable[[pd.Period, pd.Period], pd.DataFrame]) -> pd.DataFrame:
+        """Agrégats des mois demandés ; `lecteur(debut, fin)` lit les lignes des mois à calculer.
+
+        Colonnes : Date (premier jour du mois), dimensions, colonnes sommées et nombre de lignes,
+        de sorte que les fonctions de `finance` qui somment un ledger s'appliquent telles quelles.
+        """
+        mois = sorted(set(mois))
+        courant = mois_courant()
+        ouverts = {}
+        for debut, fin in plages([m for m in mois if m not in self._figes]):
+            lignes = lecteur(debut, fin)
+            calcules = self._calculer(lignes[['Date'] + self.dimensions + self.colonnes])
+            par_mois = dict(tuple(calcules.groupby('Mois')))
+            for m in pd.period_range(debut, fin, freq='M'):
+                agg = par_mois.get(m, calcules.iloc[:0]).drop(columns='Mois')
+                if m < courant:
+                    self._figes[m] = agg
+                else:
+                    # Mois ouvert : recalculé à chaque demande
+                    ouverts[m] = agg
+
+        if not mois:
+            return pd.DataFrame({
+                'Date': pd.Series(dtype='datetime64[ns]'),
+                **{dimension: pd.Series(dtype='object') for dimension in self.dimensions},
+                **{colonne: pd.Series(dtype='float64') for colonne in self.colonnes},
+                LIGNES: pd.Series(dtype='int64'),
+            })
+        resultat = pd.concat([self._figes.get(m, ouverts.get(m)).assign(Mois=m) for m in mois],
+                             ignore_index=True)
+        resultat.insert(0, 'Date', pd.PeriodIndex(resultat.pop('Mois'), freq='M').to_timestamp())
+        return resultat
+
+
+def plages(mois: list[pd.Period]) -> list[tuple[pd.Period, pd.Period]]:
+    """Regroupe des mois triés en plages de mois consécutifs"""
+    resultat = []
+    for m in mois:
+        if resultat and m == resultat[-1][1] + 1:
+            resultat[-1] = (resultat[-1][0], m)
+        else:
+            resultat.append((m, m))
+    return resultat
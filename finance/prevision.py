@@ -0,0 +1,89 @@
+"""Forecast : projection des moyennes mensuelles avec une croissance composée."""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+import pandas as pd
+
+from finance.agregation import moyennes_mensuelles
+from finance.schemas import COLONNES_FACTURATION
+
+# Colonnes éditables du forecast
+COLONNES_FORECAST = ['CA_Certification', 'CA_Autres', 'Frais_Mission', 'Cout_Auditeurs', 'Charges_Diverses']
+
+
+@dataclass(frozen=True)
+class ParametresForecast:
+    nb_mois: int = 6
+    croissance_ca_certif: float = 3.0
+    croissance_ca_autres: float = 2.0
+    croissance_charges: float = 1.5
+
+
+def generer_forecast(certif: pd.DataFrame, autres: pd.DataFrame, charges: pd.DataFrame,
+                     params: ParametresForecast) -> pd.DataFrame:
+    """Forecast initial : moyennes mensuelles actuelles x (1 + croissance) ** mois"""
+    moy_certif = moyennes_mensuelles(certif, COLONNES_FACTURATION)
+    moy_autres = moyennes_mensuelles(autres, COLONNES_FACTURATION)
+    charges_diverses_moy = moyennes_mensuelles(charges, ['Montant'])['Montant']
+
+    # Génération des dates forecast
+    derniere_date = pd.concat([certif['Date'], autres['Date']]).max()
+    dates_forecast = pd.date_range(
+        start=derniere_date + timedelta(days=30),
+        periods=params.nb_mois,
+        freq='ME'
+    )
+
+    forecast_initial = []
+    for i, date in enumerate(dates_forecast):
+        facteur_charges = (1 + params.croissance_charges / 100) ** (i + 1)
+        ca_certif_prev = moy_certif['Montant_Facturation'] * (1 + params.croissance_ca_certif / 100) ** (i + 1)
+        ca_autres_prev = moy_autres['Montant_Facturation'] * (1 + params.croissance_ca_autres / 100) ** (i + 1)
+        frais_prev = (moy_certif['Frais_Mission'] + moy_autres['Frais_Mission']) * facteur_charges
+        cout_prev = (moy_certif['Cout_Auditeur'] + moy_autres['Cout_Auditeur']) * facteur_charges
+        charges_prev = charges_diverses_moy * facteur_charges
+
+        forecast_initial.append({
+            'Mois': date.to_period('M'),
+            'CA_Certification': round(ca_certif_prev, 0),
+            'CA_Autres': round(ca_autres_prev, 0),
+            'Frais_Mission': round(frais_prev, 0),
+            'Cout_Auditeurs': round(cout_prev, 0),
+            'Charges_Diverses': round(charges_prev, 0)
+        })
+
+    return pd.DataFrame(forecast_initial)
+
+
+def mois_forecast(forecast: pd.DataFrame) -> pd.PeriodIndex:
+    """Mois du forecast (colonne 'Mois', périodes mensuelles) sous forme d'index"""
+    return pd.PeriodIndex(forecast['Mois'], freq='M', name='Mois')
+
+
+def libelles_mois(forecast: pd.DataFrame) -> pd.Series:
+    """Libellés d'affichage des mois du forecast ('%B %Y')"""
+    return forecast['Mois'].dt.strftime('%B %Y')
+
+
+def completer_forecast(forecast: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute CA_Total, Charges_Totales, Resultat et Marge_Pct au forecast (modifié en place)"""
+    forecast['CA_Total'] = forecast['CA_Certification'] + forecast['CA_Autres']
+    forecast['Charges_Totales'] = (forecast['Frais_Mission'] +
+                                   forecast['Cout_Auditeurs'] +
+                                   forecast['Charges_Diverses'])
+    forecast['Resultat'] = forecast['CA_Total'] - forecast['Charges_Totales']
+    forecast['Marge_Pct'] = (forecast['Resultat'] / forecast['CA_Total'] * 100).round(1)
+    return forecast
+
+
+def resume_forecast(forecast: pd.DataFrame) -> dict[str, float]:
+    """Totaux d'un forecast complété"""
+    total_ca = forecast['CA_Total'].sum()
+    total_resultat = forecast['Resultat'].sum()
+    return {
+        'ca_total': float(total_ca),
+        'charges_totales': float(forecast['Charges_Totales'].sum()),
+        'resultat': float(total_resultat),
+        'marge_moyenne': float(total_resultat / total_ca * 100) if total_ca > 0 else 0.0,
+    }
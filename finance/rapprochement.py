@@ -0,0 +1,73 @@
+"""Rapprochement du forecast avec le réalisé, mois par mois et ligne par ligne.
+
+Prévu et réalisé sont indexés par mois (périodes mensuelles) et ont pour colonnes
+les lignes du forecast : la jointure se fait sur cet index. Le réalisé de chaque
+mois est calculé une fois puis conservé ; une modification des ledgers n'invalide
+que les mois qu'elle touche (voir `etat.realise`).
+"""
+
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from finance.prevision import COLONNES_FORECAST, completer_forecast
+
+# Statuts des lignes comptées comme réalisées (les lignes prévues ou en devis ne le sont pas)
+STATUTS_REALISES = ('Facturé', 'Payé')
+
+# Lignes rapprochées : lignes éditables du forecast et totaux qui en découlent
+LIGNES_RAPPROCHEES = COLONNES_FORECAST + ['CA_Total', 'Charges_Totales', 'Resultat']
+
+
+def ecarts(prevu: pd.DataFrame, realise: pd.DataFrame) -> pd.DataFrame:
+    """Écarts des mois communs : Mois, Ligne, Prévu, Réalisé, Ecart (réalisé - prévu) et Ecart_Pct"""
+    mois = prevu.index.intersection(realise.index).sort_values()
+    prevu = completer_forecast(prevu.loc[mois, COLONNES_FORECAST].copy())
+    realise = completer_forecast(realise.loc[mois, COLONNES_FORECAST].copy())
+    resultat = pd.concat([prevu[LIGNES_RAPPROCHEES].stack().rename('Prévu'),
+                          realise[LIGNES_RAPPROCHEES].stack().rename('Réalisé')], axis=1)
+    resultat = resultat.rename_axis(['Mois', 'Ligne']).reset_index()
+    resultat['Ecart'] = resultat['Réalisé'] - resultat['Prévu']
+    resultat['Ecart_Pct'] = np.divide(resultat['Ecart'], resultat['Prévu'].abs(),
+                                      out=np.full(len(resultat), np.nan),
+                                      where=resultat['Prévu'].to_numpy() != 0) * 100
+    return resultat
+
+
+class Rapprochement:
+    """Réalisé mensuel des lignes du forecast, conservé par mois"""
+
+    def __init__(self):
+        self._realise: dict[pd.Period, pd.Series] = {}
+
+    def invalider(self, mois: Optional[Iterable[pd.Period]] = None):
+        """Oublie le réalisé des mois donnés (tous si None)"""
+        if mois is None:
+            self._realise.clear()
+        else:
+            for m in mois:
+                self._realise.pop(m, None)
+
+    def mois_calcules(self) -> list[pd.Period]:
+        return sorted(self._realise)
+
+    def realise(self, mois: Iterable[pd.Period],
+                calcul: Callable[[list[pd.Period]], pd.DataFrame]) -> pd.DataFrame:
+        """Réalisé des mois demandés ; `calcul(mois)` ne reçoit que les mois non encore calculés
+
+        `calcul` renvoie les sommes mensuelles (index : mois, colonnes du forecast) ; un mois
+        sans ligne vaut zéro.
+        """
+        mois = sorted(set(mois))
+        manquants = [m for m in mois if m not in self._realise]
+        if manquants:
+            calcules = calcul(manquants).reindex(columns=COLONNES_FORECAST)
+            for m in manquants:
+                self._realise[m] = (calcules.loc[m] if m in calcules.index
+                                    else pd.Series(0.0, index=COLONNES_FORECAST)).fillna(0.0)
+        if not mois:
+            return pd.DataFrame(columns=COLONNES_FORECAST, index=pd.PeriodIndex([], freq='M', name='Mois'),
+                                dtype=float)
+        return pd.DataFrame([self._realise[m] for m in mois],
+                            index=pd.PeriodIndex(mois, freq='M', name='Mois'))[COLONNES_FORECAST]
@@ -0,0 +1,75 @@
+"""Schémas des ledgers manipulés par l'application."""
+
+import pandas as pd
+
+CERTIF = 'facturation_certif'
+AUTRES = 'facturation_autres'
+CHARGES = 'charges_diverses'
+
+# Libellés des ledgers dans les messages
+LIBELLES = {
+    CERTIF: 'Certification',
+    AUTRES: 'Autres prestations',
+    CHARGES: 'Charges diverses',
+}
+
+# Colonnes et types de chaque ledger
+SCHEMAS: dict[str, dict[str, str]] = {
+    CERTIF: {
+        'Date': 'datetime64[ns]',
+        'Client': 'object',
+        'Référentiel': 'object',
+        'Durée': 'float64',
+        'Montant_Facturation': 'float64',
+        'Frais_Mission': 'float64',
+        'Cout_Auditeur': 'float64',
+        'Statut': 'object',
+        'Entité': 'object',
+        'Devise': 'object',
+    },
+    AUTRES: {
+        'Date': 'datetime64[ns]',
+        'Type': 'object',
+        'Client': 'object',
+        'Description': 'object',
+        'Montant_Facturation': 'float64',
+        'Frais_Mission': 'float64',
+        'Cout_Auditeur': 'float64',
+        'Statut': 'object',
+        'Entité': 'object',
+        'Devise': 'object',
+    },
+    CHARGES: {
+        'Date': 'datetime64[ns]',
+        'Catégorie': 'object',
+        'Description': 'object',
+        'Montant': 'float64',
+        'Statut': 'object',
+        'Entité': 'object',
+        'Devise': 'object',
+    },
+}
+
+# Colonnes de montants des ledgers de facturation
+COLONNES_FACTURATION = ['Montant_Facturation', 'Frais_Mission', 'Cout_Auditeur']
+
+# Entité juridique et devise des montants de chaque ligne, avec leurs valeurs par défaut
+COLONNES_ENTITE = ['Entité', 'Devise']
+ENTITE_DEFAUT = 'Principale'
+DEVISE_DEFAUT = 'EUR'
+
+
+def ledger_vide(nom: str) -> pd.DataFrame:
+    """Retourne un ledger vide avec les colonnes et types attendus"""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in SCHEMAS[nom].items()})
+
+
+def completer_entite(df: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute ou complète l'entité et la devise des lignes qui n'en ont pas (valeurs par défaut)"""
+    manquantes = [col for col in COLONNES_ENTITE if col not in df.columns or df[col].isna().any()]
+    if not manquantes:
+        return df
+    df = df.copy()
+    for col, defaut in zip(COLONNES_ENTITE, (ENTITE_DEFAUT, DEVISE_DEFAUT)):
+        df[col] = df[col].fillna(defaut) if col in df.columns else defaut
+    return df
@@ -0,0 +1,200 @@
+"""Requêtes SQL analytiques sur les ledgers avec DuckDB (embarqué, sans serveur).
+
+Les ledgers sont exposés sous forme de tables ``certif``, ``autres`` et
+``charges``, plus une vue ``facturation`` qui réunit les deux lignes de
+facturation avec leur marge. Les montants sont dans la devise de chaque ligne
+(colonne ``Devise``) : les requêtes types se limitent à la devise de base. Une
+source peut être un DataFrame (enregistré sans copie) ou un dossier Parquet
+partitionné, lu à la demande ; les tables peuvent être restreintes à une période.
+
+DuckDB est une dépendance optionnelle : le reste du package n'en a pas besoin.
+"""
+
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from finance.schemas import SCHEMAS, CERTIF, AUTRES, CHARGES, COLONNES_ENTITE, ENTITE_DEFAUT, DEVISE_DEFAUT
+
+# Nom des tables SQL, par ledger
+TABLES = {CERTIF: 'certif', AUTRES: 'autres', CHARGES: 'charges'}
+
+VUE_FACTURATION = """
+CREATE VIEW facturation AS
+SELECT 'Certification' AS Ligne, "Date", Client, "Référentiel" AS Prestation,
+       Montant_Facturation, Frais_Mission, Cout_Auditeur, Statut, "Entité", Devise,
+       Montant_Facturation - Frais_Mission - Cout_Auditeur AS Marge
+FROM certif
+UNION ALL BY NAME
+SELECT 'Autres' AS Ligne, "Date", Client, "Type" AS Prestation,
+       Montant_Facturation, Frais_Mission, Cout_Auditeur, Statut, "Entité", Devise,
+       Montant_Facturation - Frais_Mission - Cout_Auditeur AS Marge
+FROM autres
+"""
+
+# Périodes utilisables comme dimension d'un tableau croisé
+PERIODES = {
+    'Mois': """strftime("Date", '%Y-%m')""",
+    'Trimestre': """concat(year("Date"), '-T', quarter("Date"))""",
+    'Année': """CAST(year("Date") AS VARCHAR)""",
+}
+
+AGREGATS = {'Somme': 'sum', 'Moyenne': 'avg', 'Nombre': 'count', 'Min': 'min', 'Max': 'max'}
+
+# Requêtes proposées en exemple sur la page Analyse, en devise de base (les devises ne s'additionnent pas)
+REQUETES_TYPES = {
+    "Marge par référentiel et par trimestre": f"""
+SELECT Prestation AS "Référentiel", year("Date") AS Annee, quarter("Date") AS Trimestre,
+       sum(Montant_Facturation) AS CA, sum(Marge) AS Marge,
+       round(100 * sum(Marge) / nullif(sum(Montant_Facturation), 0), 1) AS "Taux marge %"
+FROM facturation
+WHERE Ligne = 'Certification' AND Devise = '{DEVISE_DEFAUT}'
+GROUP BY ALL
+ORDER BY Annee, Trimestre, CA DESC""",
+    "Top 20 clients (CA et marge)": f"""
+SELECT Client, count(*) AS Prestations, sum(Montant_Facturation) AS CA, sum(Marge) AS Marge
+FROM facturation
+WHERE Devise = '{DEVISE_DEFAUT}'
+GROUP BY Client
+ORDER BY CA DESC
+LIMIT 20""",
+    "CA mensuel par statut": f"""
+SELECT strftime("Date", '%Y-%m') AS Mois, Statut, sum(Montant_Facturation) AS CA
+FROM facturation
+WHERE Devise = '{DEVISE_DEFAUT}'
+GROUP BY ALL
+ORDER BY Mois, Statut""",
+    "Charges par catégorie et par année": f"""
+SELECT year("Date") AS Annee, "Catégorie", sum(Montant) AS Montant
+FROM charges
+WHERE Devise = '{DEVISE_DEFAUT}'
+GROUP BY ALL
+ORDER BY Annee, Montant DESC""",
+}
+
+Source = Union[pd.DataFrame, str, Path]
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("Le moteur SQL nécessite DuckDB : pip install duckdb") from e
+    return duckdb
+
+
+def _ident(nom: str) -> str:
+    return '"' + nom.replace('"', '""') + '"'
+
+
+def _litteral(texte: str) -> str:
+    return "'" + texte.replace("'", "''") + "'"
+
+
+def _horodatage(date) -> str:
+    return f"TIMESTAMP {_litteral(pd.Timestamp(date).isoformat(sep=' '))}"
+
+
+def _filtre_periode(debut, fin) -> str:
+    """Clause WHERE des lignes datées des jours [debut, fin] (vide si la période n'est pas bornée)
+
+    La condition sur les colonnes de partition écarte les dossiers des autres mois sans les lire.
+    """
+    conditions = []
+    if debut is not None:
+        debut = pd.Timestamp(debut).normalize()
+        conditions += [f"annee * 12 + mois >= {debut.year * 12 + debut.month}",
+                       f'"Date" >= {_horodatage(debut)}']
+    if fin is not None:
+        fin = pd.Timestamp(fin).normalize()
+        conditions += [f"annee * 12 + mois <= {fin.year * 12 + fin.month}",
+                       f'"Date" < {_horodatage(fin + pd.Timedelta(days=1))}']
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def connexion(sources: dict[str, Source], debut=None, fin=None):
+    """Connexion DuckDB en mémoire exposant les ledgers fournis, restreints aux jours [debut, fin].
+
+    Une source est un DataFrame ou un dossier Parquet partitionné (Hive), dont seules
+    les colonnes du ledger sont exposées. Depuis SQL, seuls ces dossiers sont
+    accessibles : le reste du système de fichiers est fermé aux requêtes libres.
+    """
+    duckdb = _duckdb()
+    con = duckdb.connect()
+    dossiers = [str(Path(source).resolve()) + '/' for source in sources.values()
+                if not isinstance(source, pd.DataFrame)]
+    if dossiers:
+        con.execute(f"SET allowed_directories = [{', '.join(_litteral(d) for d in dossiers)}]")
+    con.execute("SET enable_external_access = false")
+
+    for nom, source in sources.items():
+        table = TABLES[nom]
+        if isinstance(source, pd.DataFrame):
+            if debut is not None or fin is not None:
+                dates = source['Date']
+                masque = pd.Series(True, index=source.index)
+                if debut is not None:
+                    masque &= dates >= pd.Timestamp(debut).normalize()
+                if fin is not None:
+                    masque &= dates < pd.Timestamp(fin).normalize() + pd.Timedelta(days=1)
+                source = source[masque]
+            if list(source.columns) != list(SCHEMAS[nom]):
+                source = source[list(SCHEMAS[nom])]
+            con.register(table, source)
+        else:
+            # Colonnes du ledger seulement : ni identifiant ni colonnes de partition (annee, mois).
+            # Comme à la lecture de l'entrepôt, l'entité et la devise des partitions écrites
+            # avant leur ajout prennent les valeurs par défaut.
+            motif = str(Path(source).resolve() / '**' / '*.parquet')
+            defauts = dict(zip(COLONNES_ENTITE, (ENTITE_DEFAUT, DEVISE_DEFAUT)))
+            selection = ', '.join(
+                f"coalesce({_ident(colonne)}, {_litteral(defauts[colonne])}) AS {_ident(colonne)}"
+                if colonne in defauts else _ident(colonne) for colonne in SCHEMAS[nom])
+            con.execute(f"CREATE VIEW {table} AS SELECT {selection} "
+                        f"FROM read_parquet({_litteral(motif)}, hive_partitioning = true, union_by_name = true)"
+                        + _filtre_periode(debut, fin))
+    if CERTIF in sources and AUTRES in sources:
+        con.execute(VUE_FACTURATION)
+    return con
+
+
+def executer(con, requete: str, parametres: Optional[list] = None) -> pd.DataFrame:
+    """Exécute une requête et retourne le résultat en DataFrame"""
+    return con.execute(requete, parametres or []).df()
+
+
+def colonnes(con, table: str) -> list[str]:
+    return [ligne[0] for ligne in con.execute(f"DESCRIBE {_ident(table)}").fetchall()]
+
+
+def tableau_croise(con, table: str, lignes: list[str], valeur: str, colonne: Optional[str] = None,
+                   agregat: str = 'Somme', statuts: Optional[list[str]] = None) -> pd.DataFrame:
+    """Agrège `valeur` par `lignes` (et `colonne`) dans DuckDB, puis met en forme le tableau croisé.
+
+    Les dimensions sont des colonnes de la table ou une période de PERIODES
+    ('Mois', 'Trimestre', 'Année'). Seul le résultat agrégé revient en pandas.
+    """
+    disponibles = colonnes(con, table)
+    dimensions = list(lignes) + ([colonne] if colonne else [])
+    for nom in dimensions + [valeur]:
+        if nom not in disponibles and nom not in PERIODES:
+            raise ValueError(f"Colonne inconnue dans {table} : {nom}")
+
+    selection = [f"{PERIODES.get(nom, _ident(nom))} AS {_ident(nom)}" for nom in dimensions]
+    requete = f"SELECT {', '.join(selection)}, {AGREGATS[agregat]}({_ident(valeur)}) AS {_ident(valeur)} " \
+              f"FROM {_ident(table)}"
+    parametres = []
+    if statuts:
+        requete += f" WHERE Statut IN ({', '.join(['?'] * len(statuts))})"
+        parametres = list(statuts)
+    requete += " GROUP BY ALL ORDER BY ALL"
+    resultat = executer(con, requete, parametres)
+
+    if colonne:
+        resultat = resultat.pivot_table(index=lignes, columns=colonne, values=valeur,
+                                        aggfunc='sum', fill_value=0)
+        resultat.columns = resultat.columns.astype(str)
+        resultat.columns.name = None
+        resultat = resultat.reset_index()
+    return resultat
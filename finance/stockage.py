@@ -0,0 +1,267 @@
+"""Entrepôt Parquet partitionné par année et mois, pour les ledgers qui dépassent la RAM.
+
+Chaque ledger est un dataset Parquet au format Hive
+(``<racine>/<ledger>/annee=2025/mois=3/*.parquet``). Les lectures ne chargent que
+les partitions de la période demandée et les colonnes demandées ; les autres
+filtres d'égalité sont poussés jusqu'aux row groups Parquet. Chaque ligne porte un
+identifiant stable (colonne `id`), rendu comme index des DataFrames lus.
+
+L'entrepôt est partagé par les sessions du serveur : chaque écriture incrémente la
+génération du ledger et note les mois écrits, ce qui permet à une session de
+n'invalider que les mois modifiés par les autres depuis sa dernière lecture.
+"""
+
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from finance.schemas import SCHEMAS, COLONNES_ENTITE, ENTITE_DEFAUT, DEVISE_DEFAUT, ledger_vide
+
+TYPES_ARROW = {
+    'datetime64[ns]': pa.timestamp('ns'),
+    'object': pa.string(),
+    'float64': pa.float64(),
+}
+
+# Identifiant stable des lignes, hors schéma du ledger
+COLONNE_ID = 'id'
+
+# Écritures dont les mois sont retenus, par ledger (au-delà, une session en retard invalide tout)
+HISTORIQUE_ECRITURES = 1000
+
+PARTITIONNEMENT = ds.partitioning(pa.schema([('annee', pa.int16()), ('mois', pa.int8())]), flavor='hive')
+
+Date = Union[str, pd.Timestamp, None]
+
+
+def schema_arrow(nom: str) -> pa.Schema:
+    return pa.schema([(col, TYPES_ARROW[dtype]) for col, dtype in SCHEMAS[nom].items()])
+
+
+def _mois(date) -> int:
+    """Numéro de mois absolu (année * 12 + mois - 1), pour comparer les partitions"""
+    date = pd.Timestamp(date)
+    return date.year * 12 + date.month - 1
+
+
+def mois_de_dates(dates: pd.Series) -> set[tuple[int, int]]:
+    """Partitions (année, mois) des dates"""
+    dates = pd.DatetimeIndex(dates.dropna())
+    return set(zip(dates.year.tolist(), dates.month.tolist()))
+
+
+def filtre_periode(debut: Date = None, fin: Date = None) -> Optional[ds.Expression]:
+    """Expression sur les partitions et la colonne Date ; `fin` est incluse (au jour près)"""
+    filtre = None
+    mois_absolu = ds.field('annee').cast(pa.int32()) * 12 + ds.field('mois').cast(pa.int32()) - 1
+    if debut is not None:
+        filtre = (mois_absolu >= _mois(debut)) & (ds.field('Date') >= pd.Timestamp(debut))
+    if fin is not None:
+        fin = pd.Timestamp(fin).normalize() + pd.Timedelta(days=1)
+        condition = (mois_absolu <= _mois(fin - pd.Timedelta(days=1))) & (ds.field('Date') < fin)
+        filtre = condition if filtre is None else filtre & condition
+    return filtre
+
+
+def filtre_egalites(egalites: dict) -> Optional[ds.Expression]:
+    """Expression à partir de {colonne: valeur ou liste de valeurs} ; None est ignoré"""
+    filtre = None
+    for colonne, valeur in egalites.items():
+        if valeur is None:
+            continue
+        if isinstance(valeur, (list, tuple, set)):
+            condition = ds.field(colonne).isin(list(valeur))
+        else:
+            condition = ds.field(colonne) == valeur
+        filtre = condition if filtre is None else filtre & condition
+    return filtre
+
+
+class EntrepotParquet:
+    """Ledgers stockés en Parquet partitionné, lus par partitions et par colonnes"""
+
+    def __init__(self, racine: Union[str, Path]):
+        self.racine = Path(racine)
+        self._prochains_ids: dict[str, int] = {}
+        self._verrou = threading.Lock()
+        self._generations: dict[str, int] = {}
+        # Par ledger : (génération, mois écrits ou None pour tout le ledger), des plus anciennes aux plus récentes
+        self._ecritures: dict[str, list[tuple[int, Optional[set[tuple[int, int]]]]]] = {}
+
+    def _ecrit(self, nom: str, mois: Optional[set[tuple[int, int]]]):
+        """Incrémente la génération du ledger et retient les mois écrits (None : tout le ledger)"""
+        with self._verrou:
+            generation = self._generations[nom] = self._generations.get(nom, 0) + 1
+            ecritures = self._ecritures.setdefault(nom, [])
+            ecritures.append((generation, mois))
+            del ecritures[:-HISTORIQUE_ECRITURES]
+
+    def generation(self, nom: str) -> int:
+        """Nombre d'écritures du ledger depuis l'ouverture de l'entrepôt"""
+        return self._generations.get(nom, 0)
+
+    def mois_ecrits(self, nom: str, depuis: int) -> Optional[set[pd.Period]]:
+        """Mois écrits après la génération `depuis` (None : inconnus, tout le ledger est à relire)"""
+        with self._verrou:
+            ecritures = [mois for generation, mois in self._ecritures.get(nom, []) if generation > depuis]
+            complet = len(ecritures) == self.generation(nom) - depuis
+        if not complet or any(mois is None for mois in ecritures):
+            return None
+        return {pd.Period(year=annee, month=numero, freq='M') for mois in ecritures for annee, numero in mois}
+
+    def dossier(self, nom: str) -> Path:
+        return self.racine / nom
+
+    def existe(self, nom: str) -> bool:
+        return self.dossier(nom).is_dir() and any(self.dossier(nom).rglob('*.parquet'))
+
+    def dataset(self, nom: str) -> ds.Dataset:
+        schema = (schema_arrow(nom).append(pa.field(COLONNE_ID, pa.int64()))
+                  .append(pa.field('annee', pa.int16())).append(pa.field('mois', pa.int8())))
+        return ds.dataset(self.dossier(nom), format='parquet', partitioning=PARTITIONNEMENT, schema=schema)
+
+    def _table(self, nom: str, df: pd.DataFrame) -> pa.Table:
+        """Table Arrow des lignes ; l'index de `df` donne les identifiants"""
+        if df['Date'].isna().any():
+            raise ValueError(f"{nom} : des lignes sans date ne peuvent pas être partitionnées")
+        df = df[list(SCHEMAS[nom])].astype(SCHEMAS[nom])
+        table = pa.Table.from_pandas(df, schema=schema_arrow(nom), preserve_index=False)
+        ids = df.index.to_numpy(dtype='int64')
+        if len(ids):
+            with self._verrou:
+                self._prochains_ids[nom] = max(self.prochain_id(nom), int(ids.max()) + 1)
+        dates = df['Date']
+        return (table.append_column(COLONNE_ID, pa.array(ids, pa.int64()))
+                     .append_column('annee', pa.array(dates.dt.year.to_numpy(), pa.int16()))
+                     .append_column('mois', pa.array(dates.dt.month.to_numpy(), pa.int8())))
+
+    def _ecrire(self, nom: str, df: pd.DataFrame, dossier: Path):
+        if len(df) == 0:
+            return
+        ds.write_dataset(
+            self._table(nom, df), dossier, format='parquet', partitioning=PARTITIONNEMENT,
+            basename_template=f'{uuid.uuid4().hex}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+    @contextmanager
+    def _brouillon(self):
+        """Dossier temporaire de l'entrepôt (même système de fichiers, hors des ledgers), supprimé à la sortie"""
+        dossier = self.racine / f'.ecriture-{uuid.uuid4().hex}'
+        dossier.mkdir(parents=True)
+        try:
+            yield dossier
+        finally:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+    def ajouter(self, nom: str, df: pd.DataFrame):
+        """Ajoute des lignes ; seules les partitions des mois concernés reçoivent un nouveau fichier"""
+        self._ecrire(nom, df, self.dossier(nom))
+        if len(df):
+            self._ecrit(nom, mois_de_dates(df['Date']))
+
+    def remplacer(self, nom: str, df: pd.DataFrame):
+        """Remplace tout le ledger : écrit à part, puis substitué à l'ancien par renommage"""
+        with self._brouillon() as brouillon:
+            nouveau, ancien = brouillon / 'nouveau', brouillon / 'ancien'
+            nouveau.mkdir()
+            self._ecrire(nom, df, nouveau)
+            if self.dossier(nom).exists():
+                os.replace(self.dossier(nom), ancien)
+            os.replace(nouveau, self.dossier(nom))
+        self._ecrit(nom, None)
+
+    def remplacer_partitions(self, nom: str, df: pd.DataFrame, mois: list[tuple[int, int]]):
+        """Réécrit les partitions (année, mois) listées avec les lignes de `df`, sans toucher aux autres
+
+        Les nouvelles partitions sont écrites à part puis substituées aux anciennes par
+        renommage : une erreur pendant l'écriture laisse le ledger intact.
+        """
+        mois = set(mois) | mois_de_dates(df['Date'])
+        with self._brouillon() as brouillon:
+            self._ecrire(nom, df, brouillon / 'nouveau')
+            for annee, numero in sorted(mois):
+                relatif = Path(f'annee={annee}') / f'mois={numero}'
+                partition, nouvelle = self.dossier(nom) / relatif, brouillon / 'nouveau' / relatif
+                if partition.exists():
+                    (brouillon / 'ancien' / relatif).parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(partition, brouillon / 'ancien' / relatif)
+                if nouvelle.exists():
+                    partition.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(nouvelle, partition)
+        self._ecrit(nom, mois)
+
+    def prochain_id(self, nom: str) -> int:
+        """Premier identifiant libre du ledger"""
+        if nom not in self._prochains_ids:
+            maximum = pc.max(self.dataset(nom).to_table(columns=[COLONNE_ID])[COLONNE_ID]).as_py() \
+                if self.existe(nom) else None
+            self._prochains_ids[nom] = 0 if maximum is None else maximum + 1
+        return self._prochains_ids[nom]
+
+    def reserver_ids(self, nom: str, n: int) -> int:
+        """Réserve `n` identifiants consécutifs du ledger ; retourne le premier
+
+        Le compteur avance dès la réservation : deux sessions qui ajoutent des lignes en même
+        temps n'obtiennent pas les mêmes identifiants.
+        """
+        with self._verrou:
+            debut = self.prochain_id(nom)
+            self._prochains_ids[nom] = debut + n
+        return debut
+
+    def migrer_ids(self, nom: str):
+        """Attribue des identifiants aux lignes d'un entrepôt écrit avant leur introduction"""
+        if not self.existe(nom):
+            return
+        fichiers = ds.dataset(self.dossier(nom), format='parquet', partitioning=PARTITIONNEMENT).get_fragments()
+        if all(COLONNE_ID in fragment.physical_schema.names for fragment in fichiers):
+            return
+        df = self.dataset(nom).to_table(columns=list(SCHEMAS[nom])).to_pandas()
+        self._prochains_ids[nom] = 0
+        self.remplacer(nom, df.sort_values('Date', kind='stable', ignore_index=True))
+
+    def partitions(self, nom: str) -> list[tuple[int, int]]:
+        """Partitions (année, mois) présentes, triées"""
+        if not self.dossier(nom).exists():
+            return []
+        return sorted((int(p.parent.name.split('=')[1]), int(p.name.split('=')[1]))
+                      for p in self.dossier(nom).glob('annee=*/mois=*') if any(p.glob('*.parquet')))
+
+    def nombre_lignes(self, nom: str, debut: Date = None, fin: Date = None) -> int:
+        if not self.existe(nom):
+            return 0
+        return self.dataset(nom).count_rows(filter=filtre_periode(debut, fin))
+
+    def lire(self, nom: str, colonnes: Optional[list[str]] = None, debut: Date = None, fin: Date = None,
+             egalites: Optional[dict] = None) -> pd.DataFrame:
+        """Lit les colonnes demandées des partitions de la période, avec filtres d'égalité poussés"""
+        colonnes = list(SCHEMAS[nom]) if colonnes is None else list(colonnes)
+        if not self.existe(nom):
+            return ledger_vide(nom)[colonnes]
+
+        filtre = filtre_periode(debut, fin)
+        egalites_filtre = filtre_egalites(egalites or {})
+        if egalites_filtre is not None:
+            filtre = egalites_filtre if filtre is None else filtre & egalites_filtre
+
+        table = self.dataset(nom).to_table(columns=colonnes + [COLONNE_ID], filter=filtre)
+        df = table.to_pandas().set_index(COLONNE_ID).rename_axis(None)
+        if 'Date' in df.columns:
+            # Les partitions sont lues dans l'ordre des chemins : on rétablit l'ordre chronologique
+            df['Date'] = df['Date'].astype('datetime64[ns]')
+            df = df.sort_values('Date', kind='stable')
+        # Partitions écrites avant l'ajout de l'entité et de la devise : valeurs par défaut
+        for col, defaut in zip(COLONNES_ENTITE, (ENTITE_DEFAUT, DEVISE_DEFAUT)):
+            if col in df.columns:
+                df[col] = df[col].fillna(defaut)
+        return df
@@ -0,0 +1,153 @@
+"""Tâches de fond : imports, backtests et exports exécutés hors du thread du script.
+
+Un `Executeur` fait tourner les tâches sur un pool de threads et tient la table de
+leur état (en attente, en cours, terminée, en échec, annulée) et de leur progression.
+La fonction d'une tâche reçoit en premier argument un rapporteur
+`progression(fraction, message)` et retourne son résultat ; elle ne touche pas à
+l'état de session, que seul le thread du script modifie (voir `etat.livrer_taches`).
+Un appel au rapporteur après une demande d'annulation interrompt la tâche.
+"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from finance.memoire import pic_memoire
+
+EN_ATTENTE = 'En attente'
+EN_COURS = 'En cours'
+TERMINEE = 'Terminée'
+ECHEC = 'Échec'
+ANNULEE = 'Annulée'
+ETATS_FINAUX = (TERMINEE, ECHEC, ANNULEE)
+
+# Tâches finies conservées dans la table (les plus anciennes sont oubliées)
+CONSERVATION = 50
+
+
+class TacheAnnulee(Exception):
+    """Levée par le rapporteur de progression d'une tâche dont l'annulation est demandée"""
+
+
+@dataclass
+class Tache:
+    id: int
+    libelle: str
+    genre: str                 # 'import', 'backtest', 'export'...
+    proprietaire: str          # session qui a lancé la tâche et recevra son résultat
+    etat: str = EN_ATTENTE
+    progression: float = 0.0
+    message: str = ''
+    resultat: Any = None
+    erreur: Optional[str] = None
+    livraison: Optional[Callable[[Any], None]] = None   # appelée par le thread du script à la fin
+    livree: bool = False
+    creee: datetime = field(default_factory=datetime.now)
+    debut: Optional[datetime] = None
+    fin: Optional[datetime] = None
+    pic_memoire: int = 0       # hausse maximale de la mémoire résidente pendant l'exécution (octets)
+    annulation: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finie(self) -> bool:
+        return self.etat in ETATS_FINAUX
+
+    @property
+    def a_livrer(self) -> bool:
+        return self.etat == TERMINEE and self.livraison is not None and not self.livree
+
+    @property
+    def duree(self) -> Optional[float]:
+        """Durée d'exécution en secondes (jusqu'à maintenant si la tâche tourne)"""
+        if self.debut is None:
+            return None
+        return ((self.fin or datetime.now()) - self.debut).total_seconds()
+
+
+class Executeur:
+    """Pool de threads et table des tâches, partagés par les sessions du serveur"""
+
+    def __init__(self, max_workers: int = 2, conservation: int = CONSERVATION):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tache')
+        self._verrou = threading.Lock()
+        self._taches: dict[int, Tache] = {}
+        self._futures = {}
+        self._compteur = itertools.count(1)
+        self.conservation = conservation
+
+    def soumettre(self, libelle: str, fonction: Callable, *args, genre: str = '', proprietaire: str = '',
+                  livraison: Optional[Callable[[Any], None]] = None, **kwargs) -> Tache:
+        """Lance `fonction(progression, *args, **kwargs)` en arrière-plan ; retourne la tâche"""
+        with self._verrou:
+            tache = Tache(next(self._compteur), libelle, genre, proprietaire, livraison=livraison)
+            self._taches[tache.id] = tache
+            self._oublier_anciennes()
+            self._futures[tache.id] = self._pool.submit(self._executer, tache, fonction, args, kwargs)
+        return tache
+
+    def _executer(self, tache: Tache, fonction: Callable, args: tuple, kwargs: dict):
+        def progression(fraction: float, message: str = ''):
+            if tache.annulation.is_set():
+                raise TacheAnnulee()
+            tache.progression = min(max(float(fraction), 0.0), 1.0)
+            tache.message = message or tache.message
+
+        tache.debut = datetime.now()
+        tache.etat = EN_COURS
+        try:
+            progression(0.0)
+            with pic_memoire() as pic:
+                tache.resultat = fonction(progression, *args, **kwargs)
+            tache.pic_memoire = pic.octets
+            tache.progression = 1.0
+            tache.etat = TERMINEE
+        except TacheAnnulee:
+            tache.etat = ANNULEE
+        except Exception as e:
+            tache.erreur = f"{type(e).__name__}: {e}"
+            tache.etat = ECHEC
+        finally:
+            tache.fin = datetime.now()
+            with self._verrou:
+                self._futures.pop(tache.id, None)
+
+    def _oublier_anciennes(self):
+        finies = [t.id for t in self._taches.values() if t.finie and not t.a_livrer]
+        for identifiant in finies[:max(len(finies) - self.conservation, 0)]:
+            del self._taches[identifiant]
+
+    def tache(self, identifiant: int) -> Optional[Tache]:
+        return self._taches.get(identifiant)
+
+    def taches(self, proprietaire: Optional[str] = None, genre: Optional[str] = None) -> list[Tache]:
+        """Tâches de la table, des plus récentes aux plus anciennes"""
+        with self._verrou:
+            taches = list(self._taches.values())
+        return [t for t in reversed(taches)
+                if (proprietaire is None or t.proprietaire == proprietaire) and (genre is None or t.genre == genre)]
+
+    def annuler(self, identifiant: int):
+        """Annule une tâche en attente, ou demande l'arrêt d'une tâche en cours"""
+        tache = self._taches.get(identifiant)
+        if tache is None or tache.finie:
+            return
+        tache.annulation.set()
+        future = self._futures.get(identifiant)
+        if future is not None and future.cancel():
+            tache.etat = ANNULEE
+            tache.fin = datetime.now()
+
+    def oublier(self, identifiant: int):
+        """Retire une tâche finie de la table (son résultat est libéré)"""
+        with self._verrou:
+            tache = self._taches.get(identifiant)
+            if tache is not None and tache.finie:
+                del self._taches[identifiant]
+
+    def arreter(self):
+        for tache in self.taches():
+            self.annuler(tache.id)
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+"""Projection de trésorerie hebdomadaire à partir des statuts et des conditions de paiement.
+
+Chaque ligne de facturation produit un encaissement à sa date + délai client
+(éventuellement fin de mois) et un décaissement (coût auditeur et frais de mission)
+à sa date + délai auditeurs ; chaque charge non payée, un décaissement à sa date +
+délai fournisseurs. Les devis sont pondérés par leur probabilité de signature.
+
+Les flux sont sommés par semaine et par mois d'origine des lignes : un mois n'est
+recalculé que lorsqu'une modification du ledger le touche. La projection situe
+ensuite les flux par rapport à la semaine courante : les flux échus des lignes
+facturées sont supposés réglés, les autres flux échus sont reportés sur la semaine
+courante (retards).
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from finance.partitions import plages
+from finance.schemas import CHARGES
+
+FLUX_ENTREES = ['Clients facturés', 'Facturation prévue', 'Devis pondérés']
+FLUX_SORTIES = ['Auditeurs et frais', 'Charges diverses']
+
+# Colonnes lues pour chaque ledger
+COLONNES_FACTURATION_TRESORERIE = ['Date', 'Statut', 'Montant_Facturation', 'Frais_Mission', 'Cout_Auditeur']
+COLONNES_CHARGES_TRESORERIE = ['Date', 'Statut', 'Montant']
+
+SEMAINE = 'W-SUN'
+
+
+@dataclass(frozen=True)
+class ConditionsPaiement:
+    delai_clients: int = 45          # jours entre la facture et l'encaissement
+    fin_de_mois: bool = False        # échéance clients reportée en fin de mois
+    delai_auditeurs: int = 30        # jours entre l'audit et le paiement de l'auditeur et des frais
+    delai_fournisseurs: int = 30     # jours entre la charge et son paiement
+    probabilite_devis: float = 0.3   # part des devis supposée signée
+
+
+def colonnes_tresorerie(nom: str) -> list[str]:
+    return COLONNES_CHARGES_TRESORERIE if nom == CHARGES else COLONNES_FACTURATION_TRESORERIE
+
+
+def _echeances(dates: pd.Series, delai: int, fin_de_mois: bool = False) -> pd.Series:
+    echeances = dates + pd.Timedelta(days=delai)
+    return echeances + pd.offsets.MonthEnd(0) if fin_de_mois else echeances
+
+
+def flux_facturation(df: pd.DataFrame, conditions: ConditionsPaiement) -> pd.DataFrame:
+    """Flux datés d'un ledger de facturation : Date, Flux, Montant (signé) et Regle
+
+    `Regle` marque les flux des lignes facturées, supposés réglés une fois échus.
+    """
+    statut = df['Statut'].to_numpy()
+    facture, prevu, devis = statut == 'Facturé', statut == 'Prévu', statut == 'Devis'
+    poids = np.select([facture | prevu, devis], [1.0, conditions.probabilite_devis], 0.0)
+    garde = poids > 0
+    entrees = pd.DataFrame({
+        'Date': _echeances(df['Date'], conditions.delai_clients, conditions.fin_de_mois),
+        'Flux': np.select([facture, prevu], FLUX_ENTREES[:2], FLUX_ENTREES[2]),
+        'Montant': df['Montant_Facturation'].to_numpy() * poids,
+        'Regle': facture,
+    })[garde]
+    sorties = pd.DataFrame({
+        'Date': _echeances(df['Date'], conditions.delai_auditeurs),
+        'Flux': FLUX_SORTIES[0],
+        'Montant': -(df['Frais_Mission'].to_numpy() + df['Cout_Auditeur'].to_numpy()) * poids,
+        'Regle': facture,
+    })[garde]
+    return pd.concat([entrees, sorties], ignore_index=True)
+
+
+def flux_charges(df: pd.DataFrame, conditions: ConditionsPaiement) -> pd.DataFrame:
+    """Flux datés des charges non payées (Date, Flux, Montant, Regle)"""
+    a_payer = df[df['Statut'] != 'Payé']
+    return pd.DataFrame({
+        'Date': _echeances(a_payer['Date'], conditions.delai_fournisseurs),
+        'Flux': FLUX_SORTIES[1],
+        'Montant': -a_payer['Montant'].to_numpy(),
+        'Regle': False,
+    })
+
+
+def par_semaine(flux: pd.DataFrame) -> pd.DataFrame:
+    """Sommes par semaine, flux et caractère réglé"""
+    semaines = flux['Date'].dt.to_period(SEMAINE).rename('Semaine')
+    return flux.groupby([semaines, 'Flux', 'Regle'])['Montant'].sum().reset_index()
+
+
+class FluxTresorerie:
+    """Flux hebdomadaires par ledger et par mois d'origine des lignes, pour des conditions données"""
+
+    def __init__(self, conditions: ConditionsPaiement):
+        self.conditions = conditions
+        self._pieces: dict[tuple[str, pd.Period], pd.DataFrame] = {}
+
+    def invalider(self, nom: str, mois: Optional[Iterable[pd.Period]] = None):
+        """Oublie les flux des mois donnés du ledger (tous si None)"""
+        for cle in [cle for cle in self._pieces if cle[0] == nom and (mois is None or cle[1] in set(mois))]:
+            del self._pieces[cle]
+
+    def flux(self, nom: str, mois: Iterable[pd.Period],
+             lecteur: Callable[[pd.Period, pd.Period], pd.DataFrame]) -> pd.DataFrame:
+        """Flux hebdomadaires des lignes des mois donnés ; `lecteur(debut, fin)` lit les mois à calculer"""
+        mois = sorted(set(mois))
+        calcul = flux_charges if nom == CHARGES else flux_facturation
+        for debut, fin in plages([m for m in mois if (nom, m) not in self._pieces]):
+            lignes = lecteur(debut, fin)
+            par_mois = dict(tuple(lignes.groupby(lignes['Date'].dt.to_period('M'))))
+            for m in pd.period_range(debut, fin, freq='M'):
+                self._pieces[nom, m] = par_semaine(calcul(par_mois.get(m, lignes.iloc[:0]), self.conditions))
+        morceaux = [self._pieces[nom, m] for m in mois]
+        if not morceaux:
+            return pd.DataFrame({'Semaine': pd.Series(dtype=f'period[{SEMAINE}]'), 'Flux': pd.Series(dtype='object'),
+                                 'Regle': pd.Series(dtype='bool'), 'Montant': pd.Series(dtype='float64')})
+        return pd.concat(morceaux, ignore_index=True)
+
+
+def projection(flux: pd.DataFrame, semaine: pd.Period, nb_semaines: int, solde_initial: float = 0.0) -> pd.DataFrame:
+    """Tableau hebdomadaire des `nb_semaines` semaines à partir de `semaine`
+
+    Colonnes : un flux par colonne (entrées positives, sorties négatives), Entrées, Sorties,
+    Flux_Net et Solde (cumulé depuis `solde_initial`). Les flux échus non réglés sont
+    reportés sur la première semaine.
+    """
+    echus = flux['Semaine'] < semaine
+    flux = flux[~(echus & flux['Regle'])].copy()
+    flux.loc[flux['Semaine'] < semaine, 'Semaine'] = semaine
+    semaines = pd.period_range(semaine, periods=nb_semaines, freq=SEMAINE)
+    tableau = (flux[flux['Semaine'].isin(semaines)]
+               .pivot_table(index='Semaine', columns='Flux', values='Montant', aggfunc='sum')
+               .reindex(index=semaines, columns=FLUX_ENTREES + FLUX_SORTIES)
+               .fillna(0.0))
+    tableau['Entrées'] = tableau[FLUX_ENTREES].sum(axis=1)
+    tableau['Sorties'] = tableau[FLUX_SORTIES].sum(axis=1)
+    tableau['Flux_Net'] = tableau['Entrées'] + tableau['Sorties']
+    tableau['Solde'] = solde_initial + tableau['Flux_Net'].cumsum()
+    tableau.index.name = 'Semaine'
+    return tableau
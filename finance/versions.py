@@ -0,0 +1,190 @@
+"""Versions enregistrées du forecast, codées en écarts au forecast généré.
+
+Un forecast généré (la « base ») est conservé une seule fois, identifié par
+l'empreinte de son contenu ; chaque version n'enregistre que ses ajustements
+manuels (mois, ligne, écart à la base), soit quelques cellules. Les comparaisons
+entre versions d'une même base se font sur ces seuls écarts.
+
+Les forecasts sont indexés par mois (périodes mensuelles, voir
+`finance.prevision.mois_forecast`) et ont pour colonnes `COLONNES_FORECAST`.
+
+Un dépôt persistant peut être partagé par plusieurs sessions, voire plusieurs
+serveurs : les numéros de version sont attribués sous verrou, et le fichier d'une
+version est créé en exclusivité (un numéro déjà pris par un autre serveur est sauté).
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+from finance.prevision import COLONNES_FORECAST
+
+COLONNES_AJUSTEMENTS = ['Mois', 'Ligne', 'Ecart']
+
+
+def empreinte(base: pd.DataFrame) -> str:
+    """Identifiant du contenu d'un forecast généré"""
+    contenu = hashlib.sha1(' '.join(base.index.astype(str)).encode('utf-8'))
+    contenu.update(base[COLONNES_FORECAST].to_numpy(dtype=float).tobytes())
+    return contenu.hexdigest()[:16]
+
+
+def ajustements(base: pd.DataFrame, forecast: pd.DataFrame) -> pd.DataFrame:
+    """Cellules du forecast différentes de la base : Mois, Ligne et Ecart (forecast - base)"""
+    ecarts = (forecast[COLONNES_FORECAST].astype(float) - base[COLONNES_FORECAST]).stack()
+    ecarts = ecarts[ecarts.round(6) != 0]
+    ecarts.index.names = ['Mois', 'Ligne']
+    return ecarts.rename('Ecart').reset_index()
+
+
+def appliquer(base: pd.DataFrame, ajust: pd.DataFrame) -> pd.DataFrame:
+    """Base augmentée des ajustements ; ceux des mois absents de la base sont ignorés"""
+    forecast = base[COLONNES_FORECAST].copy()
+    ajust = ajust[ajust['Mois'].isin(forecast.index)]
+    if len(ajust):
+        ecarts = ajust.pivot_table(index='Mois', columns='Ligne', values='Ecart', aggfunc='sum')
+        forecast = forecast.add(ecarts.reindex(index=forecast.index, columns=COLONNES_FORECAST), fill_value=0)
+    return forecast
+
+
+@dataclass(frozen=True)
+class VersionForecast:
+    numero: int
+    libelle: str
+    cree_le: pd.Timestamp
+    modele: str
+    base: str                  # empreinte du forecast généré
+    ajustements: pd.DataFrame  # COLONNES_AJUSTEMENTS
+
+
+def _vers_json(df: pd.DataFrame) -> dict:
+    donnees = df.copy()
+    if 'Mois' in donnees:
+        donnees['Mois'] = donnees['Mois'].astype(str)
+    return donnees.to_dict(orient='list')
+
+
+def _mois(valeurs) -> pd.PeriodIndex:
+    return pd.PeriodIndex(list(valeurs), freq='M')
+
+
+class DepotVersions:
+    """Versions du forecast, en mémoire ou persistées en JSON dans `dossier`"""
+
+    def __init__(self, dossier: Union[str, Path, None] = None):
+        self.dossier = None if dossier is None else Path(dossier)
+        self._bases: dict[str, pd.DataFrame] = {}
+        self._versions: dict[int, VersionForecast] = {}
+        self._verrou = threading.Lock()
+        if self.dossier is not None:
+            self._charger()
+
+    def _charger(self):
+        for fichier in sorted((self.dossier / 'bases').glob('*.json')):
+            donnees = json.loads(fichier.read_text(encoding='utf-8'))
+            self._bases[fichier.stem] = pd.DataFrame(
+                {ligne: donnees[ligne] for ligne in COLONNES_FORECAST}, index=_mois(donnees['Mois']), dtype=float)
+        for fichier in sorted((self.dossier / 'versions').glob('*.json')):
+            donnees = json.loads(fichier.read_text(encoding='utf-8'))
+            ajust = pd.DataFrame(donnees['ajustements'], columns=COLONNES_AJUSTEMENTS)
+            ajust['Mois'] = pd.Series(_mois(ajust['Mois']), dtype='period[M]')
+            self._versions[donnees['numero']] = VersionForecast(
+                donnees['numero'], donnees['libelle'], pd.Timestamp(donnees['cree_le']),
+                donnees['modele'], donnees['base'], ajust)
+
+    def _ecrire(self, sous_dossier: str, nom: str, contenu: dict, exclusif: bool = False) -> bool:
+        """Écrit le fichier JSON ; en mode exclusif, retourne False sans rien écrire s'il existe déjà"""
+        dossier = self.dossier / sous_dossier
+        dossier.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(dossier / f'{nom}.json', 'x' if exclusif else 'w', encoding='utf-8') as f:
+                f.write(json.dumps(contenu, ensure_ascii=False))
+        except FileExistsError:
+            return False
+        return True
+
+    def _prochain_numero(self) -> int:
+        """Numéro suivant le plus grand connu, en mémoire ou déjà écrit par un autre serveur"""
+        numeros = set(self._versions)
+        if self.dossier is not None:
+            numeros |= {int(f.stem) for f in (self.dossier / 'versions').glob('*.json') if f.stem.isdigit()}
+        return max(numeros, default=0) + 1
+
+    def enregistrer(self, libelle: str, modele: str, base: pd.DataFrame, forecast: pd.DataFrame) -> VersionForecast:
+        """Enregistre `forecast` (indexé comme `base`) comme nouvelle version"""
+        cle = empreinte(base)
+        ajust = ajustements(base, forecast)
+        with self._verrou:
+            if cle not in self._bases:
+                self._bases[cle] = base[COLONNES_FORECAST].astype(float)
+                if self.dossier is not None:
+                    self._ecrire('bases', cle, _vers_json(self._bases[cle].rename_axis('Mois').reset_index()))
+            while True:
+                version = VersionForecast(self._prochain_numero(), libelle, pd.Timestamp.now().floor('s'),
+                                          modele, cle, ajust)
+                if self.dossier is None or self._ecrire('versions', f'{version.numero:04d}', {
+                        'numero': version.numero, 'libelle': libelle, 'cree_le': version.cree_le.isoformat(),
+                        'modele': modele, 'base': cle, 'ajustements': _vers_json(version.ajustements),
+                }, exclusif=True):
+                    break
+            self._versions[version.numero] = version
+        return version
+
+    def supprimer(self, numero: int):
+        with self._verrou:
+            self._versions.pop(numero)
+            if self.dossier is not None:
+                (self.dossier / 'versions' / f'{numero:04d}.json').unlink(missing_ok=True)
+
+    def version(self, numero: int) -> VersionForecast:
+        return self._versions[numero]
+
+    def numeros(self) -> list[int]:
+        return sorted(self._versions)
+
+    def resume(self) -> pd.DataFrame:
+        """Une ligne par version : numéro, libellé, date, modèle, mois couverts et nombre d'ajustements"""
+        return pd.DataFrame([{
+            'Version': v.numero,
+            'Libellé': v.libelle,
+            'Créée le': v.cree_le,
+            'Modèle': v.modele,
+            'Mois': f"{self._bases[v.base].index[0]} → {self._bases[v.base].index[-1]}",
+            'Ajustements': len(v.ajustements),
+        } for v in self._versions.values()], columns=['Version', 'Libellé', 'Créée le', 'Modèle', 'Mois', 'Ajustements'])
+
+    def base(self, numero: int) -> pd.DataFrame:
+        return self._bases[self._versions[numero].base]
+
+    def forecast(self, numero: int) -> pd.DataFrame:
+        """Forecast de la version : base et ajustements"""
+        version = self._versions[numero]
+        return appliquer(self._bases[version.base], version.ajustements)
+
+    def comparer(self, numero_a: int, numero_b: int) -> pd.DataFrame:
+        """Cellules qui diffèrent entre deux versions : Mois, Ligne, A, B et Ecart (B - A)
+
+        Deux versions d'une même base ne diffèrent que par leurs ajustements : seules
+        ces cellules sont comparées. Sinon les deux forecasts sont reconstitués.
+        """
+        a, b = self._versions[numero_a], self._versions[numero_b]
+        if a.base == b.base:
+            cellules = pd.concat([a.ajustements, b.ajustements])[['Mois', 'Ligne']].drop_duplicates()
+            base = self._bases[a.base].stack().rename('Base').rename_axis(['Mois', 'Ligne']).reset_index()
+            cellules = cellules.merge(base, on=['Mois', 'Ligne'])
+            for nom, version in (('A', a), ('B', b)):
+                cellules = cellules.merge(version.ajustements.rename(columns={'Ecart': nom}), how='left',
+                                          on=['Mois', 'Ligne'])
+                cellules[nom] = cellules['Base'] + cellules[nom].fillna(0)
+            ecarts = cellules.drop(columns='Base')
+        else:
+            forecast_a, forecast_b = self.forecast(numero_a), self.forecast(numero_b)
+            ecarts = pd.concat([forecast_a.stack().rename('A'), forecast_b.stack().rename('B')], axis=1)
+            ecarts = ecarts.rename_axis(['Mois', 'Ligne']).reset_index()
+        ecarts['Ecart'] = ecarts['B'].fillna(0) - ecarts['A'].fillna(0)
+        return ecarts[ecarts['Ecart'].round(6) != 0].sort_values(['Mois', 'Ligne'], ignore_index=True)
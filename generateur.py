@@ -0,0 +1,246 @@
+"""Générateur déterministe de classeurs de facturation synthétiques.
+
+Produit les trois feuilles reconnues par l'import automatique
+('Facturation-Certif', 'Facturation-Autres', 'FRAIS DIVERS') avec des en-têtes
+« réels » (libellés longs, colonnes superflues) et des lignes de titre avant les
+données, correspondant aux lignes de départ proposées par la page d'import.
+
+    python generateur.py --lignes 100000 --annees 4 --sortie facturation_synthetique.xlsx
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from finance import CERTIF, AUTRES, CHARGES, FEUILLES, START_ROWS as START_ROWS_LEDGERS
+
+# Lignes de titre précédant les données, par feuille
+START_ROWS = {FEUILLES[nom]: start_row for nom, start_row in START_ROWS_LEDGERS.items()}
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+LIGNES_MAX_EXCEL = 1_048_576
+
+# Libellés des colonnes tels qu'on les trouve dans les classeurs, par colonne du ledger
+ENTETES = {
+    'Facturation-Certif': {
+        'Date': "Date d'audit",
+        'Client': 'CLIENT / Société',
+        'Référentiel': 'Référentiel',
+        'Durée': 'Durée (jours)',
+        'Montant_Facturation': 'Montant HT (€)',
+        'Frais_Mission': 'Frais de mission',
+        'Cout_Auditeur': 'Coût auditeur',
+        'Statut': 'Statut',
+        'Entité': 'Entité',
+        'Devise': 'Devise',
+    },
+    'Facturation-Autres': {
+        'Date': 'DATE',
+        'Type': 'Type de prestation',
+        'Client': 'Client',
+        'Description': 'Libellé',
+        'Montant_Facturation': 'Montant HT',
+        'Frais_Mission': 'Frais déplacement',
+        'Cout_Auditeur': 'Coût prestataire',
+        'Statut': 'État',
+        'Entité': 'Entité',
+        'Devise': 'Devise',
+    },
+    'FRAIS DIVERS': {
+        'Date': 'Date',
+        'Catégorie': 'Catégorie',
+        'Description': 'Libellé',
+        'Montant': 'Montant TTC',
+        'Statut': 'Statut',
+        'Entité': 'Entité',
+        'Devise': 'Devise',
+    },
+}
+
+CLIENTS_PRINCIPAUX = ['LIDL', 'ITM', 'KIWA', 'SGS', 'Carrefour', 'Auchan']
+REFERENTIELS = ['IFS FOOD', 'BRC FOOD', 'IFS LOGISTICS', 'IFS BROKER', 'IFS PROGRESS']
+TARIF_JOUR = np.array([1350, 1450, 1200, 1250, 1100])
+TYPES = ['Formation', 'Conseil', 'Prêt auditeur', 'Traduction', 'Autre']
+CATEGORIES = ['Frais généraux', 'Marketing', 'Informatique', 'Assurance', 'Formation', 'Autre']
+MONTANT_CATEGORIE = np.array([700, 300, 180, 450, 500, 150])
+
+# Entités du groupe, devise de leurs montants et part des lignes
+ENTITES = ['Principale', 'Filiale Suisse', 'Filiale UK']
+DEVISES = ['EUR', 'CHF', 'GBP']
+PART_ENTITES = [0.7, 0.2, 0.1]
+
+# Saisonnalité des audits (janvier -> décembre) : creux en août et en décembre
+SAISONNALITE = np.array([0.9, 1.0, 1.15, 1.2, 1.15, 1.1, 0.85, 0.4, 1.1, 1.25, 1.15, 0.65])
+
+# Croissance annuelle de l'activité et des tarifs
+CROISSANCE_ANNUELLE = 0.06
+
+
+def _clients(nb_clients):
+    return np.array(CLIENTS_PRINCIPAUX + [f'Client {i:03d}' for i in range(nb_clients - len(CLIENTS_PRINCIPAUX))])
+
+
+def _dates(rng, n, debut, annees, saisonnier=True):
+    """Tire n dates sur la période, pondérées par la saisonnalité et la croissance"""
+    mois = pd.period_range(start=pd.Timestamp(debut), periods=12 * annees, freq='M')
+    poids = (1 + CROISSANCE_ANNUELLE) ** (np.arange(len(mois)) / 12)
+    if saisonnier:
+        poids = poids * SAISONNALITE[mois.month - 1]
+    tirage = rng.choice(len(mois), size=n, p=poids / poids.sum())
+    debuts = mois.start_time.values[tirage]
+    jours = rng.random(n) * mois.days_in_month.values[tirage]
+    dates = pd.to_datetime(debuts) + pd.to_timedelta(jours.astype(int), unit='D')
+    return dates, tirage / 12
+
+
+def _client_pondere(rng, clients, n):
+    # Quelques gros comptes concentrent l'activité (loi de Zipf)
+    poids = 1 / np.arange(1, len(clients) + 1)
+    return clients[rng.choice(len(clients), size=n, p=poids / poids.sum())]
+
+
+def _entites(rng, n):
+    """Entité et devise de chaque ligne"""
+    entite = rng.choice(len(ENTITES), size=n, p=PART_ENTITES)
+    return {'Entité': np.array(ENTITES)[entite], 'Devise': np.array(DEVISES)[entite]}
+
+
+def _statut(rng, dates, futurs, passes):
+    """Statut selon que la date est passée ou non par rapport à la fin de l'historique"""
+    limite = dates.max() - pd.Timedelta(days=60)
+    futur = dates > limite
+    statut = rng.choice(passes[0], size=len(dates), p=passes[1])
+    statut[futur] = rng.choice(futurs[0], size=int(futur.sum()), p=futurs[1])
+    return statut
+
+
+def generer_certif(n, debut='2023-01-01', annees=3, nb_clients=300, seed=0):
+    rng = np.random.default_rng(seed)
+    dates, anciennete = _dates(rng, n, debut, annees)
+    indexation = (1 + CROISSANCE_ANNUELLE) ** anciennete
+    ref = rng.choice(len(REFERENTIELS), size=n, p=[0.5, 0.25, 0.1, 0.05, 0.1])
+    duree = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0], size=n, p=[0.1, 0.35, 0.3, 0.2, 0.05])
+    return pd.DataFrame({
+        'Date': dates,
+        'Client': _client_pondere(rng, _clients(nb_clients), n),
+        'Référentiel': np.array(REFERENTIELS)[ref],
+        'Durée': duree,
+        'Montant_Facturation': (duree * TARIF_JOUR[ref] * indexation * rng.normal(1, 0.05, n)).round(0),
+        'Frais_Mission': rng.gamma(4, 50, n).round(0),
+        'Cout_Auditeur': (duree * 520 * indexation * rng.normal(1, 0.08, n)).round(0),
+        'Statut': _statut(rng, dates, (['Prévu', 'Devis'], [0.8, 0.2]), (['Facturé', 'Prévu'], [0.97, 0.03])),
+        **_entites(rng, n),
+    })
+
+
+def generer_autres(n, debut='2023-01-01', annees=3, nb_clients=300, seed=1):
+    rng = np.random.default_rng(seed)
+    dates, anciennete = _dates(rng, n, debut, annees)
+    type_idx = rng.choice(len(TYPES), size=n, p=[0.35, 0.25, 0.25, 0.1, 0.05])
+    montant = rng.lognormal(np.log(1100), 0.35, n) * (1 + CROISSANCE_ANNUELLE) ** anciennete
+    return pd.DataFrame({
+        'Date': dates,
+        'Type': np.array(TYPES)[type_idx],
+        'Client': _client_pondere(rng, _clients(nb_clients), n),
+        'Description': rng.choice(['IFS Food', 'BRC', 'Audit 1 jour', 'Audit 1.5 jours',
+                                   'Mise en conformité', 'Optimisation process'], size=n),
+        'Montant_Facturation': montant.round(0),
+        'Frais_Mission': rng.gamma(3, 40, n).round(0),
+        'Cout_Auditeur': (montant * rng.uniform(0.3, 0.6, n)).round(0),
+        'Statut': _statut(rng, dates, (['Prévu', 'Devis'], [0.8, 0.2]), (['Facturé', 'Prévu'], [0.97, 0.03])),
+        **_entites(rng, n),
+    })
+
+
+def generer_charges(n, debut='2023-01-01', annees=3, seed=2):
+    rng = np.random.default_rng(seed)
+    dates, anciennete = _dates(rng, n, debut, annees, saisonnier=False)
+    cat = rng.choice(len(CATEGORIES), size=n, p=[0.3, 0.15, 0.2, 0.05, 0.1, 0.2])
+    return pd.DataFrame({
+        'Date': dates,
+        'Catégorie': np.array(CATEGORIES)[cat],
+        'Description': rng.choice(['Loyer bureau', 'Publicité Google', 'Abonnement logiciel', 'RC Pro',
+                                   'Fournitures', 'Formation continue', 'Cloud', 'LinkedIn Ads'], size=n),
+        'Montant': (MONTANT_CATEGORIE[cat] * rng.lognormal(0, 0.3, n)
+                    * (1 + CROISSANCE_ANNUELLE) ** anciennete).round(0),
+        'Statut': _statut(rng, dates, (['À payer', 'Prévu'], [0.5, 0.5]), (['Payé', 'À payer'], [0.95, 0.05])),
+        **_entites(rng, n),
+    })
+
+
+def generer_ledgers(lignes_certif=1000, lignes_autres=None, lignes_charges=None,
+                    debut='2023-01-01', annees=3, nb_clients=300, seed=0):
+    """Retourne les trois ledgers propres, triés par date ; autres et charges valent par défaut 40 % du volume certif"""
+    if lignes_autres is None:
+        lignes_autres = max(1, int(lignes_certif * 0.4))
+    if lignes_charges is None:
+        lignes_charges = max(1, int(lignes_certif * 0.4))
+    ledgers = {
+        CERTIF: generer_certif(lignes_certif, debut, annees, nb_clients, seed),
+        AUTRES: generer_autres(lignes_autres, debut, annees, nb_clients, seed + 1),
+        CHARGES: generer_charges(lignes_charges, debut, annees, seed + 2),
+    }
+    return {nom: df.sort_values('Date', kind='stable', ignore_index=True) for nom, df in ledgers.items()}
+
+
+def feuille_brute(ledger, feuille, start_row=None):
+    """Met un ledger en forme de feuille Excel : en-têtes réels, colonnes superflues et lignes de titre"""
+    start_row = START_ROWS[feuille] if start_row is None else start_row
+    brute = ledger.rename(columns=ENTETES[feuille])
+    brute.insert(0, 'N° pièce', np.arange(1, len(brute) + 1))
+    brute['Commentaire'] = None
+
+    titres = pd.DataFrame(np.full((start_row, brute.shape[1]), None, dtype=object), columns=brute.columns)
+    if start_row > 0:
+        titres.iloc[0, 1] = f'{feuille} - extraction'
+    if start_row > 1:
+        titres.iloc[1, 1] = 'Sous-total'
+    return pd.concat([titres, brute.astype(object)], ignore_index=True)
+
+
+def feuilles_brutes(ledgers, start_rows=None):
+    """Feuilles du classeur, indexées par nom de feuille"""
+    start_rows = {**START_ROWS, **(start_rows or {})}
+    return {
+        FEUILLES[nom]: feuille_brute(df, FEUILLES[nom], start_rows[FEUILLES[nom]])
+        for nom, df in ledgers.items()
+    }
+
+
+def ecrire_classeur(chemin, ledgers, start_rows=None):
+    """Ecrit les ledgers dans un classeur .xlsx au format attendu par l'import automatique"""
+    feuilles = feuilles_brutes(ledgers, start_rows)
+    for nom, feuille in feuilles.items():
+        if len(feuille) >= LIGNES_MAX_EXCEL:
+            raise ValueError(f"La feuille {nom} dépasse la limite Excel ({len(feuille)} lignes)")
+    with pd.ExcelWriter(chemin, engine='openpyxl') as writer:
+        for nom, feuille in feuilles.items():
+            feuille.to_excel(writer, sheet_name=nom, index=False)
+    return chemin
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lignes', type=int, default=10_000, help="Lignes de facturation certification")
+    parser.add_argument('--lignes-autres', type=int, default=None)
+    parser.add_argument('--lignes-charges', type=int, default=None)
+    parser.add_argument('--debut', default='2023-01-01', help="Premier mois de l'historique")
+    parser.add_argument('--annees', type=int, default=3)
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sortie', default='facturation_synthetique.xlsx')
+    args = parser.parse_args(argv)
+
+    ledgers = generer_ledgers(args.lignes, args.lignes_autres, args.lignes_charges,
+                              args.debut, args.annees, args.clients, args.seed)
+    ecrire_classeur(args.sortie, ledgers)
+    for nom, df in ledgers.items():
+        print(f"{FEUILLES[nom]:<20} {len(df):>9} lignes")
+    print(f"Classeur écrit : {args.sortie}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Chronométrage des rendus : temps par page et par section, conservés en mémoire.
+
+Les mesures sont regroupées dans un registre glissant partagé par toutes les
+sessions du processus, consultable depuis la page cachée de diagnostics
+(``?diagnostics=1``) et exportable en JSON.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Nombre maximal de mesures conservées (les plus anciennes sont oubliées)
+TAILLE_REGISTRE = 5000
+
+# Sections chronométrées dans les pages
+SECTION_TOTAL = 'total'
+SECTION_MODULE = 'import_module'
+SECTION_IMPORT = 'import_excel'
+SECTION_AGREGATION = 'agregation'
+SECTION_FORMATAGE = 'formatage'
+SECTION_GRAPHIQUE = 'graphique'
+SECTION_TABLEAU = 'tableau'
+SECTION_EXPORT = 'export_csv'
+
+
+class RegistreMesures:
+    """Registre glissant et thread-safe des mesures de temps"""
+
+    def __init__(self, taille_max=TAILLE_REGISTRE):
+        self._mesures = deque(maxlen=taille_max)
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, page, section, duree_ms, **details):
+        mesure = {
+            'horodatage': time.time(),
+            'page': page,
+            'section': section,
+            'duree_ms': round(duree_ms, 3),
+        }
+        mesure.update(details)
+        with self._verrou:
+            self._mesures.append(mesure)
+
+    def mesures(self):
+        with self._verrou:
+            return list(self._mesures)
+
+    def vider(self):
+        with self._verrou:
+            self._mesures.clear()
+
+    def resume(self):
+        """Statistiques par page et section (nombre, moyenne, p50, p95, max en ms)"""
+        import pandas as pd
+
+        df = pd.DataFrame(self.mesures())
+        if df.empty:
+            return pd.DataFrame(columns=['page', 'section', 'nombre', 'moyenne_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+        grouped = df.groupby(['page', 'section'])['duree_ms']
+        resume = grouped.agg(
+            nombre='count',
+            moyenne_ms='mean',
+            p50_ms='median',
+            p95_ms=lambda s: s.quantile(0.95),
+            max_ms='max',
+        ).round(2).reset_index()
+        return resume.sort_values('moyenne_ms', ascending=False, ignore_index=True)
+
+    def exporter_json(self):
+        return json.dumps(self.mesures(), ensure_ascii=False, indent=1)
+
+
+registre = RegistreMesures()
+
+# Chaque session Streamlit s'exécute dans son propre thread
+_contexte = threading.local()
+
+
+def page_courante():
+    return getattr(_contexte, 'page', '-')
+
+
+@contextmanager
+def chrono_page(page):
+    """Chronomètre le rendu complet d'une page et rattache les sections à cette page"""
+    precedente = page_courante()
+    _contexte.page = page
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        registre.enregistrer(page, SECTION_TOTAL, (time.perf_counter() - debut) * 1000)
+        _contexte.page = precedente
+
+
+@contextmanager
+def chrono(section, **details):
+    """Chronomètre une section de la page courante"""
+    debut = time.perf_counter()
+    try:
+        yield details
+    finally:
+        registre.enregistrer(page_courante(), section, (time.perf_counter() - debut) * 1000, **details)
+
+
+def dataframe(df, **kwargs):
+    """st.dataframe chronométré, avec le nombre de lignes et la taille mémoire envoyée"""
+    with chrono(SECTION_TABLEAU, lignes=len(df), octets=int(df.memory_usage(deep=True).sum())):
+        return st.dataframe(df, **kwargs)
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart chronométré (sérialisation de la figure comprise)"""
+    with chrono(SECTION_GRAPHIQUE, traces=len(fig.data)):
+        return st.plotly_chart(fig, **kwargs)
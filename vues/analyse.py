@@ -0,0 +1,98 @@
+"""Page Analyse : tableaux croisés et requêtes SQL libres sur les ledgers (DuckDB)."""
+
+import streamlit as st
+from datetime import datetime
+
+import etat
+import profilage
+from finance.partitions import bornes_mois
+
+# Colonnes numériques proposées comme valeur ; les autres servent de dimensions
+MESURES = ('Montant_Facturation', 'Frais_Mission', 'Cout_Auditeur', 'Marge', 'Montant', 'Durée')
+
+
+def render():
+    st.header("🔎 Analyse")
+
+    debut, fin = etat.periode()
+    try:
+        from finance import sql
+        con = sql.connexion(etat.sources_sql(), *bornes_mois(debut, fin))
+    except ImportError as e:
+        st.error(str(e))
+        return
+    autres_devises = etat.avertir_devises(debut, fin, ecartees=False)
+
+    tab1, tab2 = st.tabs(["📊 Tableau croisé", "🧮 Requête SQL"])
+
+    with tab1:
+        tables = {'Facturation (certification + autres)': 'facturation',
+                  'Facturation Certification': 'certif',
+                  'Facturation Autres': 'autres',
+                  'Charges diverses': 'charges'}
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            table = tables[st.selectbox("Données", list(tables), key="analyse_table")]
+        colonnes = sql.colonnes(con, table)
+        dimensions = list(sql.PERIODES) + [c for c in colonnes if c != 'Date' and c not in MESURES]
+        mesures = [c for c in colonnes if c in MESURES]
+        # Dimension par défaut : la prestation (référentiel, type ou catégorie selon la table),
+        # et la devise s'il y en a plusieurs, pour ne pas additionner des montants de devises différentes
+        defaut = [next(c for c in dimensions[len(sql.PERIODES):]
+                       if c in ('Prestation', 'Référentiel', 'Type', 'Catégorie'))]
+        if autres_devises:
+            defaut.append('Devise')
+        with col2:
+            valeur = st.selectbox("Valeur", mesures, key=f"analyse_valeur_{table}")
+        with col3:
+            agregat = st.selectbox("Agrégat", list(sql.AGREGATS), key="analyse_agregat")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            lignes = st.multiselect("Lignes", dimensions, default=defaut, key=f"analyse_lignes_{table}")
+        with col2:
+            colonne = st.selectbox("Colonnes", ['(aucune)'] + dimensions, index=2, key=f"analyse_colonne_{table}")
+        with col3:
+            statuts = st.multiselect("Statuts", sql.executer(
+                con, f"SELECT DISTINCT Statut FROM {table} ORDER BY 1")['Statut'].dropna().tolist(),
+                key=f"analyse_statuts_{table}")
+
+        colonne = None if colonne == '(aucune)' or colonne in lignes else colonne
+        if not lignes:
+            st.info("Choisissez au moins une dimension en lignes.")
+        else:
+            with profilage.chrono(profilage.SECTION_AGREGATION, moteur='duckdb'):
+                resultat = sql.tableau_croise(con, table, lignes, valeur, colonne, agregat, statuts)
+            profilage.dataframe(resultat, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Exporter (CSV)",
+                data=resultat.to_csv(index=False).encode('utf-8-sig'),
+                file_name=f'analyse_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+                mime='text/csv',
+                key="analyse_export_croise"
+            )
+
+    with tab2:
+        st.caption("Tables disponibles : `certif`, `autres`, `charges` et la vue `facturation` "
+                   "(les deux lignes de facturation, avec `Ligne`, `Prestation`, `Marge`, `Entité` et `Devise`). "
+                   "Les noms de colonnes accentués s'écrivent entre guillemets : `\"Référentiel\"`.")
+        exemple = st.selectbox("Exemple", list(sql.REQUETES_TYPES), key="analyse_exemple")
+        requete = st.text_area("Requête", sql.REQUETES_TYPES[exemple].strip(), height=220,
+                               key=f"analyse_requete_{exemple}")
+
+        if st.button("▶️ Exécuter", key="analyse_executer"):
+            try:
+                with profilage.chrono(profilage.SECTION_AGREGATION, moteur='duckdb'):
+                    resultat = sql.executer(con, requete)
+            except Exception as e:
+                st.error(f"❌ Erreur SQL : {e}")
+            else:
+                st.caption(f"{len(resultat)} ligne(s)")
+                profilage.dataframe(resultat, use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="📥 Exporter (CSV)",
+                    data=resultat.to_csv(index=False).encode('utf-8-sig'),
+                    file_name=f'requete_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+                    mime='text/csv',
+                    key="analyse_export_requete"
+                )
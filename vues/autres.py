@@ -0,0 +1,125 @@
+"""Page Facturation Autres : vue d'ensemble, ajout, modification et suppression."""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime
+
+import etat
+import profilage
+from finance import AUTRES, ENTITE_DEFAUT, DEVISE_DEFAUT, calculer_marge, filtrer, marge_par
+from vues.edition import grille
+
+TYPES = ["Formation", "Conseil", "Prêt auditeur", "Traduction", "Autre"]
+STATUTS = ["Facturé", "Prévu", "Devis"]
+
+
+def render():
+    st.header("Facturation Autres Prestations")
+    etat.avertir_devises()
+
+    tab1, tab2, tab3 = st.tabs(["📊 Vue d'ensemble", "➕ Ajouter", "✏️ Modifier/Supprimer"])
+
+    with tab1:
+        # Cube Client × Type × Mois × Statut : KPIs, filtres et graphique sans relire les lignes
+        with profilage.chrono(profilage.SECTION_AGREGATION):
+            cube = calculer_marge(etat.cube(AUTRES), 'autres')
+
+        # KPIs
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("CA Total", f"{cube['Montant_Facturation'].sum():,.0f} €")
+        with col2:
+            st.metric("Frais Mission", f"{cube['Frais_Mission'].sum():,.0f} €")
+        with col3:
+            st.metric("Coût Auditeurs", f"{cube['Cout_Auditeur'].sum():,.0f} €")
+        with col4:
+            marge_brute = cube['Marge_Brute'].sum()
+            st.metric("Marge Brute", f"{marge_brute:,.0f} €")
+
+        # Filtres
+        col1, col2 = st.columns(2)
+        with col1:
+            types = ['Tous'] + list(cube['Type'].unique())
+            type_filter = st.selectbox("Type", types, key="autres_type")
+        with col2:
+            statuts = ['Tous', 'Facturé', 'Prévu']
+            statut_filter = st.selectbox("Statut", statuts, key="autres_statut")
+
+        # Application des filtres : au cube, et aux lignes affichées (filtres poussés à la lecture)
+        filtres = {
+            'Type': None if type_filter == 'Tous' else type_filter,
+            'Statut': None if statut_filter == 'Tous' else statut_filter,
+        }
+        cube_filtre = filtrer(cube, filtres)
+        with profilage.chrono(profilage.SECTION_AGREGATION):
+            filtered_data = calculer_marge(etat.lire_periode(AUTRES, egalites=filtres, devise_base=True), 'autres')
+
+        # Affichage
+        with profilage.chrono(profilage.SECTION_FORMATAGE):
+            display_df = filtered_data.copy()
+            display_df['Date'] = display_df['Date'].dt.strftime('%d/%m/%Y')
+            display_df['Montant_Facturation'] = display_df['Montant_Facturation'].apply(lambda x: f"{x:,.0f} €")
+            display_df['Frais_Mission'] = display_df['Frais_Mission'].apply(lambda x: f"{x:,.0f} €")
+            display_df['Cout_Auditeur'] = display_df['Cout_Auditeur'].apply(lambda x: f"{x:,.0f} €")
+            display_df['Marge_Brute'] = display_df['Marge_Brute'].apply(lambda x: f"{x:,.0f} €")
+            display_df['Taux_Marge'] = display_df['Taux_Marge'].apply(lambda x: f"{x:.1f}%")
+
+        profilage.dataframe(display_df, use_container_width=True, hide_index=True)
+
+        # Graphique par type
+        st.subheader("Répartition par Type de Prestation")
+        with profilage.chrono(profilage.SECTION_AGREGATION):
+            type_agg = marge_par(cube_filtre, 'Type')
+
+        fig = px.bar(type_agg, x='Type', y=['Montant_Facturation', 'Marge_Brute'],
+                    barmode='group',
+                    color_discrete_map={'Montant_Facturation': '#E67E22', 'Marge_Brute': '#27AE60'})
+        profilage.plotly_chart(fig, use_container_width=True)
+
+    with tab2:
+        st.subheader("Ajouter une nouvelle facturation autre")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            new_date = st.date_input("Date", datetime.now(), key="autres_new_date")
+            new_type = st.selectbox("Type", TYPES, key="autres_new_type")
+            new_client = st.text_input("Client", key="autres_new_client")
+
+        with col2:
+            new_description = st.text_area("Description", key="autres_new_desc")
+            new_montant = st.number_input("Montant Facturation (€)", min_value=0.0, step=50.0, key="autres_new_montant")
+            new_entite = st.text_input("Entité", ENTITE_DEFAUT, key="autres_new_entite")
+            new_devise = st.text_input("Devise", DEVISE_DEFAUT, max_chars=3, key="autres_new_devise")
+
+        with col3:
+            new_frais = st.number_input("Frais Mission (€)", min_value=0.0, step=10.0, key="autres_new_frais")
+            new_cout_audit = st.number_input("Coût Auditeur/Prestataire (€)", min_value=0.0, step=50.0, key="autres_new_cout")
+            new_statut = st.selectbox("Statut", STATUTS, key="autres_new_statut")
+
+        # Calcul automatique de la marge
+        marge_calc = new_montant - new_frais - new_cout_audit
+        taux_marge_calc = (marge_calc / new_montant * 100) if new_montant > 0 else 0
+
+        st.info(f"💡 Marge prévisionnelle: **{marge_calc:,.0f} €** ({taux_marge_calc:.1f}%)")
+
+        if st.button("➕ Ajouter la facturation autre", key="add_autres"):
+            new_row = pd.DataFrame({
+                'Date': [pd.to_datetime(new_date)],
+                'Type': [new_type],
+                'Client': [new_client],
+                'Description': [new_description],
+                'Montant_Facturation': [new_montant],
+                'Frais_Mission': [new_frais],
+                'Cout_Auditeur': [new_cout_audit],
+                'Statut': [new_statut],
+                'Entité': [new_entite.strip() or ENTITE_DEFAUT],
+                'Devise': [new_devise.strip().upper() or DEVISE_DEFAUT]
+            })
+            etat.ajouter(AUTRES, new_row)
+            st.success("✅ Facturation ajoutée avec succès!")
+            st.rerun()
+
+    with tab3:
+        st.subheader("Modifier ou supprimer des facturations")
+        grille(AUTRES, "autres", {'Type': TYPES, 'Statut': STATUTS})
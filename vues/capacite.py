@@ -0,0 +1,90 @@
+"""Page Capacité Auditeurs : jours d'audit, taux journaliers, utilisation et besoins prévus."""
+
+import streamlit as st
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+import etat
+import profilage
+from finance import CERTIF, mois_forecast
+from finance.capacite import ParametresCapacite, capacite_mensuelle, capacite_par, besoins_capacite
+
+# Les devis ne mobilisent pas encore d'auditeurs
+STATUTS_EXCLUS = ['Devis']
+
+
+def _capacite(params):
+    with profilage.chrono(profilage.SECTION_AGREGATION, etape='capacite'):
+        agregats = etat.agregats(CERTIF)
+        cube = etat.cube(CERTIF)
+        return (capacite_mensuelle(agregats[~agregats['Statut'].isin(STATUTS_EXCLUS)], params),
+                capacite_par(cube[~cube['Statut'].isin(STATUTS_EXCLUS)], 'Référentiel'))
+
+
+def render():
+    st.header("Capacité Auditeurs")
+    etat.avertir_devises()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        auditeurs = st.number_input("Auditeurs (ETP)", min_value=0.5, value=3.0, step=0.5, key="capacite_auditeurs")
+    with col2:
+        jours_par_mois = st.number_input("Jours d'audit disponibles par auditeur et par mois", min_value=1.0,
+                                         max_value=31.0, value=18.0, step=1.0, key="capacite_jours")
+    params = ParametresCapacite(auditeurs, jours_par_mois)
+
+    # Indicateurs recalculés seulement si les données, la période ou les paramètres changent
+    mensuel, par_referentiel = etat.calcul_en_cache('capacite', lambda: _capacite(params), params)
+    if mensuel.empty or mensuel['Jours_Audit'].sum() == 0:
+        st.info("💡 Aucune durée d'audit sur la période : importez des facturations certification ou chargez la démo.")
+        return
+
+    st.caption("Calculé sur les audits facturés et prévus (hors devis) de la période.")
+    jours = mensuel['Jours_Audit'].sum()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Jours d'audit", f"{jours:,.1f}")
+    with col2:
+        st.metric("Coût auditeur / jour", f"{mensuel['Cout_Auditeur'].sum() / jours:,.0f} €")
+    with col3:
+        st.metric("CA / jour d'audit", f"{mensuel['CA'].sum() / jours:,.0f} €")
+    with col4:
+        st.metric("Utilisation moyenne", f"{mensuel['Utilisation_Pct'].mean():.1f}%")
+
+    # Jours d'audit et utilisation par mois
+    st.subheader("📅 Utilisation mensuelle")
+    mois = mensuel.index.to_timestamp()
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(x=mois, y=mensuel['Jours_Audit'], name="Jours d'audit", marker_color='#3498DB'))
+    fig.add_trace(go.Scatter(x=mois, y=mensuel['Capacite_Jours'], name='Capacité', mode='lines',
+                             line=dict(color='#E74C3C', dash='dash')))
+    fig.add_trace(go.Scatter(x=mois, y=mensuel['Utilisation_Pct'], name='Utilisation (%)',
+                             mode='lines+markers', line=dict(color='#27AE60')), secondary_y=True)
+    fig.update_layout(hovermode='x unified', height=400)
+    fig.update_yaxes(title_text="Jours", secondary_y=False)
+    fig.update_yaxes(title_text="Utilisation (%)", secondary_y=True)
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("🔷 Par référentiel")
+    profilage.dataframe(par_referentiel.round(1), use_container_width=True, hide_index=True)
+
+    # Besoins projetés à partir du CA certification du forecast en cours
+    st.subheader("🔮 Besoins prévus")
+    if 'forecast_data' not in st.session_state:
+        st.info("💡 Générez un forecast (page Forecast) pour projeter les besoins en auditeurs.")
+        return
+    forecast = st.session_state.forecast_data
+    ca_prevu = forecast.set_index(mois_forecast(forecast))['CA_Certification']
+    besoins = besoins_capacite(ca_prevu, mensuel, params)
+    st.caption("Jours nécessaires au CA certification prévu, au CA par jour d'audit des six derniers mois.")
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=besoins.index.astype(str), y=besoins['Auditeurs_Requis'], name='Auditeurs requis',
+                         marker_color=['#E74C3C' if ecart > 0 else '#27AE60' for ecart in besoins['Ecart_Auditeurs']]))
+    fig.add_hline(y=params.auditeurs, line_dash='dash', annotation_text='Effectif actuel')
+    fig.update_layout(xaxis_title="Mois", yaxis_title="Auditeurs (ETP)", height=350)
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    display_df = besoins.round(1).rename_axis('Mois').reset_index()
+    display_df['Mois'] = display_df['Mois'].astype(str)
+    profilage.dataframe(display_df, use_container_width=True, hide_index=True)
@@ -0,0 +1,275 @@
+"""Page Charges & Coûts : répartition, évolution mensuelle, budget / réalisé, détail, ajout et modification."""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime
+
+import etat
+import profilage
+from finance import CERTIF, AUTRES, CHARGES, ENTITE_DEFAUT, DEVISE_DEFAUT
+from finance.charges import (
+    FRAIS_MISSION, COUT_AUDITEURS, CHARGES_DIVERSES, POSTES, totaux_postes, lignes_budgetaires,
+    evolution_mensuelle, budget_realise
+)
+from finance.rapprochement import STATUTS_REALISES
+from vues.edition import grille
+
+CATEGORIES = ["Frais généraux", "Marketing", "Informatique", "Assurance", "Formation", "Autre"]
+STATUTS = ["Payé", "À payer", "Prévu"]
+
+COULEURS_POSTES = {FRAIS_MISSION: '#E74C3C', COUT_AUDITEURS: '#9B59B6', CHARGES_DIVERSES: '#95A5A6'}
+DETAILS_EVOLUTION = {"Par poste": 'Poste', "Par ligne budgétaire": 'Ligne'}
+
+
+def _euros(valeur):
+    return "–" if pd.isna(valeur) else f"{valeur:,.0f} €"
+
+
+def _pourcent(valeur):
+    return "–" if pd.isna(valeur) else f"{valeur:+.1f} %"
+
+
+def _evolution(cube):
+    """Charges mois par mois et variation d'un mois sur l'autre, lues dans le cube"""
+    st.subheader("📅 Évolution mensuelle")
+    detail = st.radio("Détail", list(DETAILS_EVOLUTION), horizontal=True, key="charge_evolution_detail")
+    with profilage.chrono(profilage.SECTION_AGREGATION):
+        evolution = evolution_mensuelle(cube, DETAILS_EVOLUTION[detail])
+    dernier = evolution.iloc[-1]
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.metric(f"Charges de {evolution.index[-1]}", _euros(dernier['Total']),
+                  delta=None if pd.isna(dernier['Variation']) else f"{dernier['Variation']:,.0f} €",
+                  delta_color="inverse")
+        st.caption("Variation par rapport au mois précédent.")
+    with col2:
+        series = evolution.drop(columns=['Total', 'Variation', 'Variation_Pct'])
+        donnees = series.rename_axis('Mois').reset_index().melt('Mois', var_name='Détail', value_name='Montant')
+        donnees['Mois'] = donnees['Mois'].astype(str)
+        fig = px.bar(donnees, x='Mois', y='Montant', color='Détail',
+                     color_discrete_map=COULEURS_POSTES)
+        fig.update_layout(height=350, xaxis_title="Mois", yaxis_title="Montant (€)", hovermode='x unified')
+        profilage.plotly_chart(fig, use_container_width=True)
+
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        table = evolution.iloc[::-1].copy()
+        table.index = table.index.astype(str)
+        pourcentages = table.pop('Variation_Pct').map(_pourcent)
+        table = table.map(_euros)
+        table['Variation (%)'] = pourcentages
+    profilage.dataframe(table.rename_axis('Mois').reset_index(), use_container_width=True, hide_index=True,
+                        height=250)
+
+
+def _budget(cube):
+    """Budget mensuel par ligne budgétaire et réalisé de la période, lus dans le cube"""
+    st.subheader("🎯 Budget / Réalisé")
+    budget = etat.budget_charges()
+    lignes = list(dict.fromkeys([FRAIS_MISSION, COUT_AUDITEURS] + CATEGORIES + list(budget['Ligne'])
+                                + list(lignes_budgetaires(cube).unique())))
+    saisie = budget.groupby('Ligne')['Budget_Mensuel'].sum().reindex(lignes, fill_value=0.0)
+
+    with st.expander("✏️ Budget mensuel par ligne"):
+        edite = st.data_editor(
+            saisie.rename_axis('Ligne').reset_index(),
+            hide_index=True,
+            num_rows="fixed",
+            column_config={
+                "Ligne": st.column_config.TextColumn("Ligne budgétaire", disabled=True),
+                "Budget_Mensuel": st.column_config.NumberColumn("Budget mensuel (€)", min_value=0,
+                                                                format="%.0f €"),
+            },
+            key=f"charge_budget_{hash(tuple(lignes))}_{hash(tuple(saisie))}",
+        )
+        if st.button("💾 Enregistrer le budget", key="charge_budget_enregistrer"):
+            etat.enregistrer_budget(edite[edite['Budget_Mensuel'].fillna(0) > 0].reset_index(drop=True))
+            st.success("✅ Budget enregistré")
+            st.rerun()
+
+    if budget.empty:
+        st.info("💡 Saisissez un budget mensuel par ligne pour le comparer au réalisé de la période.")
+        return
+
+    debut, fin = etat.periode()
+    dates = cube['Date'].dt.to_period('M')
+    mois = pd.period_range(debut or dates.min(), fin or dates.max(), freq='M')
+    with profilage.chrono(profilage.SECTION_AGREGATION):
+        par_ligne = budget_realise(cube, budget, mois, STATUTS_REALISES, 'Ligne')
+        # Totaux et suivi mensuel restreints aux lignes budgétées
+        budgete = cube[lignes_budgetaires(cube).isin(budget['Ligne'])]
+        par_mois = budget_realise(budgete, budget, mois, STATUTS_REALISES, 'Mois')
+
+    total_budget, total_realise = par_mois['Budget'].sum(), par_mois['Réalisé'].sum()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(f"Budget ({len(mois)} mois)", _euros(total_budget))
+    with col2:
+        st.metric("Réalisé", _euros(total_realise), delta=f"{total_realise - total_budget:,.0f} €",
+                  delta_color="inverse")
+    with col3:
+        st.metric("Consommé", f"{total_realise / total_budget * 100:.0f} %" if total_budget else "–")
+    st.caption("Totaux des lignes budgétées. Réalisé : frais et coûts des lignes facturées, charges "
+               "diverses payées. Prévu : lignes restant à facturer ou à payer.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.bar(par_ligne, y='Ligne', x=['Budget', 'Réalisé'], barmode='group', orientation='h',
+                     color_discrete_sequence=['#95A5A6', '#E74C3C'])
+        fig.update_layout(height=350, xaxis_title="Montant (€)", yaxis_title=None, legend_title=None)
+        profilage.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = px.bar(par_mois.assign(Mois=par_mois['Mois'].astype(str)), x='Mois', y=['Budget', 'Réalisé', 'Prévu'],
+                     barmode='group', color_discrete_sequence=['#95A5A6', '#E74C3C', '#F5B7B1'])
+        fig.update_layout(height=350, xaxis_title="Mois", yaxis_title="Montant (€)", legend_title=None,
+                          hovermode='x unified')
+        profilage.plotly_chart(fig, use_container_width=True)
+
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        table = par_ligne.copy()
+        for colonne in ['Budget', 'Réalisé', 'Prévu', 'Ecart']:
+            table[colonne] = table[colonne].map(_euros)
+        table['Consomme_Pct'] = par_ligne['Consomme_Pct'].map(lambda x: "–" if pd.isna(x) else f"{x:.0f} %")
+    profilage.dataframe(table.rename(columns={'Ecart': 'Écart', 'Consomme_Pct': 'Consommé'}),
+                        use_container_width=True, hide_index=True)
+
+
+def render():
+    st.header("Charges & Coûts")
+    etat.avertir_devises()
+
+    tab1, tab2, tab3 = st.tabs(["📊 Vue d'ensemble", "➕ Ajouter une charge", "✏️ Modifier/Supprimer"])
+
+    with tab1:
+        colonnes = ['Date', 'Client', 'Frais_Mission', 'Cout_Auditeur']
+        certif = etat.lire_periode(CERTIF, colonnes, devise_base=True)
+        autres = etat.lire_periode(AUTRES, colonnes, devise_base=True)
+        charges = etat.lire_periode(CHARGES, devise_base=True)
+
+        # Totaux et répartitions : cube des charges de la période, partagé avec le Dashboard
+        with profilage.chrono(profilage.SECTION_AGREGATION):
+            cube = etat.cube_charges()
+            totaux = totaux_postes(cube)
+
+        # KPIs
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("🚗 Frais Mission", f"{totaux[FRAIS_MISSION]:,.0f} €")
+        with col2:
+            st.metric("👤 Coût Auditeurs", f"{totaux[COUT_AUDITEURS]:,.0f} €")
+        with col3:
+            st.metric("📋 Charges Diverses", f"{totaux[CHARGES_DIVERSES]:,.0f} €")
+        with col4:
+            st.metric("💰 Total Charges", f"{totaux.sum():,.0f} €")
+
+        st.divider()
+
+        # Graphiques
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("Répartition des Charges")
+            charges_repartition = totaux.rename_axis('Type').reset_index(name='Montant')
+            fig = px.pie(charges_repartition, values='Montant', names='Type',
+                        color_discrete_sequence=[COULEURS_POSTES[poste] for poste in POSTES],
+                        hole=0.4)
+            fig.update_layout(height=350)
+            profilage.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.subheader("Charges Diverses par Catégorie")
+            with profilage.chrono(profilage.SECTION_AGREGATION):
+                diverses = cube[cube['Poste'] == CHARGES_DIVERSES]
+                charges_cat = diverses.groupby(['Catégorie', 'Statut'])['Montant'].sum().reset_index()
+            fig = px.bar(charges_cat, x='Catégorie', y='Montant', color='Statut',
+                        color_discrete_sequence=px.colors.sequential.Reds_r)
+            fig.update_layout(height=350)
+            profilage.plotly_chart(fig, use_container_width=True)
+
+        if not cube.empty:
+            st.divider()
+            _evolution(cube)
+            st.divider()
+            _budget(cube)
+            st.divider()
+
+        # Détail des frais de mission
+        st.subheader("📊 Détail des Frais de Mission")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.write("**Certification**")
+            with profilage.chrono(profilage.SECTION_FORMATAGE):
+                frais_certif = certif[['Date', 'Client', 'Frais_Mission']].copy()
+                frais_certif['Date'] = frais_certif['Date'].dt.strftime('%d/%m/%Y')
+                frais_certif['Frais_Mission'] = frais_certif['Frais_Mission'].apply(lambda x: f"{x:,.0f} €")
+            profilage.dataframe(frais_certif, use_container_width=True, hide_index=True, height=250)
+
+        with col2:
+            st.write("**Autres Prestations**")
+            with profilage.chrono(profilage.SECTION_FORMATAGE):
+                frais_autres = autres[['Date', 'Client', 'Frais_Mission']].copy()
+                frais_autres['Date'] = frais_autres['Date'].dt.strftime('%d/%m/%Y')
+                frais_autres['Frais_Mission'] = frais_autres['Frais_Mission'].apply(lambda x: f"{x:,.0f} €")
+            profilage.dataframe(frais_autres, use_container_width=True, hide_index=True, height=250)
+
+        # Détail des coûts auditeurs
+        st.subheader("👥 Détail des Coûts Auditeurs")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.write("**Certification**")
+            with profilage.chrono(profilage.SECTION_FORMATAGE):
+                cout_certif = certif[['Date', 'Client', 'Cout_Auditeur']].copy()
+                cout_certif['Date'] = cout_certif['Date'].dt.strftime('%d/%m/%Y')
+                cout_certif['Cout_Auditeur'] = cout_certif['Cout_Auditeur'].apply(lambda x: f"{x:,.0f} €")
+            profilage.dataframe(cout_certif, use_container_width=True, hide_index=True, height=250)
+
+        with col2:
+            st.write("**Autres Prestations**")
+            with profilage.chrono(profilage.SECTION_FORMATAGE):
+                cout_autres = autres[['Date', 'Client', 'Cout_Auditeur']].copy()
+                cout_autres['Date'] = cout_autres['Date'].dt.strftime('%d/%m/%Y')
+                cout_autres['Cout_Auditeur'] = cout_autres['Cout_Auditeur'].apply(lambda x: f"{x:,.0f} €")
+            profilage.dataframe(cout_autres, use_container_width=True, hide_index=True, height=250)
+
+        # Charges diverses détaillées
+        st.subheader("📋 Charges Diverses Détaillées")
+        with profilage.chrono(profilage.SECTION_FORMATAGE):
+            charges_display = charges.copy()
+            charges_display['Date'] = charges_display['Date'].dt.strftime('%d/%m/%Y')
+            charges_display['Montant'] = charges_display['Montant'].apply(lambda x: f"{x:,.0f} €")
+        profilage.dataframe(charges_display, use_container_width=True, hide_index=True)
+
+    with tab2:
+        st.subheader("Ajouter une charge diverse")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            new_date = st.date_input("Date", datetime.now(), key="charge_new_date")
+            new_categorie = st.selectbox("Catégorie", CATEGORIES, key="charge_new_cat")
+            new_description = st.text_input("Description", key="charge_new_desc")
+
+        with col2:
+            new_montant = st.number_input("Montant (€)", min_value=0.0, step=10.0, key="charge_new_montant")
+            new_statut = st.selectbox("Statut", STATUTS, key="charge_new_statut")
+            new_entite = st.text_input("Entité", ENTITE_DEFAUT, key="charge_new_entite")
+            new_devise = st.text_input("Devise", DEVISE_DEFAUT, max_chars=3, key="charge_new_devise")
+
+        if st.button("➕ Ajouter la charge", key="add_charge"):
+            new_row = pd.DataFrame({
+                'Date': [pd.to_datetime(new_date)],
+                'Catégorie': [new_categorie],
+                'Description': [new_description],
+                'Montant': [new_montant],
+                'Statut': [new_statut],
+                'Entité': [new_entite.strip() or ENTITE_DEFAUT],
+                'Devise': [new_devise.strip().upper() or DEVISE_DEFAUT]
+            })
+            etat.ajouter(CHARGES, new_row)
+            st.success("✅ Charge ajoutée avec succès!")
+            st.rerun()
+
+    with tab3:
+        st.subheader("Modifier ou supprimer des charges")
+        grille(CHARGES, "charge", {'Catégorie': CATEGORIES, 'Statut': STATUTS})
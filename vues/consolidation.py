@@ -0,0 +1,95 @@
+"""Page Consolidation : résultats du groupe et de chaque entité, convertis en euros."""
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import etat
+import profilage
+from finance.consolidation import COLONNES_TAUX, LIGNES_CONSOLIDEES, groupe, par_entite, taux_manquants
+from finance.rapprochement import STATUTS_REALISES
+
+GROUPE = "Groupe (consolidé)"
+PERIMETRES = {"Toutes les lignes": None, "Réalisé (facturé / payé)": list(STATUTS_REALISES)}
+
+
+def _editer_taux():
+    """Éditeur de la table des taux ; les mois sont saisis au format AAAA-MM"""
+    taux = etat.taux_change()
+    st.caption("1 unité de la devise = Taux €. Un mois sans taux reprend le dernier taux connu de la devise ; "
+               "l'euro vaut toujours 1.")
+    edite = st.data_editor(taux.assign(Mois=taux['Mois'].astype(str)), num_rows='dynamic', hide_index=True,
+                           use_container_width=True, key="conso_taux_editeur",
+                           column_config={'Taux': st.column_config.NumberColumn(min_value=0.0, format="%.4f")})
+    if st.button("💾 Enregistrer les taux", key="conso_taux_enregistrer"):
+        edite = edite.dropna(subset=COLONNES_TAUX)
+        try:
+            mois = pd.PeriodIndex(edite['Mois'].astype(str), freq='M')
+        except ValueError:
+            st.error("❌ Mois invalide : utilisez le format AAAA-MM.")
+            return
+        etat.enregistrer_taux(edite.assign(Devise=edite['Devise'].str.strip().str.upper(), Mois=mois)
+                              .reset_index(drop=True))
+        st.success("✅ Taux enregistrés.")
+        st.rerun()
+
+
+def render():
+    st.header("Consolidation Groupe")
+
+    with st.expander("💱 Taux de change", expanded=False):
+        _editer_taux()
+
+    perimetre = st.radio("Périmètre", list(PERIMETRES), horizontal=True, key="conso_perimetre")
+    with profilage.chrono(profilage.SECTION_AGREGATION, etape='consolidation'):
+        sommes, consolide = etat.consolidation(PERIMETRES[perimetre])
+        manquants = taux_manquants(sommes, etat.taux_change())
+        total = groupe(consolide)
+        entites = par_entite(consolide)
+
+    if consolide.empty:
+        st.info("💡 Aucune donnée sur la période : importez des données ou chargez la démo.")
+        return
+    if len(manquants):
+        st.warning("⚠️ Montants ignorés faute de taux : "
+                   + ", ".join(sorted(manquants['Devise'].unique()))
+                   + f" ({len(manquants)} mois). Complétez la table des taux.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("CA Groupe", f"{total['CA_Total'].sum():,.0f} €")
+    with col2:
+        st.metric("Charges Groupe", f"{total['Charges_Totales'].sum():,.0f} €")
+    with col3:
+        st.metric("Résultat Groupe", f"{total['Resultat'].sum():,.0f} €")
+    with col4:
+        st.metric("Entités", len(entites))
+
+    # CA mensuel par entité et résultat du groupe
+    st.subheader("📊 CA par entité")
+    ca = consolide['CA_Total'].unstack('Entité').fillna(0.0)
+    mois = ca.index.to_timestamp()
+    fig = go.Figure([go.Bar(x=mois, y=ca[entite], name=entite) for entite in ca.columns])
+    fig.add_trace(go.Scatter(x=total.index.to_timestamp(), y=total['Resultat'], name='Résultat groupe',
+                             mode='lines+markers', line=dict(color='#2C3E50', width=3)))
+    fig.update_layout(barmode='stack', xaxis_title="Mois", yaxis_title="Montant (€)", hovermode='x unified',
+                      height=400)
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("🏢 Totaux par entité")
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        display_df = pd.concat([entites, par_entite(consolide.rename(index=lambda _: GROUPE, level='Entité'))])
+        display_df = display_df.round(0).assign(Marge_Pct=display_df['Marge_Pct'].round(1))
+    profilage.dataframe(display_df.reset_index(), use_container_width=True, hide_index=True)
+
+    st.subheader("📅 Détail mensuel")
+    choix = st.selectbox("Entité", [GROUPE] + list(entites.index), key="conso_entite")
+    detail = total if choix == GROUPE else consolide.xs(choix, level='Entité')
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        display_df = detail.round(0).assign(Marge_Pct=detail['Marge_Pct'].round(1)).reset_index()
+        display_df['Mois'] = display_df['Mois'].astype(str)
+    profilage.dataframe(display_df, use_container_width=True, hide_index=True)
+
+    st.download_button("📥 Télécharger la consolidation (CSV)",
+                       consolide[LIGNES_CONSOLIDEES].to_csv().encode('utf-8'),
+                       "consolidation.csv", "text/csv", key="conso_csv")
@@ -0,0 +1,109 @@
+"""Page Dashboard : KPIs globaux et évolution mensuelle."""
+
+import streamlit as st
+
+import etat
+import profilage
+from finance import CERTIF, AUTRES, calculer_kpis, ca_par_statut, agregation_mensuelle
+from finance.charges import CHARGES_DIVERSES, totaux_postes, evolution_mensuelle
+
+
+def render():
+    st.header("Tableau de Bord Principal")
+    etat.avertir_devises()
+
+    with profilage.chrono(profilage.SECTION_AGREGATION):
+        # Sommes mensuelles de la période (mois clos figés), qui suffisent à tous les calculs de la page
+        certif = etat.agregats(CERTIF)
+        autres = etat.agregats(AUTRES)
+
+        # Cube des charges partagé avec la page Charges (mis en cache) ; les charges diverses
+        # des KPIs en sont tirées, sans second passage sur les agrégats du ledger des charges
+        charges = etat.cube_charges()
+        kpis = calculer_kpis(certif, autres, charges[charges['Poste'] == CHARGES_DIVERSES])
+
+    # Métriques principales
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("💰 CA Total", f"{kpis.ca_total:,.0f} €")
+        st.caption(f"Certif: {kpis.ca_certif:,.0f} € | Autres: {kpis.ca_autres:,.0f} €")
+
+    with col2:
+        st.metric("💸 Charges Totales", f"{kpis.charges_total:,.0f} €")
+        st.caption(f"Mission: {kpis.frais_mission:,.0f} € | Audit: {kpis.cout_auditeur:,.0f} €")
+
+    with col3:
+        st.metric("📊 Résultat", f"{kpis.resultat:,.0f} €",
+                 delta_color="normal" if kpis.resultat > 0 else "inverse")
+
+    with col4:
+        st.metric("📈 Marge Nette", f"{kpis.marge_nette:.1f}%")
+
+    st.divider()
+
+    if etat.ledgers_vides():
+        st.info("💡 Aucune donnée à afficher : importez un fichier depuis **📤 Import/Export** "
+                "ou chargez les données de démonstration depuis la barre latérale.")
+        return
+
+    # Import différé : plotly n'est chargé que s'il y a des graphiques à dessiner
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    # Graphiques principaux
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("CA: Certification vs Autres")
+
+        fig = go.Figure(data=[
+            go.Bar(name='Certification', x=['Facturé', 'Prévu'], 
+                   y=ca_par_statut(certif, ['Facturé', 'Prévu']),
+                   marker_color='#3498DB'),
+            go.Bar(name='Autres', x=['Facturé', 'Prévu'],
+                   y=ca_par_statut(autres, ['Facturé', 'Prévu']),
+                   marker_color='#E67E22')
+        ])
+        fig.update_layout(barmode='group', height=350)
+        profilage.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.subheader("Répartition des Charges")
+
+        charges_data = totaux_postes(charges).rename_axis('Type').reset_index(name='Montant')
+
+        fig = px.pie(charges_data, values='Montant', names='Type',
+                    color_discrete_sequence=['#E74C3C', '#9B59B6', '#95A5A6'],
+                    hole=0.4)
+        fig.update_layout(height=350)
+        profilage.plotly_chart(fig, use_container_width=True)
+
+    # Evolution mensuelle combinée
+    st.subheader("Evolution Mensuelle: CA, Marges et Charges")
+
+    with profilage.chrono(profilage.SECTION_AGREGATION):
+        # Agrégation mensuelle
+        certif_agg = agregation_mensuelle(certif)
+        autres_agg = agregation_mensuelle(autres)
+        charges_mois = evolution_mensuelle(charges)['Total']
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=certif_agg['Mois'], y=certif_agg['Montant_Facturation'],
+                        name='CA Certification', marker_color='#3498DB'))
+    fig.add_trace(go.Bar(x=autres_agg['Mois'], y=autres_agg['Montant_Facturation'],
+                        name='CA Autres', marker_color='#E67E22'))
+    fig.add_trace(go.Scatter(x=certif_agg['Mois'], y=certif_agg['Marge'],
+                            name='Marge Certification', mode='lines+markers',
+                            line=dict(color='#27AE60', width=3)))
+    fig.add_trace(go.Scatter(x=charges_mois.index.astype(str), y=charges_mois,
+                            name='Charges Totales', mode='lines+markers',
+                            line=dict(color='#E74C3C', width=2, dash='dot')))
+
+    fig.update_layout(
+        xaxis_title="Mois",
+        yaxis_title="Montant (€)",
+        hovermode='x unified',
+        height=400
+    )
+    profilage.plotly_chart(fig, use_container_width=True)
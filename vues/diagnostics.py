@@ -0,0 +1,99 @@
+"""Page Diagnostics (cachée) : mémoire de la session, temps de rendu par page et par section."""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime
+
+import etat
+import profilage
+
+
+def _memoire():
+    """Mémoire de l'état de la session par catégorie et par clé, pics et caches libérés"""
+    st.subheader("💾 Mémoire de la session")
+    inventaire = etat.memoire_session()
+    octets, budget = inventaire['Octets'].sum(), etat.budget_memoire()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("État de la session", f"{octets / 1e6:,.1f} Mo")
+    with col2:
+        st.metric("Budget", f"{budget / 1e6:,.0f} Mo", help=f"Variable d'environnement {etat.ENV_BUDGET}")
+    with col3:
+        st.metric("Utilisation", f"{octets / budget * 100:.0f} %")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        categories = inventaire.groupby('Catégorie')['Octets'].sum().sort_values(ascending=False)
+        st.dataframe((categories / 1e6).round(2).rename('Mo').reset_index(), use_container_width=True,
+                     hide_index=True)
+    with col2:
+        pics = pd.Series(etat.pics_memoire(), name='Mo', dtype=float) / 1e6
+        st.dataframe(pics.round(1).rename_axis('Pic').reset_index(), use_container_width=True, hide_index=True)
+        st.caption("Pics des pages et des tâches de fond : hausse de la mémoire du processus pendant le "
+                   "traitement, activité simultanée des autres sessions comprise.")
+    with st.expander("Détail par clé"):
+        st.dataframe(inventaire.assign(Mo=(inventaire['Octets'] / 1e6).round(3)).drop(columns='Octets'),
+                     use_container_width=True, hide_index=True)
+    liberations = st.session_state.get('_memoire_liberations', [])
+    if liberations:
+        with st.expander(f"Libérations au-delà du budget ({len(liberations)})"):
+            st.dataframe(pd.DataFrame(liberations, columns=['Heure', 'Élément libéré']).iloc[::-1],
+                         use_container_width=True, hide_index=True)
+    if st.button("🧹 Libérer les caches dérivés", key="liberer_caches"):
+        etat.liberer_caches()
+        st.rerun()
+
+
+def render():
+    st.header("🩺 Diagnostics de performance")
+
+    _memoire()
+    st.caption("Mesures de toutes les sessions de ce serveur, "
+               f"{profilage.TAILLE_REGISTRE} dernières conservées en mémoire.")
+
+    mesures = pd.DataFrame(profilage.registre.mesures())
+    if mesures.empty:
+        st.info("Aucune mesure enregistrée pour l'instant : naviguez dans l'application puis revenez ici.")
+        return
+
+    # Synthèse par page et section
+    st.subheader("⏱️ Synthèse par page et section")
+    profilage.dataframe(profilage.registre.resume(), use_container_width=True, hide_index=True)
+
+    # Evolution du temps total par page
+    st.subheader("📈 Temps de rendu des pages")
+    totaux = mesures[mesures['section'] == profilage.SECTION_TOTAL].copy()
+    totaux['Heure'] = pd.to_datetime(totaux['horodatage'], unit='s')
+    fig = px.line(totaux, x='Heure', y='duree_ms', color='page', markers=True,
+                  labels={'duree_ms': 'Durée (ms)', 'page': 'Page'})
+    fig.update_layout(height=350)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Volumes envoyés au navigateur par st.dataframe
+    if 'octets' in mesures.columns:
+        st.subheader("📦 Taille des tableaux envoyés")
+        tableaux = mesures[mesures['section'] == profilage.SECTION_TABLEAU]
+        volumes = tableaux.groupby('page').agg(
+            tableaux=('octets', 'count'),
+            lignes_max=('lignes', 'max'),
+            octets_max=('octets', 'max'),
+        ).reset_index()
+        st.dataframe(volumes, use_container_width=True, hide_index=True)
+
+    # Dernières mesures brutes
+    with st.expander("Dernières mesures"):
+        st.dataframe(mesures.tail(200).iloc[::-1], use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📥 Exporter les mesures (JSON)",
+            data=profilage.registre.exporter_json().encode('utf-8'),
+            file_name=f'diagnostics_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json',
+            mime='application/json'
+        )
+    with col2:
+        if st.button("🗑️ Vider les mesures", key="vider_mesures"):
+            profilage.registre.vider()
+            st.rerun()
@@ -0,0 +1,98 @@
+"""Page Écarts : rapprochement d'un forecast avec le réalisé, par mois et par ligne."""
+
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+
+import etat
+import profilage
+from finance import COLONNES_FORECAST
+from finance.partitions import mois_courant
+from finance.rapprochement import LIGNES_RAPPROCHEES, ecarts
+
+FORECAST_EN_COURS = 0
+
+
+def _prevu(choix, depot):
+    """Forecast choisi, indexé par mois"""
+    if choix == FORECAST_EN_COURS:
+        base = st.session_state.forecast_base
+        return st.session_state.forecast_data.set_index(base.index)[COLONNES_FORECAST].astype(float)
+    return depot.forecast(choix)
+
+
+def render():
+    st.header("Écarts Forecast / Réalisé")
+
+    depot = etat.versions_forecast()
+    choix = depot.numeros()[::-1]
+    if 'forecast_data' in st.session_state and 'forecast_base' in st.session_state:
+        choix = [FORECAST_EN_COURS] + choix
+    if not choix:
+        st.info("💡 Générez ou enregistrez un forecast (page Forecast) pour le rapprocher du réalisé.")
+        return
+
+    selection = st.selectbox(
+        "Forecast", choix, key="ecarts_forecast",
+        format_func=lambda n: "Forecast en cours" if n == FORECAST_EN_COURS
+        else f"Version {n} – {depot.version(n).libelle}")
+    prevu = _prevu(selection, depot)
+
+    # Mois échus du forecast (le mois en cours est partiel)
+    with profilage.chrono(profilage.SECTION_AGREGATION):
+        realise = etat.realise([m for m in prevu.index if m <= mois_courant()])
+        table = ecarts(prevu, realise)
+    etat.avertir_devises(prevu.index[0], prevu.index[-1])
+
+    if table.empty:
+        st.info(f"💡 Aucun mois de ce forecast ({prevu.index[0]} → {prevu.index[-1]}) n'est encore échu.")
+        return
+
+    st.caption("Réalisé : lignes facturées (facturation) et payées (charges). "
+               "Le mois en cours, s'il fait partie du forecast, n'est que partiellement réalisé.")
+
+    # KPIs cumulés sur les mois rapprochés
+    totaux = table.groupby('Ligne')[['Prévu', 'Réalisé', 'Ecart']].sum()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("CA Prévu", f"{totaux.at['CA_Total', 'Prévu']:,.0f} €")
+    with col2:
+        st.metric("CA Réalisé", f"{totaux.at['CA_Total', 'Réalisé']:,.0f} €",
+                  delta=f"{totaux.at['CA_Total', 'Ecart']:,.0f} €")
+    with col3:
+        st.metric("Résultat Prévu", f"{totaux.at['Resultat', 'Prévu']:,.0f} €")
+    with col4:
+        st.metric("Résultat Réalisé", f"{totaux.at['Resultat', 'Réalisé']:,.0f} €",
+                  delta=f"{totaux.at['Resultat', 'Ecart']:,.0f} €")
+
+    # Prévu et réalisé d'une ligne, mois par mois
+    ligne = st.selectbox("Ligne", LIGNES_RAPPROCHEES, key="ecarts_ligne")
+    detail = table[table['Ligne'] == ligne]
+    mois = detail['Mois'].astype(str)
+    fig = go.Figure([
+        go.Bar(x=mois, y=detail['Prévu'], name='Prévu', marker_color='#95A5A6'),
+        go.Bar(x=mois, y=detail['Réalisé'], name='Réalisé', marker_color='#3498DB'),
+    ])
+    fig.update_layout(barmode='group', xaxis_title="Mois", yaxis_title="Montant (€)", hovermode='x unified',
+                      height=400)
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    # Écarts en % par mois et par ligne
+    st.subheader("🌡️ Écarts (%) par mois et par ligne")
+    carte = table.pivot(index='Ligne', columns='Mois', values='Ecart_Pct').reindex(LIGNES_RAPPROCHEES)
+    carte.columns = carte.columns.astype(str)
+    fig = px.imshow(carte.round(1), text_auto=True, aspect='auto', color_continuous_scale='RdBu',
+                    color_continuous_midpoint=0, labels={'color': 'Écart (%)'})
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("📋 Détail des écarts")
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        display_df = table.copy()
+        display_df['Mois'] = display_df['Mois'].astype(str)
+        for col in ['Prévu', 'Réalisé', 'Ecart']:
+            display_df[col] = display_df[col].apply(lambda x: f"{x:,.0f} €")
+        display_df['Ecart_Pct'] = display_df['Ecart_Pct'].apply(lambda x: f"{x:+.1f}%" if x == x else "")
+    profilage.dataframe(display_df, use_container_width=True, hide_index=True)
+
+    st.download_button("📥 Télécharger les écarts (CSV)", table.to_csv(index=False).encode('utf-8'),
+                       "ecarts_forecast_realise.csv", "text/csv", key="ecarts_csv")
@@ -0,0 +1,64 @@
+"""Grille d'édition des ledgers, partagée par les pages Certification, Autres et Charges.
+
+Les cellules modifiées et les lignes supprimées dans la grille sont appliquées ensemble,
+en une seule opération du journal (annulable), quand l'utilisateur les enregistre.
+"""
+
+import streamlit as st
+
+import etat
+from finance import SCHEMAS, LIBELLES
+from finance.journal import difference
+
+# Lignes affichées au plus dans la grille (au-delà : restreindre la période ou filtrer)
+LIGNES_MAX = 5000
+
+
+def _configuration(nom, lignes, choix):
+    """Colonnes de la grille : dates, montants et listes de valeurs"""
+    config = {'Date': st.column_config.DateColumn("Date", format="DD/MM/YYYY", required=True)}
+    for colonne, dtype in SCHEMAS[nom].items():
+        if dtype == 'float64':
+            config[colonne] = st.column_config.NumberColumn(colonne, format="%.2f", required=True)
+    for colonne, valeurs in (choix or {}).items():
+        # Les valeurs importées hors liste restent sélectionnables
+        options = list(valeurs) + sorted(set(lignes[colonne].dropna()) - set(valeurs))
+        config[colonne] = st.column_config.SelectboxColumn(colonne, options=options, required=True)
+    return config
+
+
+def grille(nom, prefixe, choix=None):
+    """Grille éditable des lignes de la période ; `choix` : valeurs proposées par colonne"""
+    recherche = st.text_input("🔎 Filtrer les lignes (texte contenu dans une colonne)", key=f"{prefixe}_grille_filtre")
+    lignes = etat.lire_periode(nom)
+    if recherche:
+        textes = lignes.select_dtypes(include='object')
+        masque = textes.apply(lambda col: col.str.contains(recherche, case=False, regex=False, na=False)).any(axis=1)
+        lignes = lignes[masque]
+    if lignes.empty:
+        st.info("💡 Aucune ligne sur la période.")
+        return
+    if len(lignes) > LIGNES_MAX:
+        st.warning(f"⚠️ {len(lignes)} lignes : seules les {LIGNES_MAX} premières sont affichées. "
+                   "Restreignez la période ou filtrez.")
+        lignes = lignes.iloc[:LIGNES_MAX]
+
+    st.caption("Modifiez les cellules et supprimez des lignes (sélection puis 🗑️) ; rien n'est écrit avant "
+               "l'enregistrement, qui s'annule d'un clic.")
+    # La clé change avec les données affichées : la grille repart de l'état enregistré
+    cle = f"{prefixe}_grille_{etat.version(nom)}_{hash((etat.periode(), recherche))}"
+    edite = st.data_editor(lignes, num_rows='delete', hide_index=True, use_container_width=True,
+                           column_config=_configuration(nom, lignes, choix), key=cle)
+
+    operation = difference(nom, '', lignes, edite.astype(SCHEMAS[nom]))
+    modifiees = len(operation.ajoutees)
+    supprimees = len(operation.retirees) - modifiees
+    st.write(f"**{modifiees}** ligne(s) modifiée(s), **{supprimees}** ligne(s) supprimée(s) en attente.")
+    sans_date = edite['Date'].isna().any()
+    if sans_date:
+        st.error("❌ Chaque ligne doit avoir une date.")
+    if st.button("💾 Enregistrer les modifications", key=f"{prefixe}_grille_enregistrer",
+                 disabled=operation.retirees.empty or sans_date):
+        etat.modifier(nom, lignes, edite)
+        st.success(f"✅ {LIBELLES[nom]} : {modifiees} ligne(s) modifiée(s), {supprimees} supprimée(s).")
+        st.rerun()
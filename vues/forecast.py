@@ -0,0 +1,330 @@
+"""Page Forecast : prévisions mensuelles ajustables."""
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import etat
+import profilage
+from finance import (
+    CERTIF, AUTRES, CHARGES, COLONNES_FACTURATION, COLONNES_FORECAST,
+    ParametresForecast, generer_forecast, mois_forecast, libelles_mois, completer_forecast, resume_forecast
+)
+from finance.lissage import SAISON, series_mensuelles, ajuster, generer_forecast_saisonnier
+from finance.backtest import backtester
+from finance.versions import ajustements, appliquer
+from vues.taches import suivi
+
+MODELE_SAISONNIER = "📈 Saisonnier (lissage exponentiel)"
+MODELE_MOYENNE = "➗ Moyenne + croissance"
+
+
+def _ajuster():
+    with profilage.chrono(profilage.SECTION_AGREGATION, etape='ajustement'):
+        series = series_mensuelles(etat.agregats(CERTIF), etat.agregats(AUTRES), etat.agregats(CHARGES))
+        return series, ajuster(series) if len(series) else None
+
+
+def _modele_saisonnier():
+    """Séries mensuelles et modèle ajusté, recalculés seulement si les données ou la période changent"""
+    return etat.calcul_en_cache('forecast_saisonnier', _ajuster)
+
+
+def _rebaser(forecast):
+    """Installe un forecast généré ; les ajustements manuels du forecast courant y sont reportés (mêmes mois)"""
+    base = forecast.set_index(mois_forecast(forecast))[COLONNES_FORECAST].astype(float)
+    if 'forecast_data' in st.session_state and 'forecast_base' in st.session_state:
+        ancienne = st.session_state.forecast_base
+        ajust = ajustements(ancienne, st.session_state.forecast_data.set_index(ancienne.index))
+        forecast = forecast.copy()
+        forecast[COLONNES_FORECAST] = appliquer(base, ajust).to_numpy()
+    st.session_state.forecast_base = base
+    st.session_state.forecast_data = forecast
+
+
+def _restaurer(numero):
+    """Recharge une version enregistrée, avec son modèle et son nombre de mois"""
+    depot = etat.versions_forecast()
+    version = depot.version(numero)
+    forecast = depot.forecast(numero)
+    st.session_state.forecast_base = depot.base(numero)
+    st.session_state.forecast_data = pd.concat([
+        pd.Series(forecast.index, name='Mois'),
+        forecast.reset_index(drop=True),
+    ], axis=1)
+    st.session_state.forecast_nb_mois = len(forecast)
+    st.session_state.forecast_modele = version.modele
+    st.session_state.forecast_cle = (etat.periode(), version.modele)
+
+
+def _libelle_version(depot, numero):
+    return f"{numero} – {depot.version(numero).libelle}"
+
+
+def render():
+    st.header("Prévisions Financières avec Ajustements")
+
+    if etat.agregats(CERTIF)['Lignes'].sum() == 0 and etat.agregats(AUTRES)['Lignes'].sum() == 0:
+        st.info("💡 Aucune facturation disponible : importez des données ou chargez la démo pour générer un forecast.")
+        return
+    etat.avertir_devises()
+
+    series, modele_saisonnier = _modele_saisonnier()
+
+    # Paramètres du forecast
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.session_state.setdefault('forecast_nb_mois', 6)
+        nb_mois = st.slider("Nombre de mois à prévoir", 1, 12, key="forecast_nb_mois")
+        # La saisonnalité n'est estimable qu'avec deux années d'historique
+        st.session_state.setdefault('forecast_modele',
+                                    MODELE_SAISONNIER if len(series) >= 2 * SAISON else MODELE_MOYENNE)
+        modele = st.radio("Modèle", [MODELE_SAISONNIER, MODELE_MOYENNE], key="forecast_modele")
+    if modele == MODELE_MOYENNE:
+        with col2:
+            croissance_ca_certif = st.slider("Croissance CA Certif (%/mois)", -10.0, 20.0, 3.0, 0.5)
+            croissance_ca_autres = st.slider("Croissance CA Autres (%/mois)", -10.0, 20.0, 2.0, 0.5)
+        with col3:
+            croissance_charges = st.slider("Croissance Charges (%/mois)", -10.0, 20.0, 1.5, 0.5)
+        params = ParametresForecast(nb_mois, croissance_ca_certif, croissance_ca_autres, croissance_charges)
+    else:
+        params = ParametresForecast(nb_mois)
+        with col2:
+            if modele_saisonnier.saisonnier:
+                st.caption(f"Niveau, tendance amortie et saisonnalité estimés sur {len(series)} mois d'historique.")
+            else:
+                st.caption(f"{len(series)} mois d'historique : moins de deux années, la saisonnalité "
+                           "n'est pas estimée (niveau et tendance amortie seulement).")
+        with col3:
+            with st.expander("🔍 Paramètres ajustés"):
+                st.dataframe(modele_saisonnier.description(), use_container_width=True, hide_index=True)
+
+    st.divider()
+
+    # Section d'ajustement des prévisions
+    st.subheader("🎯 Ajuster les prévisions mensuelles")
+    st.write("Modifiez les valeurs vides ou ajustez les prévisions pour chaque mois")
+
+    # Création du dataframe de forecast éditable
+    cle = (etat.periode(), modele)
+    if ('forecast_data' not in st.session_state or len(st.session_state.forecast_data) != nb_mois
+            or st.session_state.get('forecast_cle') != cle):
+        st.session_state.forecast_cle = cle
+        with profilage.chrono(profilage.SECTION_AGREGATION):
+            if modele == MODELE_SAISONNIER:
+                forecast = generer_forecast_saisonnier(modele_saisonnier, nb_mois)
+            else:
+                forecast = generer_forecast(
+                    etat.lire_periode(CERTIF, ['Date'] + COLONNES_FACTURATION, devise_base=True),
+                    etat.lire_periode(AUTRES, ['Date'] + COLONNES_FACTURATION, devise_base=True),
+                    etat.lire_periode(CHARGES, ['Date', 'Montant'], devise_base=True),
+                    params
+                )
+            _rebaser(forecast)
+
+    # Editeur de données : les mois (périodes) n'y sont affichés que sous forme de libellés
+    st.write("**💡 Astuce**: Double-cliquez sur une cellule pour modifier les valeurs")
+
+    forecast_data = st.session_state.forecast_data
+    libelles = libelles_mois(forecast_data)
+    edited_forecast = st.data_editor(
+        forecast_data.assign(Mois=libelles),
+        use_container_width=True,
+        hide_index=True,
+        num_rows="fixed",
+        column_config={
+            "Mois": st.column_config.TextColumn("Mois", disabled=True),
+            "CA_Certification": st.column_config.NumberColumn(
+                "CA Certification (€)",
+                min_value=0,
+                format="%.0f €"
+            ),
+            "CA_Autres": st.column_config.NumberColumn(
+                "CA Autres (€)",
+                min_value=0,
+                format="%.0f €"
+            ),
+            "Frais_Mission": st.column_config.NumberColumn(
+                "Frais Mission (€)",
+                min_value=0,
+                format="%.0f €"
+            ),
+            "Cout_Auditeurs": st.column_config.NumberColumn(
+                "Coût Auditeurs (€)",
+                min_value=0,
+                format="%.0f €"
+            ),
+            "Charges_Diverses": st.column_config.NumberColumn(
+                "Charges Diverses (€)",
+                min_value=0,
+                format="%.0f €"
+            )
+        }
+    )
+
+    # Mise à jour du forecast
+    edited_forecast['Mois'] = forecast_data['Mois']
+    st.session_state.forecast_data = edited_forecast
+
+    # Calculs des résultats
+    completer_forecast(edited_forecast)
+
+    st.divider()
+
+    # Graphique de forecast
+    st.subheader("📊 Visualisation des Prévisions")
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=libelles,
+        y=edited_forecast['CA_Certification'],
+        name='CA Certification',
+        marker_color='#3498DB'
+    ))
+
+    fig.add_trace(go.Bar(
+        x=libelles,
+        y=edited_forecast['CA_Autres'],
+        name='CA Autres',
+        marker_color='#E67E22'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=libelles,
+        y=edited_forecast['Charges_Totales'],
+        name='Charges Totales',
+        mode='lines+markers',
+        line=dict(color='#E74C3C', width=3),
+        marker=dict(size=10)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=libelles,
+        y=edited_forecast['Resultat'],
+        name='Résultat',
+        mode='lines+markers',
+        line=dict(color='#27AE60', width=3, dash='dash'),
+        marker=dict(size=10)
+    ))
+
+    fig.update_layout(
+        xaxis_title="Mois",
+        yaxis_title="Montant (€)",
+        hovermode='x unified',
+        height=500,
+        barmode='stack'
+    )
+
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    # KPIs du forecast
+    st.subheader("📈 Résumé des Prévisions")
+    resume = resume_forecast(edited_forecast)
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("CA Total Prévu", f"{resume['ca_total']:,.0f} €")
+
+    with col2:
+        st.metric("Charges Totales Prévues", f"{resume['charges_totales']:,.0f} €")
+
+    with col3:
+        st.metric("Résultat Prévu", f"{resume['resultat']:,.0f} €",
+                 delta_color="normal" if resume['resultat'] > 0 else "inverse")
+
+    with col4:
+        st.metric("Marge Moyenne", f"{resume['marge_moyenne']:.1f}%")
+
+    # Tableau détaillé des résultats
+    st.subheader("📋 Détail des Prévisions avec Résultats")
+
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        result_display = edited_forecast.assign(Mois=libelles)
+        for col in ['CA_Certification', 'CA_Autres', 'CA_Total', 'Frais_Mission', 
+                    'Cout_Auditeurs', 'Charges_Diverses', 'Charges_Totales', 'Resultat']:
+            result_display[col] = result_display[col].apply(lambda x: f"{x:,.0f} €")
+        result_display['Marge_Pct'] = result_display['Marge_Pct'].apply(lambda x: f"{x:.1f}%")
+
+    profilage.dataframe(result_display, use_container_width=True, hide_index=True)
+
+    # Backtest des deux modèles sur l'historique de la période
+    with st.expander("🧪 Backtesting : précision des modèles sur l'historique"):
+        if len(series) <= SAISON:
+            st.info(f"💡 Le backtest demande plus de {SAISON} mois d'historique ({len(series)} disponibles).")
+        else:
+            resultat, tache = etat.calcul_en_arriere_plan(
+                'forecast_backtest', "Backtest des modèles de forecast",
+                lambda progression: backtester(series, nb_mois, params), nb_mois, params)
+            if resultat is None:
+                suivi('forecast_backtest')
+                if tache.finie and st.button("🔄 Relancer le backtest", key="forecast_backtest_relancer"):
+                    etat.relancer_calcul('forecast_backtest')
+                    st.rerun()
+            else:
+                par_ligne, par_horizon = resultat
+                st.caption(f"Origines glissantes de {SAISON} à {len(series) - 1} mois d'historique, "
+                           f"prévisions à {nb_mois} mois comparées au réalisé. "
+                           "Biais positif : le modèle surestime. Croissances : curseurs du modèle moyenne.")
+                tableau = par_ligne.pivot(index='Ligne', columns='Modèle', values=['MAPE', 'Biais'])
+                tableau = tableau.reindex(series.columns).round(1)
+                tableau.columns = [f"{mesure} (%) – {modele}" for mesure, modele in tableau.columns]
+                profilage.dataframe(tableau.rename_axis('Ligne').reset_index(), use_container_width=True, hide_index=True)
+
+                fig = go.Figure([go.Scatter(x=par_horizon.index, y=par_horizon[modele], name=modele,
+                                            mode='lines+markers') for modele in par_horizon.columns])
+                fig.update_layout(xaxis_title="Horizon (mois)", yaxis_title="MAPE (%)", height=350,
+                                  hovermode='x unified')
+                profilage.plotly_chart(fig, use_container_width=True)
+
+    # Versions enregistrées : forecast généré et ajustements manuels
+    st.subheader("🗂️ Versions du forecast")
+    depot = etat.versions_forecast()
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        libelle = st.text_input("Libellé de la version", key="forecast_version_libelle",
+                                placeholder="Budget initial, révision T2...")
+    with col2:
+        st.write("")
+        if st.button("💾 Enregistrer cette version", key="forecast_version_enregistrer"):
+            base = st.session_state.forecast_base
+            version = depot.enregistrer(libelle or f"Version du {pd.Timestamp.now():%d/%m/%Y %H:%M}", modele,
+                                        base, edited_forecast.set_index(base.index))
+            st.success(f"✅ Version {version.numero} enregistrée ({len(version.ajustements)} ajustements)")
+
+    if depot.numeros():
+        profilage.dataframe(depot.resume(), use_container_width=True, hide_index=True)
+        numeros = depot.numeros()[::-1]
+        st.caption("Le rapprochement des versions avec le réalisé se trouve sur la page 📐 Écarts Forecast / Réalisé.")
+        tab1, tab2 = st.tabs(["↩️ Restaurer", "🔀 Comparer deux versions"])
+
+        with tab1:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                numero = st.selectbox("Version", numeros, key="forecast_version_restaurer",
+                                      format_func=lambda n: _libelle_version(depot, n))
+            with col2:
+                st.write("")
+                st.button("↩️ Restaurer", key="forecast_version_restaurer_btn", on_click=_restaurer, args=(numero,))
+
+        with tab2:
+            col1, col2 = st.columns(2)
+            with col1:
+                numero_a = st.selectbox("Version A", numeros, index=min(1, len(numeros) - 1),
+                                        key="forecast_version_a", format_func=lambda n: _libelle_version(depot, n))
+            with col2:
+                numero_b = st.selectbox("Version B", numeros, key="forecast_version_b",
+                                        format_func=lambda n: _libelle_version(depot, n))
+            ecarts = depot.comparer(numero_a, numero_b)
+            if ecarts.empty:
+                st.info("Les deux versions sont identiques.")
+            else:
+                ecarts['Mois'] = ecarts['Mois'].astype(str)
+                profilage.dataframe(ecarts.round(0), use_container_width=True, hide_index=True)
+
+    # Bouton pour réinitialiser le forecast (les ajustements non enregistrés sont perdus)
+    if st.button("🔄 Réinitialiser les prévisions avec les nouveaux paramètres"):
+        del st.session_state.forecast_data
+        st.session_state.pop('forecast_base', None)
+        st.rerun()
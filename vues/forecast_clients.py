@@ -0,0 +1,84 @@
+"""Page Forecast par client : prévisions saisonnières par client, référentiel ou type."""
+
+import streamlit as st
+import plotly.graph_objects as go
+
+import etat
+import profilage
+from finance import CERTIF, AUTRES
+from finance.lissage import series_par, ajuster_lot, synthese_par
+
+# Axe de prévision -> (ledgers dont les cubes portent la dimension, dimension)
+AXES = {
+    "Client": ((CERTIF, AUTRES), 'Client'),
+    "Référentiel (certification)": ((CERTIF,), 'Référentiel'),
+    "Type (autres prestations)": ((AUTRES,), 'Type'),
+}
+
+
+def _ajuster(axe):
+    ledgers, dimension = AXES[axe]
+    with profilage.chrono(profilage.SECTION_AGREGATION, etape='ajustement', axe=dimension):
+        series = series_par([etat.cube(nom) for nom in ledgers], dimension)
+        return series, ajuster_lot(series) if series.shape[1] else None
+
+
+def _modeles(axe):
+    """Séries et modèles de l'axe, ajustés une fois par version des données et période"""
+    return etat.calcul_en_cache(f'forecast_par_{AXES[axe][1]}', lambda: _ajuster(axe), axe)
+
+
+def render():
+    st.header("Forecast par Client")
+    etat.avertir_devises()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        axe = st.radio("Prévoir par", list(AXES), horizontal=True, key="fc_clients_axe")
+    with col2:
+        nb_mois = st.slider("Nombre de mois à prévoir", 1, 12, 6, key="fc_clients_mois")
+
+    series, modele = _modeles(axe)
+    if modele is None:
+        st.info("💡 Aucune facturation sur la période : importez des données ou chargez la démo.")
+        return
+
+    with profilage.chrono(profilage.SECTION_AGREGATION):
+        prevision = modele.prevoir(nb_mois)
+        synthese = synthese_par(series, prevision)
+
+    st.caption(f"{series.shape[1]} séries ajustées sur {len(series)} mois d'historique "
+               f"({'avec' if modele.saisonnier else 'sans'} saisonnalité).")
+
+    # Pipeline d'un client (ou référentiel, type) : historique et prévision
+    choix = st.selectbox(AXES[axe][1], list(synthese.index), key="fc_clients_choix")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(f"Réalisé ({nb_mois} derniers mois)", f"{synthese.at[choix, 'Réalisé']:,.0f} €")
+    with col2:
+        evolution = synthese.at[choix, 'Evolution_Pct']
+        st.metric(f"Prévu ({nb_mois} prochains mois)", f"{synthese.at[choix, 'Prévu']:,.0f} €",
+                  delta=None if evolution != evolution else f"{evolution:+.1f}%")
+    with col3:
+        erreur = modele.erreur_relative[modele.colonnes.index(choix)]
+        st.metric("Erreur relative du modèle", f"{erreur * 100:.0f}%")
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=series.index.to_timestamp(), y=series[choix], name='Historique',
+                         marker_color='#3498DB'))
+    fig.add_trace(go.Scatter(x=prevision.index.to_timestamp(), y=prevision[choix], name='Prévision',
+                             mode='lines+markers', line=dict(color='#E67E22', width=3, dash='dash')))
+    fig.update_layout(xaxis_title="Mois", yaxis_title="CA (€)", hovermode='x unified', height=400)
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    # Toutes les séries, triées par CA prévu
+    st.subheader("📋 Prévisions par " + AXES[axe][1])
+    tableau = synthese.join(prevision.T.set_axis(prevision.index.strftime('%m/%Y'), axis=1))
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        display_df = tableau.round(0).rename_axis(AXES[axe][1]).reset_index()
+        display_df['Evolution_Pct'] = tableau['Evolution_Pct'].round(1).to_numpy()
+    profilage.dataframe(display_df, use_container_width=True, hide_index=True)
+
+    st.download_button("📥 Télécharger les prévisions (CSV)",
+                       tableau.rename_axis(AXES[axe][1]).to_csv().encode('utf-8'),
+                       f"forecast_par_{AXES[axe][1].lower()}.csv", "text/csv", key="fc_clients_csv")
@@ -0,0 +1,727 @@
+"""Page Import/Export : import Excel et export CSV."""
+
+import io
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+import etat
+import profilage
+from finance import (
+    CERTIF, AUTRES, CHARGES, LIBELLES, clean_data, detecter_colonnes, colonnes_manquantes,
+    preparer_certif, preparer_autres, preparer_charges, lire_classeur
+)
+from finance.anomalies import CONTROLES, CLES_DOUBLONS, detecter_anomalies, resume_anomalies, lignes_signalees
+from vues.taches import suivi
+
+MODE_GUIDE = "🔍 Import guidé (aperçu et colonnes par feuille)"
+MODE_FOND = "⏳ Import complet en arrière-plan"
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+LIGNES_MAX_EXCEL = 1_048_576
+
+
+def _controler(nom, new_data, remplacer, prefixe):
+    """Rapport des contrôles du lot avant import ; retourne les lignes à importer"""
+    existant = None if remplacer else etat.lire(nom, CLES_DOUBLONS[nom])
+    with profilage.chrono(profilage.SECTION_IMPORT, etape='controles'):
+        controles = detecter_anomalies(new_data, nom, existant)
+    resume = resume_anomalies(controles)
+    if not any(resume.values()):
+        st.success(f"✅ Contrôles : aucune anomalie sur {len(new_data)} lignes.")
+        return new_data
+
+    st.warning("⚠️ Contrôles : " + ", ".join(f"{CONTROLES[c].lower()} ({n})" for c, n in resume.items() if n)
+               + f" sur {len(new_data)} lignes.")
+    with st.expander("🔎 Lignes signalées"):
+        profilage.dataframe(lignes_signalees(new_data, controles), use_container_width=True, hide_index=True)
+    if st.checkbox("Exclure les lignes signalées de l'import", key=f"{prefixe}_exclure_anomalies"):
+        return new_data[~controles[list(CONTROLES)].any(axis=1)]
+    return new_data
+
+
+def _importer_classeur(progression, contenu, existants, exclure):
+    """Tâche de fond : lit les feuilles reconnues et les contrôle ; retourne les lignes à importer par ledger"""
+    ledgers = lire_classeur(io.BytesIO(contenu),
+                            progression=lambda fraction, message: progression(fraction * 0.8, message))
+    if not ledgers:
+        raise ValueError("aucune feuille reconnue dans le classeur")
+    a_importer, resumes = {}, []
+    for nom, df in ledgers.items():
+        progression(0.8, f"Contrôles {LIBELLES[nom]}")
+        signalees = detecter_anomalies(df, nom, existants.get(nom))[list(CONTROLES)].any(axis=1)
+        a_importer[nom] = df[~signalees] if exclure else df
+        resumes.append(f"{LIBELLES[nom]} : {len(a_importer[nom])} lignes ({int(signalees.sum())} signalées)")
+    progression(1.0, " ; ".join(resumes))
+    return a_importer
+
+
+def _import_en_fond(fichier):
+    """Import de toutes les feuilles reconnues, sans aperçu, par une tâche de fond"""
+    st.caption("Les feuilles reconnues sont lues avec leurs lignes de départ par défaut et contrôlées hors de la "
+               "page : vous pouvez continuer à naviguer, les données sont chargées à la fin de la tâche.")
+    col1, col2 = st.columns(2)
+    with col1:
+        remplacer = st.checkbox("Remplacer les données existantes", value=True, key="fond_remplacer")
+    with col2:
+        exclure = st.checkbox("Exclure les lignes signalées par les contrôles", key="fond_exclure_anomalies")
+    if st.button("⏳ Lancer l'import en arrière-plan", key="fond_importer", type="primary"):
+        existants = {} if remplacer else {nom: etat.lire(nom, CLES_DOUBLONS[nom]) for nom in LIBELLES}
+
+        def livrer(ledgers):
+            for nom, df in ledgers.items():
+                libelle = f"Import en arrière-plan – {LIBELLES[nom]} ({len(df)} lignes)"
+                (etat.remplacer if remplacer else etat.ajouter)(nom, df, libelle)
+
+        etat.lancer_tache(f"Import de {fichier.name}", _importer_classeur, fichier.getvalue(), existants, exclure,
+                          genre='import', livraison=livrer)
+
+
+def _exporter_classeur(progression, feuilles):
+    """Tâche de fond : classeur Excel d'une feuille par DataFrame ; retourne son contenu"""
+    tampon = io.BytesIO()
+    with pd.ExcelWriter(tampon, engine='openpyxl') as writer:
+        for i, (feuille, df) in enumerate(feuilles.items()):
+            if len(df) >= LIGNES_MAX_EXCEL:
+                raise ValueError(f"La feuille {feuille} dépasse la limite Excel ({len(df)} lignes)")
+            progression(i / len(feuilles), f"Feuille {feuille} ({len(df)} lignes)")
+            df.to_excel(writer, sheet_name=feuille, index=False)
+    return tampon.getvalue()
+
+
+def _telecharger_classeur(tache):
+    st.download_button("📥 Télécharger", tache.resultat, f'finance_{tache.creee:%Y%m%d_%H%M}.xlsx',
+                       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                       key=f"tache_telecharger_{tache.id}")
+
+
+def _historique():
+    """Journal des modifications de la session et export des mois modifiés tels qu'ils étaient à une étape"""
+    operations = etat.journal().operations
+    st.write("**🕘 Historique des modifications de la session**")
+    if not operations:
+        st.caption("Aucune modification depuis l'ouverture de la session.")
+        return
+    profilage.dataframe(pd.DataFrame({
+        'Étape': range(1, len(operations) + 1),
+        'Heure': [op.horodatage.strftime('%H:%M:%S') for op in operations],
+        'Opération': [op.libelle for op in operations],
+        'Lignes': [op.nb_lignes for op in operations],
+    }), use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        nom = st.selectbox("Ledger", list(LIBELLES), format_func=LIBELLES.get, key="historique_ledger")
+    with col2:
+        etape = st.selectbox("État après l'étape", list(range(len(operations), -1, -1)), key="historique_etape",
+                             format_func=lambda n: f"{n} (actuel)" if n == len(operations) else str(n))
+    with profilage.chrono(profilage.SECTION_EXPORT):
+        csv_passe = etat.etat_passe(nom, etape).to_csv(index=False).encode('utf-8')
+    st.caption("L'export contient les mois du ledger modifiés par le journal : les autres sont "
+               "identiques à toutes les étapes.")
+    st.download_button("📥 Télécharger cet état (CSV)", csv_passe, f'{nom}_etape_{etape}.csv', 'text/csv',
+                       key="historique_csv")
+
+
+def render():
+    st.header("Import/Export de Données")
+
+    tab1, tab2 = st.tabs(["📥 Import", "📤 Export"])
+
+    with tab1:
+        st.subheader("Importer des données depuis Excel")
+
+        st.info("""
+        💡 **Import automatique intelligent**
+
+        L'application détecte automatiquement les colonnes de vos feuilles Excel :
+        - **Facturation-Certif** : Import automatique des facturations certification
+        - **Facturation-Autres** : Import automatique des autres prestations
+        - **FRAIS DIVERS** : Import automatique des charges diverses
+
+        Téléchargez simplement votre fichier !
+        """)
+
+        mode = st.radio("Mode d'import", [MODE_GUIDE, MODE_FOND], horizontal=True, key="import_mode")
+        uploaded_file = st.file_uploader(
+            "Choisir un fichier Excel", 
+            type=['xlsx', 'xls', 'xlsm']
+        )
+
+        if uploaded_file and mode == MODE_FOND:
+            _import_en_fond(uploaded_file)
+        elif uploaded_file:
+            try:
+                # Lecture du fichier
+                with profilage.chrono(profilage.SECTION_IMPORT):
+                    excel_file = pd.ExcelFile(uploaded_file)
+                st.success(f"✅ Fichier chargé: {uploaded_file.name}")
+                st.write("**Feuilles disponibles:**", ", ".join(excel_file.sheet_names))
+
+                # ========================================
+                # IMPORT AUTOMATIQUE FACTURATION CERTIFICATION
+                # ========================================
+                if 'Facturation-Certif' in excel_file.sheet_names:
+                    with st.expander("🔷 Facturation Certification - Import Automatique", expanded=True):
+                        try:
+                            with profilage.chrono(profilage.SECTION_IMPORT):
+                                df_certif_raw = pd.read_excel(excel_file, sheet_name='Facturation-Certif')
+
+                            st.write(f"📊 Aperçu des données brutes ({len(df_certif_raw)} lignes):")
+                            profilage.dataframe(df_certif_raw.head(5), use_container_width=True)
+
+                            # Paramètres d'import
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                start_row_certif = st.number_input(
+                                    "Ligne de départ (0 = première ligne)", 
+                                    min_value=0, 
+                                    max_value=max(0, len(df_certif_raw)-1), 
+                                    value=2,
+                                    key="auto_certif_start"
+                                )
+                            with col2:
+                                replace_certif = st.checkbox(
+                                    "Remplacer les données existantes", 
+                                    value=True,
+                                    key="auto_certif_replace"
+                                )
+
+                            # Détection automatique des colonnes
+                            df_certif = clean_data(df_certif_raw, start_row_certif)
+                            colonnes = detecter_colonnes(df_certif.columns.tolist(), CERTIF)
+
+                            # Afficher les colonnes détectées
+                            st.write("**🔍 Colonnes détectées automatiquement:**")
+                            col1, col2, col3, col4 = st.columns(4)
+                            with col1:
+                                st.write(f"📅 Date: `{colonnes['date']}`")
+                                st.write(f"👤 Client: `{colonnes['client']}`")
+                            with col2:
+                                st.write(f"📋 Référentiel: `{colonnes['ref']}`")
+                                st.write(f"⏱️ Durée: `{colonnes['duree']}`")
+                            with col3:
+                                st.write(f"💰 Montant: `{colonnes['montant']}`")
+                                st.write(f"🚗 Frais: `{colonnes['frais']}`")
+                            with col4:
+                                st.write(f"👨‍💼 Coût Aud.: `{colonnes['cout']}`")
+                                st.write(f"✅ Statut: `{colonnes['statut']}`")
+
+                            # Contrôle du lot avant import
+                            if not colonnes_manquantes(colonnes, CERTIF):
+                                certif_a_importer = _controler(CERTIF, preparer_certif(df_certif, colonnes), replace_certif,
+                                                               "auto_certif")
+
+                            if st.button("✨ Importer automatiquement Certification", key="auto_import_certif", type="primary"):
+                                if not colonnes_manquantes(colonnes, CERTIF):
+                                    try:
+                                        new_data = certif_a_importer
+
+                                        # Remplacer ou ajouter
+                                        if replace_certif:
+                                            etat.remplacer(CERTIF, new_data)
+                                        else:
+                                            etat.ajouter(CERTIF, new_data)
+
+                                        st.success(f"✅ {len(new_data)} lignes de Certification importées avec succès!")
+                                        st.balloons()
+                                        st.rerun()
+
+                                    except Exception as e:
+                                        st.error(f"❌ Erreur lors de l'import: {str(e)}")
+                                        st.write("Détails:", e)
+                                else:
+                                    st.error("❌ Impossible de détecter les colonnes essentielles (Date, Client, Montant)")
+
+                        except Exception as e:
+                            st.error(f"❌ Erreur lors de la lecture de la feuille Certification: {str(e)}")
+
+                # ========================================
+                # IMPORT AUTOMATIQUE FACTURATION AUTRES
+                # ========================================
+                if 'Facturation-Autres' in excel_file.sheet_names:
+                    with st.expander("🔶 Facturation Autres - Import Automatique", expanded=True):
+                        try:
+                            with profilage.chrono(profilage.SECTION_IMPORT):
+                                df_autres_raw = pd.read_excel(excel_file, sheet_name='Facturation-Autres')
+
+                            st.write(f"📊 Aperçu des données brutes ({len(df_autres_raw)} lignes):")
+                            profilage.dataframe(df_autres_raw.head(5), use_container_width=True)
+
+                            # Paramètres d'import
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                start_row_autres = st.number_input(
+                                    "Ligne de départ (0 = première ligne)", 
+                                    min_value=0, 
+                                    max_value=max(0, len(df_autres_raw)-1), 
+                                    value=2,
+                                    key="auto_autres_start"
+                                )
+                            with col2:
+                                replace_autres = st.checkbox(
+                                    "Remplacer les données existantes", 
+                                    value=True,
+                                    key="auto_autres_replace"
+                                )
+
+                            # Détection automatique
+                            df_autres = clean_data(df_autres_raw, start_row_autres)
+                            colonnes = detecter_colonnes(df_autres.columns.tolist(), AUTRES)
+
+                            # Afficher les colonnes détectées
+                            st.write("**🔍 Colonnes détectées automatiquement:**")
+                            col1, col2, col3, col4 = st.columns(4)
+                            with col1:
+                                st.write(f"📅 Date: `{colonnes['date']}`")
+                                st.write(f"📦 Type: `{colonnes['type']}`")
+                            with col2:
+                                st.write(f"👤 Client: `{colonnes['client']}`")
+                                st.write(f"📝 Description: `{colonnes['desc']}`")
+                            with col3:
+                                st.write(f"💰 Montant: `{colonnes['montant']}`")
+                                st.write(f"🚗 Frais: `{colonnes['frais']}`")
+                            with col4:
+                                st.write(f"👨‍💼 Coût: `{colonnes['cout']}`")
+                                st.write(f"✅ Statut: `{colonnes['statut']}`")
+
+                            # Contrôle du lot avant import
+                            if not colonnes_manquantes(colonnes, AUTRES):
+                                autres_a_importer = _controler(AUTRES, preparer_autres(df_autres, colonnes), replace_autres,
+                                                               "auto_autres")
+
+                            if st.button("✨ Importer automatiquement Autres", key="auto_import_autres", type="primary"):
+                                if not colonnes_manquantes(colonnes, AUTRES):
+                                    try:
+                                        new_data = autres_a_importer
+
+                                        # Remplacer ou ajouter
+                                        if replace_autres:
+                                            etat.remplacer(AUTRES, new_data)
+                                        else:
+                                            etat.ajouter(AUTRES, new_data)
+
+                                        st.success(f"✅ {len(new_data)} lignes de Facturation Autres importées avec succès!")
+                                        st.balloons()
+                                        st.rerun()
+
+                                    except Exception as e:
+                                        st.error(f"❌ Erreur lors de l'import: {str(e)}")
+                                        st.write("Détails:", e)
+                                else:
+                                    st.error("❌ Impossible de détecter les colonnes essentielles (Date, Client, Montant)")
+
+                        except Exception as e:
+                            st.error(f"❌ Erreur lors de la lecture de la feuille Autres: {str(e)}")
+
+                # ========================================
+                # IMPORT AUTOMATIQUE CHARGES DIVERSES
+                # ========================================
+                if 'FRAIS DIVERS' in excel_file.sheet_names:
+                    with st.expander("💸 Charges Diverses - Import Automatique"):
+                        try:
+                            with profilage.chrono(profilage.SECTION_IMPORT):
+                                df_charges_raw = pd.read_excel(excel_file, sheet_name='FRAIS DIVERS')
+
+                            st.write(f"📊 Aperçu des données brutes ({len(df_charges_raw)} lignes):")
+                            profilage.dataframe(df_charges_raw.head(5), use_container_width=True)
+
+                            # Paramètres d'import
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                start_row_charges = st.number_input(
+                                    "Ligne de départ (0 = première ligne)", 
+                                    min_value=0, 
+                                    max_value=max(0, len(df_charges_raw)-1), 
+                                    value=1,
+                                    key="auto_charges_start"
+                                )
+                            with col2:
+                                replace_charges = st.checkbox(
+                                    "Remplacer les données existantes", 
+                                    value=True,
+                                    key="auto_charges_replace"
+                                )
+
+                            # Détection automatique
+                            df_charges = clean_data(df_charges_raw, start_row_charges)
+                            colonnes = detecter_colonnes(df_charges.columns.tolist(), CHARGES)
+
+                            # Afficher les colonnes détectées
+                            st.write("**🔍 Colonnes détectées automatiquement:**")
+                            col1, col2, col3 = st.columns(3)
+                            with col1:
+                                st.write(f"📅 Date: `{colonnes['date']}`")
+                                st.write(f"📦 Catégorie: `{colonnes['cat']}`")
+                            with col2:
+                                st.write(f"📝 Description: `{colonnes['desc']}`")
+                                st.write(f"💰 Montant: `{colonnes['montant']}`")
+                            with col3:
+                                st.write(f"✅ Statut: `{colonnes['statut']}`")
+
+                            # Contrôle du lot avant import
+                            if not colonnes_manquantes(colonnes, CHARGES):
+                                charges_a_importer = _controler(CHARGES, preparer_charges(df_charges, colonnes), replace_charges,
+                                                                "auto_charges")
+
+                            if st.button("✨ Importer automatiquement Charges", key="auto_import_charges", type="primary"):
+                                if not colonnes_manquantes(colonnes, CHARGES):
+                                    try:
+                                        new_data = charges_a_importer
+
+                                        # Remplacer ou ajouter
+                                        if replace_charges:
+                                            etat.remplacer(CHARGES, new_data)
+                                        else:
+                                            etat.ajouter(CHARGES, new_data)
+
+                                        st.success(f"✅ {len(new_data)} lignes de Charges importées avec succès!")
+                                        st.balloons()
+                                        st.rerun()
+
+                                    except Exception as e:
+                                        st.error(f"❌ Erreur lors de l'import: {str(e)}")
+                                        st.write("Détails:", e)
+                                else:
+                                    st.error("❌ Impossible de détecter les colonnes essentielles (Date, Montant)")
+
+                        except Exception as e:
+                            st.error(f"❌ Erreur lors de la lecture de la feuille Charges: {str(e)}")
+
+                # Message si aucune feuille reconnue
+                if not any(sheet in excel_file.sheet_names for sheet in ['Facturation-Certif', 'Facturation-Autres', 'FRAIS DIVERS']):
+                    st.warning("⚠️ Aucune feuille standard détectée. Assurez-vous que votre fichier contient les feuilles: 'Facturation-Certif', 'Facturation-Autres' ou 'FRAIS DIVERS'")
+
+            except Exception as e:
+                st.error(f"❌ Erreur lors de la lecture du fichier: {str(e)}")
+                st.write("Détails de l'erreur:", e)
+            try:
+                # Lecture du fichier
+                with profilage.chrono(profilage.SECTION_IMPORT):
+                    excel_file = pd.ExcelFile(uploaded_file)
+                st.success(f"✅ Fichier chargé: {uploaded_file.name}")
+
+                st.write("**Feuilles disponibles:**", excel_file.sheet_names)
+
+                # Section Import Facturation Certification
+                with st.expander("📋 Importer Facturation Certification", expanded=True):
+                    st.write("**Sélectionner la feuille contenant les facturations certification**")
+
+                    certif_sheet = st.selectbox(
+                        "Feuille Certification", 
+                        excel_file.sheet_names,
+                        key="certif_sheet"
+                    )
+
+                    if certif_sheet:
+                        with profilage.chrono(profilage.SECTION_IMPORT):
+                            df_certif = pd.read_excel(excel_file, sheet_name=certif_sheet)
+                        st.write(f"Aperçu ({len(df_certif)} lignes):")
+                        profilage.dataframe(df_certif.head(10), use_container_width=True)
+
+                        st.write("**Mapper les colonnes:**")
+                        col1, col2, col3 = st.columns(3)
+
+                        with col1:
+                            date_col = st.selectbox("Colonne Date", [''] + list(df_certif.columns), key="certif_date")
+                            client_col = st.selectbox("Colonne Client", [''] + list(df_certif.columns), key="certif_client")
+                            ref_col = st.selectbox("Colonne Référentiel", [''] + list(df_certif.columns), key="certif_ref")
+
+                        with col2:
+                            duree_col = st.selectbox("Colonne Durée", [''] + list(df_certif.columns), key="certif_duree")
+                            montant_col = st.selectbox("Colonne Montant Facturation", [''] + list(df_certif.columns), key="certif_montant")
+                            frais_col = st.selectbox("Colonne Frais Mission", [''] + list(df_certif.columns), key="certif_frais")
+
+                        with col3:
+                            cout_col = st.selectbox("Colonne Coût Auditeur", [''] + list(df_certif.columns), key="certif_cout")
+                            statut_col = st.selectbox("Colonne Statut (optionnel)", [''] + list(df_certif.columns), key="certif_statut")
+
+                        # Ligne de départ
+                        start_row = st.number_input("Ligne de départ (0 = première ligne)", 
+                                                   min_value=0, 
+                                                   max_value=len(df_certif)-1, 
+                                                   value=2,
+                                                   key="certif_start")
+
+                        replace_option = st.radio("Options d'import:",
+                                                 ["Remplacer les données existantes", "Ajouter aux données existantes"],
+                                                 key="certif_replace")
+                        remplacer_certif = replace_option == "Remplacer les données existantes"
+
+                        # Contrôle du lot avant import, comme pour l'import automatique
+                        certif_manuel = None
+                        if all([date_col, client_col, montant_col]):
+                            try:
+                                # Créer le nouveau dataframe
+                                new_data = pd.DataFrame()
+                                new_data['Date'] = pd.to_datetime(df_certif[date_col].iloc[start_row:], errors='coerce')
+                                new_data['Client'] = df_certif[client_col].iloc[start_row:]
+                                new_data['Référentiel'] = df_certif[ref_col].iloc[start_row:] if ref_col else ''
+                                new_data['Durée'] = pd.to_numeric(df_certif[duree_col].iloc[start_row:], errors='coerce') if duree_col else 1.0
+                                new_data['Montant_Facturation'] = pd.to_numeric(df_certif[montant_col].iloc[start_row:], errors='coerce')
+                                new_data['Frais_Mission'] = pd.to_numeric(df_certif[frais_col].iloc[start_row:], errors='coerce') if frais_col else 0
+                                new_data['Cout_Auditeur'] = pd.to_numeric(df_certif[cout_col].iloc[start_row:], errors='coerce') if cout_col else 0
+                                new_data['Statut'] = df_certif[statut_col].iloc[start_row:] if statut_col else 'Facturé'
+
+                                # Nettoyer les lignes vides
+                                new_data = new_data.dropna(subset=['Date', 'Client', 'Montant_Facturation'])
+                                new_data = new_data[new_data['Montant_Facturation'] > 0]
+                                new_data = new_data.fillna(0)
+                                certif_manuel = _controler(CERTIF, new_data, remplacer_certif, "manuel_certif")
+                            except Exception as e:
+                                st.error(f"❌ Erreur lors de la préparation des données: {str(e)}")
+
+                        if st.button("✅ Importer les données Certification", key="import_certif"):
+                            if certif_manuel is not None:
+                                try:
+                                    new_data = certif_manuel
+
+                                    # Remplacer ou ajouter
+                                    if remplacer_certif:
+                                        etat.remplacer(CERTIF, new_data)
+                                    else:
+                                        etat.ajouter(CERTIF, new_data)
+
+                                    st.success(f"✅ {len(new_data)} lignes importées avec succès!")
+                                    st.balloons()
+                                    st.rerun()
+
+                                except Exception as e:
+                                    st.error(f"❌ Erreur lors de l'import: {str(e)}")
+                            elif not all([date_col, client_col, montant_col]):
+                                st.warning("⚠️ Veuillez sélectionner au minimum: Date, Client et Montant")
+
+                # Section Import Facturation Autres
+                with st.expander("📋 Importer Facturation Autres"):
+                    st.write("**Sélectionner la feuille contenant les autres facturations**")
+
+                    autres_sheet = st.selectbox(
+                        "Feuille Autres", 
+                        excel_file.sheet_names,
+                        key="autres_sheet"
+                    )
+
+                    if autres_sheet:
+                        with profilage.chrono(profilage.SECTION_IMPORT):
+                            df_autres = pd.read_excel(excel_file, sheet_name=autres_sheet)
+                        st.write(f"Aperçu ({len(df_autres)} lignes):")
+                        profilage.dataframe(df_autres.head(10), use_container_width=True)
+
+                        st.write("**Mapper les colonnes:**")
+                        col1, col2, col3 = st.columns(3)
+
+                        with col1:
+                            date_col_a = st.selectbox("Colonne Date", [''] + list(df_autres.columns), key="autres_date")
+                            type_col = st.selectbox("Colonne Type", [''] + list(df_autres.columns), key="autres_type")
+                            client_col_a = st.selectbox("Colonne Client", [''] + list(df_autres.columns), key="autres_client")
+
+                        with col2:
+                            desc_col = st.selectbox("Colonne Description", [''] + list(df_autres.columns), key="autres_desc")
+                            montant_col_a = st.selectbox("Colonne Montant", [''] + list(df_autres.columns), key="autres_montant")
+                            frais_col_a = st.selectbox("Colonne Frais Mission", [''] + list(df_autres.columns), key="autres_frais")
+
+                        with col3:
+                            cout_col_a = st.selectbox("Colonne Coût Auditeur", [''] + list(df_autres.columns), key="autres_cout")
+                            statut_col_a = st.selectbox("Colonne Statut (optionnel)", [''] + list(df_autres.columns), key="autres_statut")
+
+                        start_row_a = st.number_input("Ligne de départ", 
+                                                     min_value=0, 
+                                                     max_value=len(df_autres)-1, 
+                                                     value=2,
+                                                     key="autres_start")
+
+                        replace_option = st.radio("Options d'import:",
+                                                 ["Remplacer les données existantes", "Ajouter aux données existantes"],
+                                                 key="autres_replace")
+                        remplacer_autres = replace_option == "Remplacer les données existantes"
+
+                        # Contrôle du lot avant import, comme pour l'import automatique
+                        autres_manuel = None
+                        if all([date_col_a, client_col_a, montant_col_a]):
+                            try:
+                                new_data = pd.DataFrame()
+                                new_data['Date'] = pd.to_datetime(df_autres[date_col_a].iloc[start_row_a:], errors='coerce')
+                                new_data['Type'] = df_autres[type_col].iloc[start_row_a:] if type_col else 'Autre'
+                                new_data['Client'] = df_autres[client_col_a].iloc[start_row_a:]
+                                new_data['Description'] = df_autres[desc_col].iloc[start_row_a:] if desc_col else ''
+                                new_data['Montant_Facturation'] = pd.to_numeric(df_autres[montant_col_a].iloc[start_row_a:], errors='coerce')
+                                new_data['Frais_Mission'] = pd.to_numeric(df_autres[frais_col_a].iloc[start_row_a:], errors='coerce') if frais_col_a else 0
+                                new_data['Cout_Auditeur'] = pd.to_numeric(df_autres[cout_col_a].iloc[start_row_a:], errors='coerce') if cout_col_a else 0
+                                new_data['Statut'] = df_autres[statut_col_a].iloc[start_row_a:] if statut_col_a else 'Facturé'
+
+                                new_data = new_data.dropna(subset=['Date', 'Client', 'Montant_Facturation'])
+                                new_data = new_data[new_data['Montant_Facturation'] > 0]
+                                new_data = new_data.fillna(0)
+                                autres_manuel = _controler(AUTRES, new_data, remplacer_autres, "manuel_autres")
+                            except Exception as e:
+                                st.error(f"❌ Erreur lors de la préparation des données: {str(e)}")
+
+                        if st.button("✅ Importer les données Autres", key="import_autres"):
+                            if autres_manuel is not None:
+                                try:
+                                    new_data = autres_manuel
+
+                                    if remplacer_autres:
+                                        etat.remplacer(AUTRES, new_data)
+                                    else:
+                                        etat.ajouter(AUTRES, new_data)
+
+                                    st.success(f"✅ {len(new_data)} lignes importées avec succès!")
+                                    st.balloons()
+                                    st.rerun()
+
+                                except Exception as e:
+                                    st.error(f"❌ Erreur lors de l'import: {str(e)}")
+                            elif not all([date_col_a, client_col_a, montant_col_a]):
+                                st.warning("⚠️ Veuillez sélectionner au minimum: Date, Client et Montant")
+
+                # Section Import Charges
+                with st.expander("📋 Importer Charges Diverses"):
+                    st.write("**Sélectionner la feuille contenant les charges diverses**")
+
+                    charges_sheet = st.selectbox(
+                        "Feuille Charges", 
+                        excel_file.sheet_names,
+                        key="charges_sheet"
+                    )
+
+                    if charges_sheet:
+                        with profilage.chrono(profilage.SECTION_IMPORT):
+                            df_charges = pd.read_excel(excel_file, sheet_name=charges_sheet)
+                        st.write(f"Aperçu ({len(df_charges)} lignes):")
+                        profilage.dataframe(df_charges.head(10), use_container_width=True)
+
+                        st.write("**Mapper les colonnes:**")
+                        col1, col2 = st.columns(2)
+
+                        with col1:
+                            date_col_c = st.selectbox("Colonne Date", [''] + list(df_charges.columns), key="charges_date")
+                            cat_col = st.selectbox("Colonne Catégorie", [''] + list(df_charges.columns), key="charges_cat")
+                            desc_col_c = st.selectbox("Colonne Description", [''] + list(df_charges.columns), key="charges_desc")
+
+                        with col2:
+                            montant_col_c = st.selectbox("Colonne Montant", [''] + list(df_charges.columns), key="charges_montant")
+                            statut_col_c = st.selectbox("Colonne Statut (optionnel)", [''] + list(df_charges.columns), key="charges_statut")
+
+                        start_row_c = st.number_input("Ligne de départ", 
+                                                     min_value=0, 
+                                                     max_value=len(df_charges)-1, 
+                                                     value=1,
+                                                     key="charges_start")
+
+                        replace_option = st.radio("Options d'import:",
+                                                 ["Remplacer les données existantes", "Ajouter aux données existantes"],
+                                                 key="charges_replace")
+                        remplacer_charges = replace_option == "Remplacer les données existantes"
+
+                        # Contrôle du lot avant import, comme pour l'import automatique
+                        charges_manuel = None
+                        if all([date_col_c, montant_col_c]):
+                            try:
+                                new_data = pd.DataFrame()
+                                new_data['Date'] = pd.to_datetime(df_charges[date_col_c].iloc[start_row_c:], errors='coerce')
+                                new_data['Catégorie'] = df_charges[cat_col].iloc[start_row_c:] if cat_col else 'Autre'
+                                new_data['Description'] = df_charges[desc_col_c].iloc[start_row_c:] if desc_col_c else ''
+                                new_data['Montant'] = pd.to_numeric(df_charges[montant_col_c].iloc[start_row_c:], errors='coerce')
+                                new_data['Statut'] = df_charges[statut_col_c].iloc[start_row_c:] if statut_col_c else 'Payé'
+
+                                new_data = new_data.dropna(subset=['Date', 'Montant'])
+                                new_data = new_data[new_data['Montant'] > 0]
+                                new_data = new_data.fillna('')
+                                charges_manuel = _controler(CHARGES, new_data, remplacer_charges, "manuel_charges")
+                            except Exception as e:
+                                st.error(f"❌ Erreur lors de la préparation des données: {str(e)}")
+
+                        if st.button("✅ Importer les Charges", key="import_charges"):
+                            if charges_manuel is not None:
+                                try:
+                                    new_data = charges_manuel
+
+                                    if remplacer_charges:
+                                        etat.remplacer(CHARGES, new_data)
+                                    else:
+                                        etat.ajouter(CHARGES, new_data)
+
+                                    st.success(f"✅ {len(new_data)} lignes importées avec succès!")
+                                    st.balloons()
+                                    st.rerun()
+
+                                except Exception as e:
+                                    st.error(f"❌ Erreur lors de l'import: {str(e)}")
+                            elif not all([date_col_c, montant_col_c]):
+                                st.warning("⚠️ Veuillez sélectionner au minimum: Date et Montant")
+
+            except Exception as e:
+                st.error(f"❌ Erreur lors de la lecture du fichier: {str(e)}")
+                st.write("Détails de l'erreur:", e)
+
+        suivi('import')
+
+    with tab2:
+        st.subheader("Exporter les données")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.write("**📋 Facturation Certification**")
+            with profilage.chrono(profilage.SECTION_EXPORT):
+                csv_certif = etat.lire(CERTIF).to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Télécharger (CSV)",
+                data=csv_certif,
+                file_name=f'facturation_certif_{datetime.now().strftime("%Y%m%d")}.csv',
+                mime='text/csv'
+            )
+
+        with col2:
+            st.write("**📋 Facturation Autres**")
+            with profilage.chrono(profilage.SECTION_EXPORT):
+                csv_autres = etat.lire(AUTRES).to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Télécharger (CSV)",
+                data=csv_autres,
+                file_name=f'facturation_autres_{datetime.now().strftime("%Y%m%d")}.csv',
+                mime='text/csv'
+            )
+
+        with col3:
+            st.write("**📋 Charges Diverses**")
+            with profilage.chrono(profilage.SECTION_EXPORT):
+                csv_charges = etat.lire(CHARGES).to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Télécharger (CSV)",
+                data=csv_charges,
+                file_name=f'charges_diverses_{datetime.now().strftime("%Y%m%d")}.csv',
+                mime='text/csv'
+            )
+
+        st.divider()
+
+        st.write("**📦 Classeur Excel complet**")
+        st.caption("Les trois ledgers (et le forecast) dans un classeur, préparé en arrière-plan.")
+        if st.button("📦 Préparer le classeur Excel", key="export_excel"):
+            feuilles = {LIBELLES[nom]: etat.lire(nom) for nom in LIBELLES}
+            if 'forecast_data' in st.session_state:
+                feuilles['Forecast'] = st.session_state.forecast_data
+            etat.lancer_tache("Export Excel", _exporter_classeur, feuilles, genre='export')
+        suivi('export', _telecharger_classeur)
+
+        st.divider()
+
+        _historique()
+
+        st.divider()
+
+        # Export du forecast
+        if 'forecast_data' in st.session_state:
+            st.write("**📈 Export du Forecast**")
+            with profilage.chrono(profilage.SECTION_EXPORT):
+                csv_forecast = st.session_state.forecast_data.to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Télécharger Forecast (CSV)",
+                data=csv_forecast,
+                file_name=f'forecast_{datetime.now().strftime("%Y%m%d")}.csv',
+                mime='text/csv',
+                type="primary"
+            )
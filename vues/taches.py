@@ -0,0 +1,71 @@
+"""Suivi des tâches de fond, partagé par les pages qui en lancent.
+
+Tant qu'une tâche tourne, le panneau est un fragment réexécuté toutes les
+`INTERVALLE` secondes ; à la fin de la dernière, toute la page est relancée pour
+livrer les résultats.
+"""
+
+import streamlit as st
+
+import etat
+from finance.taches import TERMINEE, ECHEC, ANNULEE
+
+# Intervalle de rafraîchissement du suivi (secondes)
+INTERVALLE = 1.0
+
+ICONES = {TERMINEE: "✅", ECHEC: "❌", ANNULEE: "⏹️"}
+
+
+def _ligne(tache, telechargement=None):
+    """Une tâche : libellé, état, progression et actions"""
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        duree = f" – {tache.duree:.0f} s" if tache.duree is not None else ""
+        if tache.finie:
+            st.write(f"{ICONES[tache.etat]} **{tache.libelle}** ({tache.etat.lower()}{duree})")
+            if tache.erreur:
+                st.caption(tache.erreur)
+            elif tache.message:
+                st.caption(tache.message)
+        else:
+            st.progress(tache.progression, text=f"⏳ {tache.libelle} – {tache.message or tache.etat}{duree}")
+    with col2:
+        if not tache.finie:
+            if st.button("⏹️ Arrêter", key=f"tache_arreter_{tache.id}"):
+                etat.executeur().annuler(tache.id)
+        elif tache.etat == TERMINEE and telechargement is not None:
+            telechargement(tache)
+        elif st.button("🧹 Effacer", key=f"tache_effacer_{tache.id}"):
+            etat.executeur().oublier(tache.id)
+            st.rerun()
+
+
+def _afficher(genre, telechargement):
+    taches = etat.taches(genre)
+    for tache in taches:
+        _ligne(tache, telechargement)
+    return taches
+
+
+@st.fragment(run_every=INTERVALLE)
+def _suivre(genre, telechargement):
+    # Au rendu de la page, une tâche finie entre-temps est livrée au rafraîchissement suivant
+    rendu_page = st.session_state.pop(f'_suivi_{genre}', False)
+    if all(tache.finie for tache in _afficher(genre, telechargement)) and not rendu_page:
+        st.rerun()
+
+
+def suivi(genre, telechargement=None):
+    """Tâches de la session du genre donné ; `telechargement(tache)` affiche le résultat d'une tâche terminée"""
+    if any(not tache.finie for tache in etat.taches(genre)):
+        st.session_state[f'_suivi_{genre}'] = True
+        _suivre(genre, telechargement)
+    else:
+        _afficher(genre, telechargement)
+
+    # Tâches lancées par une autre session (page rafraîchie pendant l'exécution) : récupérables
+    for tache in etat.taches_a_recuperer(genre):
+        if st.button(f"📥 Récupérer « {tache.libelle} » (lancée le {tache.creee:%d/%m à %H:%M})",
+                     key=f"tache_recuperer_{tache.id}"):
+            etat.recuperer_tache(tache.id)
+            st.rerun()
@@ -0,0 +1,85 @@
+"""Page Trésorerie : projection hebdomadaire des encaissements et décaissements."""
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import etat
+import profilage
+from finance.tresorerie import FLUX_ENTREES, FLUX_SORTIES, SEMAINE, ConditionsPaiement, projection
+
+# Ancienneté maximale (mois) des lignes dont les flux peuvent encore être en retard
+MOIS_RETARD = 12
+
+
+def render():
+    st.header("Trésorerie Prévisionnelle")
+
+    with st.expander("⚙️ Conditions de paiement", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            delai_clients = st.number_input("Délai clients (jours)", 0, 180, 45, key="treso_delai_clients")
+            fin_de_mois = st.checkbox("Échéance clients en fin de mois", key="treso_fin_de_mois")
+        with col2:
+            delai_auditeurs = st.number_input("Délai auditeurs et frais (jours)", 0, 180, 30, key="treso_delai_auditeurs")
+            delai_fournisseurs = st.number_input("Délai fournisseurs (jours)", 0, 180, 30, key="treso_delai_fournisseurs")
+        with col3:
+            probabilite_devis = st.slider("Probabilité de signature des devis (%)", 0, 100, 30, 5,
+                                          key="treso_probabilite_devis")
+    conditions = ConditionsPaiement(delai_clients, fin_de_mois, delai_auditeurs, delai_fournisseurs,
+                                    probabilite_devis / 100)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        solde_initial = st.number_input("Trésorerie disponible aujourd'hui (€)", value=0.0, step=1000.0,
+                                        key="treso_solde")
+    with col2:
+        nb_semaines = st.slider("Horizon (semaines)", 4, 52, 13, key="treso_semaines")
+
+    semaine = pd.Timestamp.today().to_period(SEMAINE)
+    fin = semaine + nb_semaines - 1
+    with profilage.chrono(profilage.SECTION_AGREGATION, etape='tresorerie'):
+        mois_flux = ((semaine.start_time - pd.DateOffset(months=MOIS_RETARD)).to_period('M'),
+                     fin.end_time.to_period('M'))
+        flux = etat.flux_tresorerie(conditions, *mois_flux)
+        tableau = projection(flux, semaine, nb_semaines, solde_initial)
+    etat.avertir_devises(*mois_flux)
+
+    st.caption("Encaissements des lignes facturées, prévues et des devis pondérés ; décaissements des coûts "
+               "auditeurs, frais de mission et charges non payées. Les flux échus des lignes facturées sont "
+               "supposés réglés ; les autres flux échus sont reportés sur la semaine en cours. "
+               "La période de la barre latérale ne s'applique pas à cette page.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Encaissements", f"{tableau['Entrées'].sum():,.0f} €")
+    with col2:
+        st.metric("Décaissements", f"{abs(tableau['Sorties'].sum()):,.0f} €")
+    with col3:
+        st.metric("Solde fin d'horizon", f"{tableau['Solde'].iloc[-1]:,.0f} €")
+    with col4:
+        point_bas = tableau['Solde'].idxmin()
+        st.metric("Point bas", f"{tableau['Solde'].min():,.0f} €", delta=f"semaine du {point_bas.start_time:%d/%m}",
+                  delta_color="off")
+
+    semaines = tableau.index.start_time
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=semaines, y=tableau['Entrées'], name='Encaissements', marker_color='#27AE60'))
+    fig.add_trace(go.Bar(x=semaines, y=tableau['Sorties'], name='Décaissements', marker_color='#E74C3C'))
+    fig.add_trace(go.Scatter(x=semaines, y=tableau['Solde'], name='Solde', mode='lines+markers',
+                             line=dict(color='#2C3E50', width=3)))
+    fig.update_layout(barmode='relative', xaxis_title="Semaine", yaxis_title="Montant (€)",
+                      hovermode='x unified', height=450)
+    profilage.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("📋 Détail par semaine")
+    with profilage.chrono(profilage.SECTION_FORMATAGE):
+        display_df = tableau.reset_index()
+        display_df['Semaine'] = display_df['Semaine'].dt.start_time.dt.strftime('%d/%m/%Y')
+        for col in FLUX_ENTREES + FLUX_SORTIES + ['Entrées', 'Sorties', 'Flux_Net', 'Solde']:
+            display_df[col] = display_df[col].apply(lambda x: f"{x:,.0f} €")
+    profilage.dataframe(display_df, use_container_width=True, hide_index=True)
+
+    st.download_button("📥 Télécharger la projection (CSV)",
+                       tableau.set_index(tableau.index.start_time.rename('Semaine')).to_csv().encode('utf-8'),
+                       "tresorerie.csv", "text/csv", key="treso_csv")